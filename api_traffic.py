@@ -0,0 +1,189 @@
+"""
+Record and replay of the app's backend HTTP traffic.
+
+With API_TRAFFIC_MODE=record every request the app sends (call_api, the
+raw /chat post, bulk import and export, but not the health monitor's
+probes) is performed normally and appended as one JSON line to
+API_TRAFFIC_PATH: method, path, query, request/response sizes, status,
+latency and the response body. With API_TRAFFIC_MODE=replay no network is
+used: each request is answered from the recording, in recorded order per
+(method, path, query), after its recorded latency times
+API_TRAFFIC_LATENCY_SCALE (0 = instant). A session can thus be reproduced
+offline and deterministically for performance regression tests.
+
+    API_TRAFFIC_MODE=record streamlit run fixed_app.py
+    API_TRAFFIC_MODE=replay API_TRAFFIC_LATENCY_SCALE=0 streamlit run fixed_app.py
+    python api_traffic.py api_traffic.jsonl        # per-endpoint summary
+"""
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+from latency_stats import percentile
+
+TRAFFIC_MODES = ("off", "record", "replay")
+TRAFFIC_PATH = os.getenv("API_TRAFFIC_PATH", "api_traffic.jsonl")
+
+
+def _request_bytes(kwargs) -> int:
+    if kwargs.get("json") is not None:
+        return len(json.dumps(kwargs["json"]).encode("utf-8"))
+    size = 0
+    data = kwargs.get("data")
+    if isinstance(data, dict):
+        size += len(urlencode(data, doseq=True))
+    elif isinstance(data, (bytes, str)):
+        size += len(data)
+    for _, spec in kwargs.get("files") or []:
+        size += len(spec[1]) if isinstance(spec, tuple) else 0
+    return size
+
+
+def _route(url, params=None) -> tuple:
+    parts = urlsplit(url)
+    query = parts.query or (urlencode(sorted(params.items()), doseq=True) if params else "")
+    return parts.path or "/", query
+
+
+class TrafficRecorder:
+    """Performs requests with `requests` and appends each exchange to a JSONL file."""
+
+    def __init__(self, path: str = TRAFFIC_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        import requests
+
+        path, query = _route(url, kwargs.get("params"))
+        entry = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "method": method.upper(),
+            "path": path,
+            "query": query,
+            "request_bytes": _request_bytes(kwargs),
+        }
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            entry.update(elapsed_ms=round((time.perf_counter() - start) * 1000, 3), error=type(e).__name__)
+            self._append(entry)
+            raise
+        entry["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        entry["status"] = response.status_code
+        entry["response_bytes"] = len(response.content)
+        entry["content_type"] = response.headers.get("content-type")
+        try:
+            entry["body"] = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(response.content).decode("ascii")
+        self._append(entry)
+        return response
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class TrafficReplayer:
+    """
+    Answers requests from a recording. Exchanges for the same (method, path,
+    query) are served in recorded order; once used up, the last one repeats.
+    Unrecorded requests fail like an unreachable backend.
+    """
+
+    def __init__(self, path: str = TRAFFIC_PATH, latency_scale: float = 1.0):
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._queues = defaultdict(deque)
+        for entry in load_traffic(path):
+            self._queues[(entry["method"], entry["path"], entry.get("query", ""))].append(entry)
+
+    def _next(self, key):
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                return None
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def request(self, method, url, **kwargs):
+        import requests
+
+        path, query = _route(url, kwargs.get("params"))
+        entry = self._next((method.upper(), path, query))
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"No recorded response for {method.upper()} {path}")
+        if self.latency_scale:
+            time.sleep(entry["elapsed_ms"] * self.latency_scale / 1000)
+        if entry.get("error", "").endswith("Timeout"):
+            raise requests.exceptions.Timeout(f"Recorded timeout for {method.upper()} {path}")
+        if entry.get("error"):
+            raise requests.exceptions.ConnectionError(f"Recorded {entry['error']} for {method.upper()} {path}")
+
+        response = requests.models.Response()
+        response.status_code = entry["status"]
+        response._content = (base64.b64decode(entry["body_b64"]) if "body_b64" in entry
+                             else entry.get("body", "").encode("utf-8"))
+        response.encoding = "utf-8"
+        response.url = url
+        if entry.get("content_type"):
+            response.headers["content-type"] = entry["content_type"]
+        return response
+
+
+def traffic_from_env():
+    """The recorder/replayer selected by API_TRAFFIC_MODE, or None when off."""
+    mode = os.getenv("API_TRAFFIC_MODE", "off").lower()
+    if mode == "record":
+        return TrafficRecorder(TRAFFIC_PATH)
+    if mode == "replay":
+        return TrafficReplayer(TRAFFIC_PATH, float(os.getenv("API_TRAFFIC_LATENCY_SCALE", "1.0")))
+    if mode != "off":
+        raise ValueError(f"API_TRAFFIC_MODE must be one of {', '.join(TRAFFIC_MODES)}")
+    return None
+
+
+def load_traffic(path: str = TRAFFIC_PATH) -> list:
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+
+def traffic_summary(entries) -> list:
+    """Count, p50/p95 latency and mean response size per (method, path)."""
+    buckets = defaultdict(list)
+    for e in entries:
+        buckets[(e["method"], e["path"])].append(e)
+    rows = []
+    for (method, path), items in sorted(buckets.items()):
+        latencies = [e["elapsed_ms"] for e in items]
+        rows.append({
+            "method": method,
+            "path": path,
+            "count": len(items),
+            "errors": sum(1 for e in items if e.get("error") or e.get("status", 200) >= 400),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "avg_response_bytes": sum(e.get("response_bytes", 0) for e in items) / len(items),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else TRAFFIC_PATH
+    print(f"{'method':<8}{'path':<44}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'avg KB':>10}")
+    for row in traffic_summary(load_traffic(source)):
+        print(f"{row['method']:<8}{row['path'][:43]:<44}{row['count']:>7}{row['errors']:>8}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['avg_response_bytes'] / 1024:>10.1f}")
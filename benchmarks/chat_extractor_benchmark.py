@@ -0,0 +1,160 @@
+"""
+Accuracy and latency benchmark for the local chat "add" extractor.
+
+Runs every prompt in the corpus (default: benchmarks/data/chat_add_prompts.jsonl)
+through `extract_add_fields`, and every prompt in the expiry corpus
+(benchmarks/data/chat_expiry_prompts.jsonl) through `extract_expiry_query`,
+and reports for each:
+  - exact-match accuracy (confident result == expected fields, or not confident
+    when the expected value is null)
+  - precision of confident results (wrongly confident results would create bad policies)
+  - coverage (share of well-formed add prompts handled locally)
+  - per-prompt latency p50/p95/max
+
+With --chat-url the same prompts are also sent to the backend `/chat` endpoint,
+to compare against the LLM round trip the fast path skips.
+
+Usage:
+    python benchmarks/chat_extractor_benchmark.py [--corpus PATH] [--expiry-corpus PATH] [--repeat N]
+           [--chat-url http://127.0.0.1:8000] [--json OUT]
+"""
+import argparse
+import dataclasses
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_extractor import extract_add_fields, extract_expiry_query  # noqa: E402
+from latency_stats import percentile  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_CORPUS = os.path.join(DATA_DIR, "chat_add_prompts.jsonl")
+DEFAULT_EXPIRY_CORPUS = os.path.join(DATA_DIR, "chat_expiry_prompts.jsonl")
+
+
+def add_result(prompt):
+    extraction = extract_add_fields(prompt)
+    return extraction.fields if extraction.confident else None
+
+
+def expiry_result(prompt):
+    query = extract_expiry_query(prompt)
+    return dataclasses.asdict(query) if query else None
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_local(corpus, repeat, extract=add_result):
+    rows = []
+    for case in corpus:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            got = extract(case["prompt"])
+            timings.append(time.perf_counter() - start)
+        rows.append({
+            "prompt": case["prompt"],
+            "expected": case["expected"],
+            "got": got,
+            "ok": got == case["expected"],
+            "latency_s": statistics.median(timings),
+        })
+    return rows
+
+
+def run_remote(corpus, chat_url):
+    import requests
+
+    timings = []
+    for case in corpus:
+        start = time.perf_counter()
+        try:
+            requests.post(f"{chat_url.rstrip('/')}/chat", json={"message": case["prompt"]}, timeout=60)
+        except requests.exceptions.RequestException:
+            continue
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(rows):
+    confident = [r for r in rows if r["got"] is not None]
+    addable = [r for r in rows if r["expected"] is not None]
+    fields_total = sum(len(r["expected"]) for r in addable)
+    fields_ok = sum(
+        1 for r in addable for k, v in r["expected"].items()
+        if r["got"] is not None and r["got"].get(k) == v
+    )
+    latencies = [r["latency_s"] for r in rows]
+    return {
+        "prompts": len(rows),
+        "accuracy": sum(r["ok"] for r in rows) / len(rows),
+        "confident_precision": (sum(r["ok"] for r in confident) / len(confident)) if confident else 1.0,
+        "coverage": (sum(1 for r in addable if r["got"] is not None) / len(addable)) if addable else 0.0,
+        "field_accuracy": (fields_ok / fields_total) if fields_total else 1.0,
+        "latency_us": {
+            "p50": percentile(latencies, 50, 0.0) * 1e6,
+            "p95": percentile(latencies, 95, 0.0) * 1e6,
+            "max": max(latencies) * 1e6,
+        },
+    }
+
+
+def report(label, summary, rows):
+    print(f"Prompts ({label}):{' ' * (12 - len(label))}{summary['prompts']}")
+    print(f"Exact accuracy:       {summary['accuracy']:.1%}")
+    print(f"Confident precision:  {summary['confident_precision']:.1%}")
+    print(f"Coverage:             {summary['coverage']:.1%}")
+    print(f"Field accuracy:       {summary['field_accuracy']:.1%}")
+    lat = summary["latency_us"]
+    print(f"Local latency:        p50 {lat['p50']:.1f} µs  p95 {lat['p95']:.1f} µs  max {lat['max']:.1f} µs")
+
+    for r in rows:
+        if not r["ok"]:
+            print(f"  MISMATCH: {r['prompt']!r}\n    expected {r['expected']}\n    got      {r['got']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--expiry-corpus", default=DEFAULT_EXPIRY_CORPUS)
+    parser.add_argument("--repeat", type=int, default=200, help="timing repetitions per prompt")
+    parser.add_argument("--chat-url", help="also time POST /chat on this backend")
+    parser.add_argument("--json", help="write the summary and per-prompt results to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    rows = run_local(corpus, args.repeat)
+    summary = summarize(rows)
+    report("add", summary, rows)
+
+    expiry_rows = run_local(load_corpus(args.expiry_corpus), args.repeat, extract=expiry_result)
+    summary["expiry"] = summarize(expiry_rows)
+    print()
+    report("expiry", summary["expiry"], expiry_rows)
+
+    if args.chat_url:
+        remote = run_remote(corpus, args.chat_url)
+        if remote:
+            summary["chat_latency_ms"] = {
+                "p50": percentile(remote, 50, 0.0) * 1e3,
+                "p95": percentile(remote, 95, 0.0) * 1e3,
+            }
+            print(f"/chat latency:        p50 {summary['chat_latency_ms']['p50']:.1f} ms  "
+                  f"p95 {summary['chat_latency_ms']['p95']:.1f} ms")
+        else:
+            print("/chat latency:        backend unreachable")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": rows, "expiry_results": expiry_rows}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
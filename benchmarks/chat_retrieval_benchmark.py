@@ -0,0 +1,84 @@
+"""
+Prompt size and latency of /chat with and without client-side retrieval.
+
+For each catalog size, sends the same questions to the local fake `/chat`
+twice: once with only the message (backend puts the whole catalog in the
+prompt) and once with the top-k candidates from a PolicyIndex built over the
+cached catalog. Reports prompt tokens, modelled LLM latency and the local
+retrieval overhead.
+
+Usage:
+    python benchmarks/chat_retrieval_benchmark.py [--sizes 100 1000 10000] [--k 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from local_backend.fake_llm import FakeChat  # noqa: E402
+from policy_index import PolicyIndex, policy_summary  # noqa: E402
+from synthetic import make_catalog  # noqa: E402
+
+QUESTIONS = [
+    "Find policies about remote work",
+    "Which policies cover password security for the IT Department?",
+    "Show me the parental leave policies",
+    "Update the Travel Expenses Policy 7 scope",
+    "What is our refunds policy for the Customer Service Team?",
+    "Find VPN access rules for contractors",
+]
+
+
+def run(size, k):
+    catalog = make_catalog(size)
+    chat = FakeChat(sleep=False)
+    build_start = time.perf_counter()
+    index = PolicyIndex(catalog)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    full_tokens, full_latency, rag_tokens, rag_latency, retrieve_ms = [], [], [], [], []
+    for question in QUESTIONS:
+        full = chat.respond(question, catalog)["usage"]
+        full_tokens.append(full["prompt_tokens"])
+        full_latency.append(full["modelled_latency_ms"])
+
+        start = time.perf_counter()
+        candidates = [policy_summary(p) for p in index.search(question, k=k)]
+        retrieve_ms.append((time.perf_counter() - start) * 1000)
+        rag = chat.respond(question, catalog, context={"candidates": candidates})["usage"]
+        rag_tokens.append(rag["prompt_tokens"])
+        rag_latency.append(rag["modelled_latency_ms"])
+
+    return {
+        "size": size,
+        "index_build_ms": build_ms,
+        "full_tokens": statistics.mean(full_tokens),
+        "rag_tokens": statistics.mean(rag_tokens),
+        "full_latency_ms": statistics.median(full_latency),
+        "rag_latency_ms": statistics.median(rag_latency) + statistics.median(retrieve_ms),
+        "retrieve_ms": statistics.median(retrieve_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'policies':>9}{'tokens full':>13}{'tokens rag':>12}{'cut':>8}"
+          f"{'latency full':>14}{'latency rag':>13}{'retrieve':>10}{'index build':>13}")
+    for size in args.sizes:
+        r = run(size, args.k)
+        cut = 1 - r["rag_tokens"] / r["full_tokens"]
+        print(f"{r['size']:>9}{r['full_tokens']:>13.0f}{r['rag_tokens']:>12.0f}{cut:>8.1%}"
+              f"{r['full_latency_ms']:>12.0f}ms{r['rag_latency_ms']:>11.0f}ms"
+              f"{r['retrieve_ms']:>8.2f}ms{r['index_build_ms']:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Throughput and peak memory of the streaming catalog export.
+
+Pages are generated on demand from the synthetic catalog (so the source
+itself holds only one page) and written to a temporary file in each format.
+With --memory, peak Python heap is measured with tracemalloc (which slows
+the run down) to check that memory stays flat as the catalog grows. Timings
+include generating the synthetic pages.
+
+Usage:
+    python benchmarks/export_benchmark.py [--sizes 10000 100000] [--page-size 1000]
+           [--formats csv jsonl parquet] [--memory]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from policy_export import EXPORT_FORMATS, export_catalog, iter_pages  # noqa: E402
+from synthetic import make_policy  # noqa: E402
+
+
+def synthetic_fetcher(total, seed=42):
+    def fetch_page(offset, limit):
+        rng = random.Random(seed + offset)
+        return [make_policy(i, rng) for i in range(offset, min(offset + limit, total))]
+    return fetch_page
+
+
+def run(size, fmt, page_size, memory):
+    with tempfile.TemporaryFile() as out:
+        if memory:
+            tracemalloc.start()
+        try:
+            summary = export_catalog(iter_pages(synthetic_fetcher(size), page_size), out, fmt)
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] if memory else 0
+            tracemalloc.stop()
+        out.seek(0, os.SEEK_END)
+        summary["bytes"] = out.tell()
+    summary["peak_mb"] = peak / 1024 / 1024
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--formats", nargs="+", choices=EXPORT_FORMATS, default=EXPORT_FORMATS)
+    parser.add_argument("--memory", action="store_true", help="also report peak heap (slower)")
+    args = parser.parse_args()
+
+    print(f"{'policies':>9}{'format':>9}{'seconds':>10}{'policies/s':>12}{'MB out':>9}{'peak MB':>9}")
+    for size in args.sizes:
+        for fmt in args.formats:
+            try:
+                r = run(size, fmt, args.page_size, args.memory)
+            except RuntimeError as e:
+                print(f"{size:>9}{fmt:>9}  skipped: {e}")
+                continue
+            peak = f"{r['peak_mb']:.1f}" if args.memory else "-"
+            print(f"{size:>9}{fmt:>9}{r['elapsed_s']:>10.2f}{r['policies_per_s']:>12.0f}"
+                  f"{r['bytes'] / 1024 / 1024:>9.1f}{peak:>9}")
+
+
+if __name__ == "__main__":
+    main()
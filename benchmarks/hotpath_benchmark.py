@@ -0,0 +1,227 @@
+"""
+Micro-benchmarks of the client hot paths on synthetic catalogs.
+
+Cases (each timed per catalog size):
+  - call_api_decode: `response.json()` on a `/policies` body, as call_api does
+    (plain json.loads when requests isn't installed)
+  - call_api_decode_summary: the same on the `/policies?fields=...` body the
+    list pages fetch (LIST_FIELDS only)
+  - search_filter: the Search page's substring filter, four queries per call
+  - show_all_markdown: the chat's "show all policies" listing
+  - card_html: card HTML for every policy, formatted from scratch
+  - card_html_memo: the same through a warm CardRenderer (the pages' path)
+  - duplicate_scan_linear: the old submit-time duplicate check (scan every name)
+  - duplicate_lookup_index: the same check through PolicyIndex (build excluded)
+  - policy_index_build: building that PolicyIndex (expiry index included)
+  - expiring_scan: policies expiring in the next 30 days, by checking every policy
+  - expiring_index: the same range through the PolicyIndex expiry index
+
+Results are written as JSON (best and median seconds of --repeat runs). With
+--compare BASE.json the run is compared against an earlier result and cases
+whose best and median runs are both more than --threshold slower (and the
+median more than --min-delta-ms) are flagged as regressions (exit status 1);
+--against NEW.json compares two saved results without running anything.
+
+Usage:
+    python benchmarks/hotpath_benchmark.py [--sizes 1000 10000 100000] [--repeat 7]
+           [--out results.json] [--compare baseline.json] [--threshold 0.5] [--min-delta-ms 0.05]
+    python benchmarks/hotpath_benchmark.py --compare old.json --against new.json
+
+1M-policy catalogs (--sizes ... 1000000) need about 4 GB of memory.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from policy_index import PolicyIndex  # noqa: E402
+from local_backend.store import project  # noqa: E402
+from policy_render import LIST_FIELDS, CardRenderer, filter_policies, policy_card_html, policy_list_markdown  # noqa: E402
+from synthetic import make_catalog  # noqa: E402
+
+SEARCH_QUERIES = ["remote", "leave", "IT Department", "no-such-policy"]
+EXPIRY_WINDOW = ("2025-06-01", "2025-07-01")  # inside the synthetic catalogs' expiry range
+
+
+def make_decoder(body: bytes):
+    """`response.json()` on a real requests Response when available."""
+    try:
+        from requests.models import Response
+    except ImportError:
+        return lambda: json.loads(body), "json.loads"
+
+    def decode():
+        response = Response()
+        response._content = body
+        response.status_code = 200
+        return response.json()
+    return decode, "requests"
+
+
+def legacy_duplicate_scan(policies, name):
+    wanted = name.strip().lower()
+    return next((p for p in policies if p.get("name", "").strip().lower() == wanted), None)
+
+
+def cases(catalog):
+    """
+    (name, callable) pairs for one catalog and the response size per decode
+    case; setup work happens here, outside the timings.
+    """
+    body = json.dumps(catalog).encode("utf-8")
+    summary_body = json.dumps([project(p, LIST_FIELDS) for p in catalog]).encode("utf-8")
+    decode, decoder = make_decoder(body)
+    decode_summary, _ = make_decoder(summary_body)
+    index = PolicyIndex(catalog)
+    renderer = CardRenderer(max_cards=len(catalog))
+    renderer.render(catalog)
+    probe = catalog[len(catalog) // 2]["name"].upper()  # worst-ish case for the scan: found halfway
+    return decoder, [
+        ("call_api_decode", decode),
+        ("call_api_decode_summary", decode_summary),
+        ("search_filter", lambda: [filter_policies(catalog, q) for q in SEARCH_QUERIES]),
+        ("show_all_markdown", lambda: policy_list_markdown(catalog)),
+        ("card_html", lambda: "".join(policy_card_html(p) for p in catalog)),
+        ("card_html_memo", lambda: renderer.render(catalog)),
+        ("duplicate_scan_linear", lambda: legacy_duplicate_scan(catalog, probe)),
+        ("duplicate_lookup_index", lambda: index.find_by_name(probe)),
+        ("policy_index_build", lambda: PolicyIndex(catalog)),
+        ("expiring_scan", lambda: [p for p in catalog if p.get("expiry_date")
+                                   and EXPIRY_WINDOW[0] <= p["expiry_date"] <= EXPIRY_WINDOW[1]]),
+        ("expiring_index", lambda: index.expiry.between(*EXPIRY_WINDOW)),
+    ], {"call_api_decode": len(body), "call_api_decode_summary": len(summary_body)}
+
+
+def measure(fns, repeat, min_time=0.05):
+    """
+    Best and median seconds per call of each of `fns`; fast calls are looped
+    to at least `min_time` per sample. Samples are taken in rounds over all
+    `fns`, so a burst of load on the machine hits every case alike instead
+    of a few consecutive ones.
+    """
+    numbers = []
+    for fn in fns:
+        start = time.perf_counter()
+        fn()
+        once = time.perf_counter() - start
+        numbers.append(max(1, int(min_time / max(once, 1e-9))) if once < min_time else 1)
+    samples = [[] for _ in fns]
+    for _ in range(repeat):
+        for fn, number, out in zip(fns, numbers, samples):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            out.append((time.perf_counter() - start) / number)
+    return [(min(s), statistics.median(s)) for s in samples]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, only=None):
+    results, decoder = [], None
+    for size in sizes:
+        catalog = make_catalog(size)
+        decoder, size_cases, body_bytes = cases(catalog)
+        size_cases = [(name, fn) for name, fn in size_cases if not only or name in only]
+        timings = measure([fn for _, fn in size_cases], repeat)
+        for (name, _), (best, median) in zip(size_cases, timings):
+            results.append({"case": name, "size": size, "best_s": best, "median_s": median,
+                            "per_policy_ns": best / size * 1e9, "body_bytes": body_bytes.get(name)})
+            print(f"{name:>24}{size:>10}{best * 1000:>12.3f}{median * 1000:>12.3f}", file=sys.stderr)
+        del catalog
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "decoder": decoder,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(base, current, threshold, min_delta_ms=0.0):
+    """
+    Print a side-by-side table of medians; returns the list of regressed
+    (case, size). A case only counts as slower (or faster) when both its best
+    and its median run moved by more than `threshold`, and the median by
+    more than `min_delta_ms`, so jitter on a shared machine doesn't fail a
+    CI gate. Results saved without medians are compared on the best run.
+    """
+    before = {(r["case"], r["size"]): r for r in base["results"]}
+    print(f"Comparing {base['meta'].get('revision')} -> {current['meta'].get('revision')} "
+          f"(regression threshold {threshold:.0%} of best and median, and {min_delta_ms} ms)")
+    print(f"{'case':>24}{'size':>10}{'base ms':>12}{'new ms':>12}{'change':>9}")
+    regressions = []
+    for r in current["results"]:
+        key = (r["case"], r["size"])
+        if key not in before:
+            continue
+        old_best, old = before[key]["best_s"], before[key].get("median_s", before[key]["best_s"])
+        now = r.get("median_s", r["best_s"])
+        change = now / old - 1 if old else 0.0
+        best_change = r["best_s"] / old_best - 1 if old_best else 0.0
+        significant = abs(now - old) * 1000 > min_delta_ms
+        flag = ""
+        if significant and min(change, best_change) > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif significant and max(change, best_change) < -threshold:
+            flag = "  faster"
+        print(f"{r['case']:>24}{r['size']:>10}{old * 1000:>12.3f}{now * 1000:>12.3f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--cases", nargs="+", help="only run these cases")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", metavar="BASE.json", help="flag regressions against an earlier result")
+    parser.add_argument("--against", metavar="NEW.json", help="with --compare: compare two saved results")
+    # Identical code measured up to ~50% apart on a shared VM; tighten on a dedicated runner
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="relative slowdown of both the best and the median run counted as regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="smaller absolute changes of the median are never flagged")
+    args = parser.parse_args()
+
+    if args.against:
+        if not args.compare:
+            parser.error("--against needs --compare")
+        with open(args.against) as f:
+            current = json.load(f)
+    else:
+        print(f"{'case':>24}{'size':>10}{'best ms':>12}{'median ms':>12}", file=sys.stderr)
+        current = run(args.sizes, args.repeat, args.cases)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        if compare(base, current, args.threshold, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Concurrent-session load test of the Streamlit app against the local backend.
+
+Each simulated session is a `streamlit.testing.v1.AppTest` running
+fixed_app.py headless in this process, so a "rerun" is exactly what a
+browser interaction triggers on the server: the whole script executing with
+that session's state, sharing st.cache_resource objects and the GIL with the
+other sessions. Sessions loop over a page mix (All Policies, Search, Add,
+Chat, Statistics) for --duration seconds at each concurrency level.
+
+Reported per level:
+  - rerun latency p50/p95/p99, overall and per page
+  - throughput (reruns/s) and backend QPS (from the backend's /metrics)
+  - RSS of this process (standing in for the Streamlit server) and of the backend
+
+A seeded `python -m local_backend` is started unless --api points at a
+running backend (which must expose /metrics for the QPS column).
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 1 2 4 8 16] [--duration 30]
+           [--seed-policies 2000] [--chat-base-ms 400] [--mix all=3 search=3 add=1 chat=2 stats=1]
+           [--api URL] [--out load_results.json]
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+
+from latency_stats import percentile  # noqa: E402
+from local_backend.metrics import rss_bytes  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "fixed_app.py")
+PAGES = {
+    "all": "📋 All Policies",
+    "search": "🔍 Search Policies",
+    "add": "➕ Add Policy",
+    "chat": "🤖 AI Chat Assistant",
+    "stats": "📊 Statistics",
+}
+DEFAULT_MIX = ["all=3", "search=3", "add=1", "chat=2", "stats=1"]
+SEARCH_TERMS = ["remote", "leave", "password", "refund", "vpn", "travel", "onboarding"]
+CHAT_PROMPTS = ["Show me all policies", "What does the remote work policy say?", "How many HR policies are there?"]
+
+
+def latency_summary(seconds) -> dict:
+    ms = [s * 1000 for s in seconds]
+    return {"count": len(ms), "p50_ms": percentile(ms, 50, 0.0), "p95_ms": percentile(ms, 95, 0.0),
+            "p99_ms": percentile(ms, 99, 0.0)}
+
+
+class Session:
+    """One browser session: an AppTest instance driven through page flows."""
+
+    def __init__(self, number, seed, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.rng = random.Random(seed)
+        self.created = 0
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.at.run()  # first render (warm-up, not measured)
+
+    def _run(self, page, element, samples):
+        start = time.perf_counter()
+        element.run()
+        samples.append((page, time.perf_counter() - start, bool(self.at.exception)))
+
+    def step(self, page, samples):
+        """Navigate to `page` and do what a user does there; every rerun is one sample."""
+        at = self.at
+        self._run(page, at.sidebar.selectbox[0].select(PAGES[page]), samples)
+        if page == "search":
+            self._run(page, at.text_input[0].input(self.rng.choice(SEARCH_TERMS)), samples)
+        elif page == "add":
+            self.created += 1
+            at.text_input(key="add_policy_name").input(f"Load Test Policy {self.number}-{self.created}")
+            at.text_area[0].input("Created by the load test harness.")
+            submit = next(b for b in at.button if "Create Policy" in str(b.label))
+            self._run(page, submit.click(), samples)
+        elif page == "chat":
+            self._run(page, at.chat_input[0].set_value(self.rng.choice(CHAT_PROMPTS)), samples)
+
+
+def backend_metrics(api):
+    try:
+        res = requests.get(f"{api}/metrics", timeout=5)
+        return res.json() if res.ok else None
+    except requests.RequestException:
+        return None
+
+
+def run_level(concurrency, duration, mix, api, timeout, seed):
+    pages, weights = zip(*mix.items())
+    sessions = [Session(i, seed + i, timeout) for i in range(concurrency)]
+    samples, lock, errors = [], threading.Lock(), []
+    before = backend_metrics(api)
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def drive(session):
+        local = []
+        while time.perf_counter() < deadline:
+            try:
+                session.step(session.rng.choices(pages, weights)[0], local)
+            except Exception as e:  # a broken flow shouldn't stop the other sessions
+                errors.append(repr(e))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=drive, args=(s,)) for s in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    after = backend_metrics(api)
+
+    result = {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "reruns": len(samples),
+        "reruns_per_s": round(len(samples) / elapsed, 2),
+        "errors": len(errors) + sum(1 for _, _, failed in samples if failed),
+        "latency": latency_summary([s for _, s, _ in samples]),
+        "pages": {p: latency_summary([s for page, s, _ in samples if page == p]) for p in pages},
+        "app_rss_mb": round(rss_bytes() / 1024 / 1024, 1),
+    }
+    if before and after:
+        result["backend_qps"] = round((after["requests"] - before["requests"]) / elapsed, 1)
+        result["backend_rss_mb"] = round(after["rss_bytes"] / 1024 / 1024, 1)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def start_backend(args):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    cmd = [sys.executable, "-m", "local_backend", "--port", str(port),
+           "--seed-policies", str(args.seed_policies), "--chat-base-ms", str(args.chat_base_ms)]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    api = f"http://127.0.0.1:{port}"
+    for _ in range(120):
+        try:
+            if requests.get(f"{api}/", timeout=1).ok:
+                return proc, api
+        except requests.RequestException:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.5)
+    proc.kill()
+    raise SystemExit("local backend did not start (is fastapi/uvicorn installed?)")
+
+
+def print_report(results):
+    print(f"{'sessions':>8}{'reruns/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'api qps':>9}{'api MB':>8}{'app MB':>8}{'errors':>8}")
+    for r in results:
+        lat = r["latency"]
+        print(f"{r['concurrency']:>8}{r['reruns_per_s']:>10.1f}{lat['p50_ms']:>9.0f}{lat['p95_ms']:>9.0f}"
+              f"{lat['p99_ms']:>9.0f}{r.get('backend_qps', 0):>9.1f}{r.get('backend_rss_mb', 0):>8.0f}"
+              f"{r['app_rss_mb']:>8.0f}{r['errors']:>8}")
+
+    print("\nPer-page rerun latency (p50 / p95 / p99 ms):")
+    for r in results:
+        cells = [f"{p} {s['p50_ms']:.0f}/{s['p95_ms']:.0f}/{s['p99_ms']:.0f}" for p, s in r["pages"].items() if s["count"]]
+        print(f"  {r['concurrency']:>3} sessions: " + "  ".join(cells))
+
+    print("\nThroughput curve (reruns/s):")
+    peak = max(r["reruns_per_s"] for r in results) or 1
+    for r in results:
+        print(f"  {r['concurrency']:>3} | {'#' * round(40 * r['reruns_per_s'] / peak)} {r['reruns_per_s']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=30, help="seconds per concurrency level")
+    parser.add_argument("--mix", nargs="+", default=DEFAULT_MIX, help="page=weight pairs")
+    parser.add_argument("--api", help="use a running backend instead of starting one")
+    parser.add_argument("--seed-policies", type=int, default=2000)
+    parser.add_argument("--chat-base-ms", type=float, default=400)
+    parser.add_argument("--timeout", type=float, default=120, help="max seconds for one rerun")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    mix = {}
+    for pair in args.mix:
+        page, _, weight = pair.partition("=")
+        if page not in PAGES:
+            parser.error(f"unknown page {page!r}; choose from {', '.join(PAGES)}")
+        mix[page] = float(weight or 1)
+
+    proc = None
+    if args.api:
+        api = args.api.rstrip("/")
+    else:
+        proc, api = start_backend(args)
+    # The app reads these at every rerun; keep its local state files out of the repo
+    scratch = tempfile.mkdtemp(prefix="load_test_")
+    os.environ.update({
+        "API_BASE_URL": api,
+        "DOCUMENT_INDEX_PATH": os.path.join(scratch, "document_index.db"),
+        "WRITE_JOURNAL_PATH": os.path.join(scratch, "write_journal.db"),
+        "STATS_HISTORY_PATH": os.path.join(scratch, "stats_history.db"),
+    })
+
+    results = []
+    try:
+        for level in args.concurrency:
+            print(f"Running {level} session(s) for {args.duration:.0f}s...", file=sys.stderr)
+            results.append(run_level(level, args.duration, mix, api, args.timeout, args.seed))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print_report(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"api": api, "mix": mix, "duration_s": args.duration, "levels": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Cold-start benchmark of the Streamlit app: import time and first render.
+
+Measured in fresh interpreters, so nothing is warm in sys.modules:
+  - per module imported at the top of fixed_app.py: cumulative import time
+    from `python -X importtime` (best of --repeat)
+  - all of those imports together, which is what a new server process pays
+    before the first page can render
+  - modules the app only imports where they are used (pandas), for reference
+  - with streamlit installed: the first AppTest run of fixed_app.py (cold
+    imports + first render) and a second run of the same session (a rerun)
+
+Start a backend first (`python -m local_backend --seed-policies 2000`) and
+pass --api; without one the render measures the app's offline path.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--repeat 5] [--api http://127.0.0.1:8000] [--out startup.json]
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "fixed_app.py")
+LAZY_MODULES = ["pandas"]  # imported inside the pages that need them
+
+RENDER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+loaded = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+first = time.perf_counter()
+at.run()
+second = time.perf_counter()
+print(json.dumps({"streamlit_import_s": loaded - start, "first_run_s": first - loaded,
+                  "rerun_s": second - first, "exception": bool(at.exception),
+                  "pandas_loaded": "pandas" in sys.modules}))
+"""
+
+
+def top_level_imports(path=APP_PATH) -> list:
+    """Top-level package names imported at module level of `path`, in order."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module.split(".")[0])
+    return list(dict.fromkeys(names))
+
+
+def import_seconds(modules) -> float:
+    """Wall time of importing `modules` in a fresh interpreter; None if one is missing."""
+    code = f"import time; s = time.perf_counter(); import {', '.join(modules)}; print(time.perf_counter() - s)"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return float(proc.stdout) if proc.returncode == 0 else None
+
+
+def importtime_seconds(module) -> float:
+    """Cumulative `-X importtime` figure for one module; None if it can't be imported."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def best(fn, repeat):
+    samples = [fn() for _ in range(repeat)]
+    return None if None in samples else min(samples)
+
+
+def first_render(api, repeat):
+    scratch = tempfile.mkdtemp(prefix="startup_")
+    env = {**os.environ, "API_BASE_URL": api,
+           "DOCUMENT_INDEX_PATH": os.path.join(scratch, "document_index.db"),
+           "WRITE_JOURNAL_PATH": os.path.join(scratch, "write_journal.db"),
+           "STATS_HISTORY_PATH": os.path.join(scratch, "stats_history.db")}
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", RENDER_SCRIPT, APP_PATH], cwd=ROOT, env=env,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    summary = {k: statistics.median(r[k] for r in runs)
+               for k in ("streamlit_import_s", "first_run_s", "rerun_s")}
+    summary["exception"] = any(r["exception"] for r in runs)
+    summary["pandas_loaded"] = any(r["pandas_loaded"] for r in runs)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--api", default=os.getenv("API_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--no-render", action="store_true", help="skip the AppTest first-render runs")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    modules = top_level_imports()
+    per_module = {m: best(lambda m=m: importtime_seconds(m), args.repeat) for m in modules + LAZY_MODULES}
+    available = [m for m in modules if per_module[m] is not None]
+    result = {
+        "top_level_imports": modules,
+        "missing": [m for m in modules if per_module[m] is None],
+        "import_s": per_module,
+        "app_imports_s": best(lambda: import_seconds(available), args.repeat),
+    }
+
+    print(f"{'module':<24}{'import ms':>12}")
+    for m in sorted(per_module, key=lambda m: -(per_module[m] or 0)):
+        note = " (lazy)" if m in LAZY_MODULES else ""
+        cost = f"{per_module[m] * 1000:>12.1f}" if per_module[m] is not None else f"{'missing':>12}"
+        print(f"{m + note:<24}{cost}")
+    print(f"{'all app imports':<24}{result['app_imports_s'] * 1000:>12.1f}")
+
+    if not args.no_render:
+        try:
+            import streamlit  # noqa: F401
+        except ImportError:
+            result["render"] = {"error": "streamlit is not installed"}
+        else:
+            result["render"] = first_render(args.api, args.repeat)
+        render = result["render"]
+        if "error" in render:
+            print(f"\nfirst render: skipped ({render['error']})")
+        else:
+            print(f"\nstreamlit import {render['streamlit_import_s'] * 1000:.0f} ms, "
+                  f"first run {render['first_run_s'] * 1000:.0f} ms, rerun {render['rerun_s'] * 1000:.0f} ms"
+                  f"{' (app raised)' if render['exception'] else ''}; "
+                  f"pandas {'loaded' if render['pandas_loaded'] else 'not loaded'} by the first page")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark of the local backend's `/stats`: maintained counters vs a full scan.
+
+For each catalog size a seeded PolicyStore is timed on:
+  - stats: `store.stats()` served from the incrementally maintained counters
+  - stats_next_day: `store.stats()` right after the calendar moves one day on
+    (only policies taking effect or expiring that day are re-checked)
+  - full_scan: the same counts by walking every policy (`scan_stats`), what
+    `/stats` did before
+  - create_delete: one create plus one delete, to show the bookkeeping the
+    counters add to writes
+
+Before timing, the counters are checked against the full scan.
+
+Usage:
+    python benchmarks/stats_benchmark.py [--sizes 1000 10000 100000] [--repeat 5] [--json OUT]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_backend.aggregates import scan_stats  # noqa: E402
+from local_backend.seed import seed_store  # noqa: E402
+from local_backend.store import PolicyStore  # noqa: E402
+
+
+def measure(fn, repeat, number):
+    """Best and median microseconds per call over `repeat` samples of `number` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    return min(samples), statistics.median(samples)
+
+
+def run_size(size, repeat):
+    store = PolicyStore()
+    seed_store(store, size, documents=False)
+    today = date.today()
+
+    counted = store.stats(today.isoformat())
+    scanned = scan_stats(store._policies.values(), today.isoformat())
+    if counted["by_type"] != scanned["by_type"] or counted["documents"] != scanned["documents"]:
+        raise SystemExit(f"counters disagree with the full scan at {size} policies")
+
+    days = iter(range(1, 10**6))
+
+    def next_day():
+        store.stats((today + timedelta(days=next(days))).isoformat())
+
+    def create_delete():
+        policy = store.create({"name": "Benchmark Policy", "type": "HR"})
+        store.delete(policy["id"])
+
+    cases = [
+        ("stats", lambda: store.stats(), 1000),
+        ("stats_next_day", next_day, 100),
+        ("full_scan", lambda: scan_stats(store._policies.values(), today.isoformat()), max(1, 100_000 // size)),
+        ("create_delete", create_delete, 200),
+    ]
+    results = []
+    for name, fn, number in cases:
+        best, median = measure(fn, repeat, number)
+        results.append({"case": name, "size": size, "best_us": round(best, 2), "median_us": round(median, 2)})
+        print(f"{name:>16}{size:>10}{best:>14.1f}{median:>14.1f}", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results as JSON")
+    args = parser.parse_args()
+
+    print(f"{'case':>16}{'size':>10}{'best us':>14}{'median us':>14}", file=sys.stderr)
+    results = [r for size in args.sizes for r in run_size(size, args.repeat)]
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
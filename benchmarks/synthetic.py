@@ -0,0 +1,8 @@
+"""
+Synthetic policy catalogs for benchmarks.
+
+`make_catalog(n)` returns `n` policy dicts shaped like the `/policies`
+response, deterministic for a given seed. The generator lives in
+`local_backend.seed` so the local backend can be seeded with the same data.
+"""
+from local_backend.seed import FILLER, SCOPES, TOPICS, make_catalog, make_policy  # noqa: F401
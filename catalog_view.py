@@ -0,0 +1,118 @@
+"""
+Session view of the policy catalog with optimistic mutations.
+
+The view starts from a `/policies` snapshot. Creates, deletes and updates
+are applied to it immediately and recorded as pending mutations; when the
+backend answers, the mutation is confirmed (the server's copy of the policy
+replaces the optimistic one) or rolled back (the view is restored to what
+it was before). The page therefore never has to refetch the whole catalog
+just to show the result of a write.
+"""
+import itertools
+import time
+import uuid
+from dataclasses import dataclass, field
+
+PENDING_FLAG = "_pending"  # set on optimistic policies until the server confirms them
+REVISION_KEY = "_revision"  # bumped by every local update, so caches keyed on `updated_at` see the change
+
+
+@dataclass
+class Mutation:
+    id: int
+    kind: str  # "create", "delete" or "update"
+    label: str
+    before: dict  # policy id -> policy before the change (None for a create)
+    started_at: float = field(default_factory=time.time)
+    future: object = None  # background call, when the write runs off the script thread
+
+    @property
+    def policy_ids(self) -> list:
+        return list(self.before)
+
+
+class CatalogView:
+    """Ordered id -> policy map plus the mutations not yet confirmed by the backend."""
+
+    def __init__(self, policies):
+        self._policies = {p["id"]: p for p in policies}
+        self._order = {pid: i for i, pid in enumerate(self._policies)}  # original positions, for rollback
+        self.fetched_at = time.time()
+        self.pending = {}
+        self._ids = itertools.count(1)
+        self._revisions = itertools.count(1)
+
+    def __len__(self):
+        return len(self._policies)
+
+    def policies(self) -> list:
+        return list(self._policies.values())
+
+    def get(self, policy_id):
+        return self._policies.get(policy_id)
+
+    def apply_create(self, fields: dict, label: str = None) -> Mutation:
+        temp_id = f"pending-{uuid.uuid4().hex[:12]}"
+        self._policies[temp_id] = {"id": temp_id, "documents": [], **fields, PENDING_FLAG: True}
+        return self._track("create", label or f"Create '{fields.get('name')}'", {temp_id: None})
+
+    def apply_delete(self, policy_ids, label: str = None) -> Mutation:
+        before = {pid: self._policies.pop(pid) for pid in policy_ids if pid in self._policies}
+        return self._track("delete", label or f"Delete {len(before)} policies", before)
+
+    def apply_update(self, policy_ids, changes: dict, label: str = None) -> Mutation:
+        before = {}
+        for pid in policy_ids:
+            if pid in self._policies:
+                before[pid] = self._policies[pid]
+                self._policies[pid] = {**before[pid], **changes, PENDING_FLAG: True,
+                                       REVISION_KEY: next(self._revisions)}
+        return self._track("update", label or f"Update {len(before)} policies", before)
+
+    def confirm(self, mutation: Mutation, server_policies=None):
+        """
+        Accept the change. `server_policies` (the backend's copies) replace the
+        optimistic ones; without them the optimistic state is kept as is,
+        including the REVISION_KEY that tells it apart from the pre-update copy
+        (its `updated_at` is still the old one).
+        """
+        self.pending.pop(mutation.id, None)
+        server_policies = [p for p in server_policies or [] if isinstance(p, dict) and p.get("id")]
+        if mutation.kind == "create":
+            temp_id = mutation.policy_ids[0]
+            optimistic = self._policies.pop(temp_id, None)
+            if server_policies:
+                self._policies[server_policies[0]["id"]] = server_policies[0]
+            elif optimistic is not None:
+                self._policies[temp_id] = optimistic  # e.g. queued offline: keep showing it
+            return
+        by_id = {p["id"]: p for p in server_policies}
+        for pid in mutation.policy_ids:
+            if mutation.kind == "update" and pid in self._policies:
+                self._policies[pid] = by_id.get(pid) or {
+                    k: v for k, v in self._policies[pid].items() if k != PENDING_FLAG
+                }
+
+    def rollback(self, mutation: Mutation, policy_ids=None):
+        """Undo the change for all (or only `policy_ids`) of the mutation's policies."""
+        ids = mutation.policy_ids if policy_ids is None else [i for i in policy_ids if i in mutation.before]
+        if policy_ids is None or set(ids) == set(mutation.policy_ids):
+            self.pending.pop(mutation.id, None)
+        if mutation.kind == "create":
+            for pid in ids:
+                self._policies.pop(pid, None)
+        elif mutation.kind == "update":
+            for pid in ids:
+                if pid in self._policies:
+                    self._policies[pid] = mutation.before[pid]
+        else:
+            for pid in ids:
+                self._policies[pid] = mutation.before[pid]
+            # Put restored policies back where they were
+            end = len(self._order)
+            self._policies = dict(sorted(self._policies.items(), key=lambda kv: self._order.get(kv[0], end)))
+
+    def _track(self, kind, label, before) -> Mutation:
+        mutation = Mutation(next(self._ids), kind, label, before)
+        self.pending[mutation.id] = mutation
+        return mutation
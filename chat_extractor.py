@@ -0,0 +1,303 @@
+"""
+Rule-based field extractor for chat "add" commands.
+
+Parses prompts that follow the documented examples, e.g.
+    "Add a new HR policy called 'Remote Work Guidelines' for All Employees"
+into the same shape as the LLM's `extracted_data`, so the chat can create the
+policy directly instead of waiting on `/chat`. Only results marked `confident`
+should be acted on; anything else falls back to the LLM.
+
+`extract_expiry_query` likewise recognises "Show me expired policies" and
+"Which policies expire in the next 30 days?" so they can be answered from
+the local expiry index.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from policy_schema import ALLOWED_TYPES
+
+# Verbs that start an "add" command ("Add a new ...", "Create an ...")
+_ADD_RE = re.compile(r"^\s*(?:please\s+)?(?:add|create|register)\b", re.IGNORECASE)
+# Verbs that make an "add"-looking prompt really about an existing policy
+_MODIFY_RE = re.compile(r"\b(?:update|change|edit|modify|rename|delete|remove|replace)(?:s|d|ed)?\b",
+                        re.IGNORECASE)
+_POLICY_RE = re.compile(r"\bpolic(?:y|ies)\b", re.IGNORECASE)
+
+# Quoted names: 'X', "X", ‘X’, “X”
+_QUOTED_RE = re.compile(r"""(?:(?<!\w)'([^']+)'(?!\w)|"([^"]+)"|‘([^’]+)’|“([^”]+)”)""")
+
+_DATE_TOKEN = r"(\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}|[A-Za-z]{3,9}\.?\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}|\d{1,2}(?:st|nd|rd|th)?\s+[A-Za-z]{3,9}\.?,?\s+\d{4}|today)"
+_EFFECTIVE_KW = r"(?:effective(?:\s+from|\s+on)?|from|starting(?:\s+on)?|starts?(?:\s+on)?|valid\s+from)"
+_EXPIRY_KW = r"(?:expir(?:es|ing|y)(?:\s+on)?|until|through|till|ends?(?:\s+on)?|valid\s+until)"
+_EFFECTIVE_RE = re.compile(r"\b" + _EFFECTIVE_KW + r"\s+" + _DATE_TOKEN, re.IGNORECASE)
+_EXPIRY_RE = re.compile(r"\b" + _EXPIRY_KW + r"\s+" + _DATE_TOKEN, re.IGNORECASE)
+
+# A name/scope/description phrase ends at the next clause: another keyword,
+# a date phrase, punctuation or the end of the prompt
+_DATE_CLAUSE = r"\s+(?:" + _EFFECTIVE_KW + "|" + _EXPIRY_KW + r")\s+" + _DATE_TOKEN
+# Any date keyword: one that isn't the start of a parsed date clause means a
+# date phrase the parser doesn't understand ("expiring in 30 days", "effective
+# tomorrow"). "from", "starting" etc. are also everyday words, so inside a
+# description ("about working from home") only the unambiguous ones count.
+_STRONG_DATE_KW_RE = re.compile(r"\b(?:effective|expir\w*|valid|until|till)\b", re.IGNORECASE)
+_WEAK_DATE_KW_RE = re.compile(r"\b(?:from|through|starting|starts?|ends?|begin(?:s|ning)?)\b", re.IGNORECASE)
+# A scope is an audience ("All Employees"), never a time
+_SCOPE_TIME_RE = re.compile(
+    r"\b(?:today|tomorrow|yesterday|next|days?|weeks?|months?|years?|\d{4})\b", re.IGNORECASE)
+_NUMERIC_DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})/\d{4}$")
+
+_DESC_END = r"(?=" + _DATE_CLAUSE + r"|[.;!?](?:\s|$)|$)"
+_CLAUSE_END = r"(?=\s+(?:for|about|regarding|covering|called|named|titled)\b|" + _DATE_CLAUSE + r"|[,;!?]|\.(?:\s|$)|$)"
+
+# Unquoted: "called X" / "named X" / "titled X"
+_CALLED_RE = re.compile(r"\b(?:called|named|titled)\s+(.+?)" + _CLAUSE_END, re.IGNORECASE)
+
+# "IT" is only a type when written in caps (otherwise it's the pronoun "it")
+_TYPE_RES = {
+    "HR": re.compile(r"\bHR\b", re.IGNORECASE),
+    "IT": re.compile(r"\bIT\b"),
+    "Leave": re.compile(r"\bleave\b", re.IGNORECASE),
+    "Customer": re.compile(r"\bcustomer\b", re.IGNORECASE),
+}
+# A type word directly qualifying "policy" ("an IT policy") wins over loose mentions
+_TYPED_POLICY_RE = re.compile(r"\b(HR|IT|leave|customer)\s+polic(?:y|ies)\b", re.IGNORECASE)
+
+_SCOPE_RE = re.compile(r"\bfor\s+(?:the\s+)?(.+?)" + _CLAUSE_END, re.IGNORECASE)
+_ABOUT_RE = re.compile(r"\b(?:about|regarding|covering)\s+(.+?)" + _DESC_END, re.IGNORECASE)
+
+# Expiry questions: "expired HR policies", "expiring soon", "expire within 2 weeks"
+_EXPIRED_RE = re.compile(r"\bexpired\b", re.IGNORECASE)
+_EXPIRING_RE = re.compile(r"\bexpir(?:ing|es|e)\b", re.IGNORECASE)
+_WINDOW_RE = re.compile(r"\b(?:within|in(?:\s+the)?(?:\s+next)?|next)\s+(\d+)\s+(day|week|month)s?\b", re.IGNORECASE)
+_THIS_RE = re.compile(r"\bthis\s+(week|month)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(?:update|change|set|delete|remove|renew|extend|attach|upload)\b", re.IGNORECASE)
+# Questions the local index can't answer exactly: negations, time phrases other
+# than "within/next N days|weeks|months" and "this week|month", and
+# questions about one named policy ("Does the Remote Work policy expire?")
+_NEGATION_RE = re.compile(r"\b(?:not|never|no|without)\b|n't\b", re.IGNORECASE)
+_TIME_WORD_RE = re.compile(
+    r"\b(?:years?|quarters?|months?|weeks?|days?|today|tonight|tomorrow|yesterday|last|past|previous|ago|"
+    r"since|before|after|end|until|till|recently|already|ever)\b", re.IGNORECASE)
+_PLURAL_POLICIES_RE = re.compile(r"\bpolicies\b", re.IGNORECASE)
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30}
+_ANY_DATE_RE = re.compile(r"\b" + _DATE_TOKEN, re.IGNORECASE)
+DEFAULT_EXPIRING_DAYS = 30
+
+_DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y"]
+
+
+@dataclass
+class Extraction:
+    """Result of `extract_add_fields`; `fields` mirrors the LLM's `extracted_data`."""
+    is_add: bool
+    fields: dict = field(default_factory=dict)
+    missing: list = field(default_factory=list)
+    problems: list = field(default_factory=list)
+
+    @property
+    def confident(self) -> bool:
+        return self.is_add and not self.missing and not self.problems
+
+
+@dataclass
+class ExpiryQuery:
+    """Result of `extract_expiry_query`: expired policies, or those expiring within `days`."""
+    kind: str  # "expired" or "expiring"
+    days: int = None
+    type: str = None  # only policies of this type
+
+
+def parse_date(token: str):
+    """Parse a date phrase into a `date`, or None if unrecognised."""
+    token = (token or "").strip().rstrip(".,")
+    if token.lower() == "today":
+        return date.today()
+    cleaned = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", token).replace(",", "").replace(".", "")
+    cleaned = re.sub(r"\s+", " ", cleaned)
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _ambiguous_date(token: str) -> bool:
+    """True for numeric dates that read differently as dd/mm and mm/dd ("03/04/2026")."""
+    m = _NUMERIC_DATE_RE.match((token or "").strip().rstrip(".,"))
+    return bool(m) and m.group(1) != m.group(2) and int(m.group(1)) <= 12 and int(m.group(2)) <= 12
+
+
+def _extract_date(rest: str, pattern, label: str, problems: list):
+    """The ISO date of every `pattern` clause in `rest` if they all agree, else None."""
+    found = set()
+    for match in pattern.finditer(rest):
+        token = match.group(1)
+        parsed = parse_date(token)
+        if parsed is None:
+            problems.append(f"unparsed {label} date: {token}")
+        elif _ambiguous_date(token):
+            problems.append(f"ambiguous {label} date: {token}")
+        else:
+            found.add(parsed.isoformat())
+    if len(found) > 1:
+        problems.append(f"conflicting {label} dates: {', '.join(sorted(found))}")
+        return None
+    return found.pop() if found else None
+
+
+def _unparsed_date_phrases(rest: str, about) -> list:
+    """Date keywords in `rest` that don't start a date clause the parser understood."""
+    parsed = [m.span() for rx in (_EFFECTIVE_RE, _EXPIRY_RE) for m in rx.finditer(rest)]
+    in_description = (lambda pos: about.start(1) <= pos < about.end(1)) if about else (lambda pos: False)
+    phrases = []
+    for rx, strong in ((_STRONG_DATE_KW_RE, True), (_WEAK_DATE_KW_RE, False)):
+        for m in rx.finditer(rest):
+            if any(start <= m.start() < end for start, end in parsed):
+                continue
+            if strong or not in_description(m.start()):
+                phrases.append(rest[m.start():m.start() + 30].strip())
+    return phrases
+
+
+def _clean(value: str) -> str:
+    return (value or "").strip().strip("'\"‘’“”").strip()
+
+
+def _extract_name(text: str):
+    quoted = _QUOTED_RE.search(text)
+    if quoted:
+        return _clean(next(g for g in quoted.groups() if g))
+    called = _CALLED_RE.search(text)
+    if called:
+        return _clean(called.group(1))
+    return None
+
+
+def _extract_type(text: str, problems: list):
+    """`text` has the name, scope and description phrases already removed."""
+    typed = {_canonical_type(m.group(1)) for m in _TYPED_POLICY_RE.finditer(text)}
+    typed.discard(None)
+    if len(typed) == 1:
+        return typed.pop()
+    if len(typed) > 1:
+        problems.append(f"ambiguous type: {', '.join(sorted(typed))}")
+        return None
+    loose = [t for t, rx in _TYPE_RES.items() if rx.search(text)]
+    if len(loose) > 1:
+        problems.append(f"ambiguous type: {', '.join(loose)}")
+        return None
+    return loose[0] if loose else None
+
+
+def _canonical_type(word: str):
+    if word == "IT":
+        return "IT"
+    for t in ALLOWED_TYPES:
+        if t != "IT" and t.lower() == word.lower():
+            return t
+    return None
+
+
+def extract_add_fields(text: str) -> Extraction:
+    """
+    Extract name, type, scope, description and dates from an "add policy" prompt.
+
+    Missing optional fields (scope, dates) are left out so the caller can apply
+    the same defaults as the LLM path.
+    """
+    text = (text or "").strip()
+    result = Extraction(is_add=bool(_ADD_RE.search(text) and _POLICY_RE.search(text)))
+    if not result.is_add:
+        return result
+
+    if _MODIFY_RE.search(_QUOTED_RE.sub(" ", text)):
+        result.problems.append("mentions changing an existing policy")
+
+    name = _extract_name(text)
+    if name:
+        result.fields["name"] = name
+    else:
+        result.missing.append("name")
+
+    # Scope/description/date phrases are matched outside the name, so a name
+    # like 'IT Leave Rules' can't leak into the type or scope
+    rest = _QUOTED_RE.sub(" ", text)
+    if not _QUOTED_RE.search(text) and name:
+        rest = rest.replace(name, " ", 1)
+
+    head = rest
+    about = _ABOUT_RE.search(rest)
+    scope = _SCOPE_RE.search(rest)
+    # "about paid leave for family emergencies": that "for" belongs to the description
+    if scope and about and about.start() < scope.start() < about.end():
+        scope = None
+    if scope:
+        result.fields["scope"] = _clean(scope.group(1))
+        head = head.replace(scope.group(0), " ", 1)
+        if _SCOPE_TIME_RE.search(result.fields["scope"]) or _STRONG_DATE_KW_RE.search(result.fields["scope"]):
+            result.problems.append(f"scope looks like a date: {result.fields['scope']}")
+    if about:
+        result.fields["description"] = _clean(about.group(1))
+        head = head.replace(about.group(0), " ", 1)
+        if not result.fields["description"]:
+            del result.fields["description"]
+            result.problems.append("empty description")  # "about 'B'": the quoted text was the name
+
+    ptype = _extract_type(head, result.problems)
+    if ptype:
+        result.fields["type"] = ptype
+    elif not result.problems:
+        result.missing.append("type")
+
+    for key, pattern, label in (("effective_date", _EFFECTIVE_RE, "effective"),
+                                ("expiry_date", _EXPIRY_RE, "expiry")):
+        parsed = _extract_date(rest, pattern, label, result.problems)
+        if parsed:
+            result.fields[key] = parsed
+    for phrase in _unparsed_date_phrases(rest, about):
+        result.problems.append(f"unparsed date phrase: {phrase}")
+
+    eff, exp = result.fields.get("effective_date"), result.fields.get("expiry_date")
+    if exp and exp < (eff or date.today().isoformat()):
+        result.problems.append("expiry date is before effective date")
+
+    return result
+
+
+def extract_expiry_query(text: str):
+    """
+    An ExpiryQuery for a question about expired or soon-expiring policies, or
+    None for anything else: adds and updates that mention expiry, negations,
+    time phrases other than a "next N days/weeks/months" or "this week/month"
+    window, questions about one policy, and ones naming several types.
+    """
+    text = (text or "").strip()
+    if not _PLURAL_POLICIES_RE.search(text) or _ADD_RE.search(text) or _WRITE_RE.search(text):
+        return None  # questions about a single policy, adds and updates are left to the LLM
+    if _ANY_DATE_RE.search(text) or _NEGATION_RE.search(text) or _QUOTED_RE.search(text):
+        return None
+    types = {_canonical_type(m.group(1)) for m in _TYPED_POLICY_RE.finditer(text)} - {None}
+    types.update(t for t, rx in _TYPE_RES.items() if rx.search(text))
+    if len(types) > 1:
+        return None
+    ptype = types.pop() if types else None
+    window, this = _WINDOW_RE.search(text), _THIS_RE.search(text)
+    rest = text
+    for match in (window, this):
+        if match:
+            rest = rest.replace(match.group(0), " ", 1)
+    if _TIME_WORD_RE.search(rest):
+        return None  # "expired last month", "expire this year", "expiring tomorrow"
+    if _EXPIRED_RE.search(text):
+        return None if window or this else ExpiryQuery("expired", type=ptype)
+    if _EXPIRING_RE.search(text):
+        if window:
+            days = int(window.group(1)) * _UNIT_DAYS[window.group(2).lower()]
+        elif this:
+            days = _UNIT_DAYS[this.group(1).lower()]
+        else:
+            days = DEFAULT_EXPIRING_DAYS
+        return ExpiryQuery("expiring", days=days, type=ptype)
+    return None
@@ -0,0 +1,123 @@
+"""
+Per-stage latency spans for chat turns.
+
+Each call to `enhanced_chat_with_ai` records one `ChatTrace` with a span per
+stage (`/policies` lookup, local extraction, `/chat` LLM call, create POST,
+file upload), tagged with the turn's intent, payload sizes and outcome.
+With CHAT_TRACE_PATH set, finished traces are also appended as one JSON
+line each to that file, so p50/p95/p99 breakdowns can be built offline:
+
+    CHAT_TRACE_PATH=chat_traces.jsonl streamlit run fixed_app.py
+    python chat_telemetry.py chat_traces.jsonl
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from latency_stats import percentile
+
+# Exporting is opt-in: the file grows by one line per chat turn and is never trimmed
+TRACE_PATH = os.getenv("CHAT_TRACE_PATH", "")
+_write_lock = threading.Lock()
+
+
+class ChatTrace:
+    """Spans for a single chat turn."""
+
+    def __init__(self, message: str):
+        self.turn_id = uuid.uuid4().hex[:12]
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.message_bytes = len((message or "").encode("utf-8"))
+        self.intent = "unknown"
+        self.outcome = None
+        self.spans = []
+        self._t0 = time.perf_counter()
+        self.total_ms = None
+
+    @contextmanager
+    def span(self, stage: str, **attrs):
+        """Time a stage; the yielded dict can be filled with sizes/status inside the block."""
+        record = {"stage": stage, **attrs}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            record["offset_ms"] = round((start - self._t0) * 1000, 3)
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self.spans.append(record)
+
+    def finish(self, outcome: str):
+        self.outcome = outcome
+        self.total_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "turn_id": self.turn_id,
+            "started_at": self.started_at,
+            "intent": self.intent,
+            "outcome": self.outcome,
+            "message_bytes": self.message_bytes,
+            "total_ms": self.total_ms,
+            "spans": self.spans,
+        }
+
+
+def export_trace(trace: ChatTrace, path: str = TRACE_PATH):
+    """Append a finished trace to the JSONL export (no-op when path is empty)."""
+    if not path:
+        return
+    line = json.dumps(trace.to_dict(), ensure_ascii=False)
+    with _write_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def load_traces(path: str = TRACE_PATH) -> list:
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                traces.append(json.loads(line))
+    return traces
+
+
+def latency_breakdown(traces) -> list:
+    """
+    p50/p95/p99 per (intent, stage) over trace dicts; the "total" stage is the
+    whole turn. Returns rows sorted by intent then stage.
+    """
+    buckets = defaultdict(list)
+    for t in traces:
+        if t.get("total_ms") is not None:
+            buckets[(t["intent"], "total")].append(t["total_ms"])
+        for s in t.get("spans", []):
+            buckets[(t["intent"], s["stage"])].append(s["duration_ms"])
+    rows = []
+    for (intent, stage), values in sorted(buckets.items()):
+        rows.append({
+            "intent": intent,
+            "stage": stage,
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else TRACE_PATH or "chat_traces.jsonl"
+    print(f"{'intent':<14}{'stage':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for row in latency_breakdown(load_traces(source)):
+        print(f"{row['intent']:<14}{row['stage']:<18}{row['count']:>7}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
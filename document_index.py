@@ -0,0 +1,190 @@
+"""
+Background text extraction and full-text index for policy attachments.
+
+Uploaded documents (pdf/doc/docx/txt) are parsed in a process pool so the
+Streamlit script never waits on a parser; the extracted pages go into a
+SQLite FTS5 index keyed by content hash (each distinct file is parsed once,
+however many policies link it). Search hits point into the matching
+document: policy, filename, page and a highlighted snippet.
+
+PDF extraction needs the optional `pypdf` package; docx and txt use the
+standard library and legacy .doc files get a best-effort text scrape.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from io import BytesIO
+
+MAX_TEXT_CHARS = 2_000_000  # per document, to bound index size
+_DOCX_PARAGRAPH_RE = re.compile(r"</w:p>")
+_XML_TAG_RE = re.compile(r"<[^>]+>")
+_DOC_RUN_RE = re.compile(rb"[\x20-\x7e\t\r\n]{4,}")
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def extract_text(filename: str, content: bytes) -> list:
+    """Return the document text as a list of pages (a single page for non-PDF files)."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError as e:
+            raise RuntimeError("PDF text extraction needs the 'pypdf' package") from e
+        pages = [page.extract_text() or "" for page in PdfReader(BytesIO(content)).pages]
+    elif ext == ".docx":
+        import zipfile
+
+        with zipfile.ZipFile(BytesIO(content)) as docx:
+            xml = docx.read("word/document.xml").decode("utf-8", errors="replace")
+        xml = _DOCX_PARAGRAPH_RE.sub("\n", xml)
+        pages = [_XML_TAG_RE.sub("", xml)]
+    elif ext == ".doc":
+        # Legacy binary Word: keep readable ASCII and UTF-16 runs
+        runs = _DOC_RUN_RE.findall(content) + _DOC_RUN_RE.findall(content.replace(b"\x00", b""))
+        pages = ["\n".join(dict.fromkeys(r.decode("ascii") for r in runs))]
+    else:
+        pages = [content.decode("utf-8", errors="replace")]
+
+    budget, bounded = MAX_TEXT_CHARS, []
+    for page in pages:
+        bounded.append(page[:budget])
+        budget -= len(bounded[-1])
+        if budget <= 0:
+            break
+    return bounded
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must match (prefix match on the last)."""
+    tokens = _FTS_TOKEN_RE.findall(query or "")
+    if not tokens:
+        return ""
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class ContentIndex:
+    """SQLite FTS5 index of extracted document pages plus policy links."""
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                sha256 TEXT PRIMARY KEY, status TEXT NOT NULL, error TEXT, indexed_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                policy_id TEXT, policy_name TEXT, filename TEXT, sha256 TEXT,
+                PRIMARY KEY (policy_id, filename)
+            );
+            CREATE INDEX IF NOT EXISTS links_sha ON links (sha256);
+            CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+                sha256 UNINDEXED, page UNINDEXED, text, tokenize = 'porter unicode61'
+            );
+        """)
+
+    def link(self, policy_id, policy_name, filename, sha256):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?)",
+                (policy_id, policy_name, filename, sha256),
+            )
+
+    def status(self, sha256: str):
+        with self._lock:
+            row = self._db.execute("SELECT status FROM documents WHERE sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def mark(self, sha256: str, status: str, error: str = None):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                (sha256, status, error, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def add_pages(self, sha256: str, pages: list):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM pages WHERE sha256 = ?", (sha256,))
+            self._db.executemany(
+                "INSERT INTO pages (sha256, page, text) VALUES (?, ?, ?)",
+                [(sha256, i + 1, text) for i, text in enumerate(pages) if text.strip()],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, 'indexed', NULL, ?)",
+                (sha256, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Best-matching document pages, each with the policies that link the document."""
+        fts = _fts_query(query)
+        if not fts:
+            return []
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT p.sha256, p.page, snippet(pages, 2, '**', '**', '…', 16), bm25(pages) AS rank,
+                       l.policy_id, l.policy_name, l.filename
+                FROM pages p JOIN links l ON l.sha256 = p.sha256
+                WHERE pages MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            """, (fts, limit)).fetchall()
+        return [
+            {"sha256": sha, "page": page, "snippet": snippet, "score": -rank,
+             "policy_id": pid, "policy_name": pname, "filename": fname}
+            for sha, page, snippet, rank, pid, pname, fname in rows
+        ]
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM documents GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class DocumentIndexer:
+    """Parses uploaded documents in a process pool and feeds the ContentIndex."""
+
+    def __init__(self, index: ContentIndex, max_workers: int = None):
+        import multiprocessing  # ~20 ms of imports, paid on first use
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Never fork: the Streamlit server is multithreaded, and a forked child
+        # can inherit a lock another thread held and deadlock on it
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.index = index
+        self._pool = ProcessPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1),
+                                         mp_context=multiprocessing.get_context(method))
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, policy_id: str, policy_name: str, filename: str, content: bytes):
+        """Link the document to the policy and queue extraction unless its content is already indexed."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        self.index.link(policy_id, policy_name, filename, sha256)
+        with self._lock:
+            if sha256 in self._pending or self.index.status(sha256) == "indexed":
+                return
+            self._pending.add(sha256)
+        self.index.mark(sha256, "pending")
+        future = self._pool.submit(extract_text, filename, content)
+        future.add_done_callback(lambda f: self._done(sha256, f))
+
+    def _done(self, sha256, future):
+        try:
+            self.index.add_pages(sha256, future.result())
+        except Exception as e:
+            self.index.mark(sha256, "failed", str(e))
+        finally:
+            with self._lock:
+                self._pending.discard(sha256)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
@@ -1,10 +1,29 @@
 import streamlit as st
 import requests
 import json
-import pandas as pd
 from datetime import datetime, date
-import traceback
+import hashlib
+import io
 import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from api_traffic import traffic_from_env
+from catalog_view import PENDING_FLAG, REVISION_KEY, CatalogView
+from chat_extractor import extract_add_fields, extract_expiry_query
+from chat_telemetry import ChatTrace, export_trace, latency_breakdown
+from document_index import ContentIndex, DocumentIndexer
+from health_monitor import HealthMonitor
+from policy_export import EXPORT_FORMATS, EXPORT_MIME, export_catalog, http_page_fetcher, iter_pages
+from policy_import import PolicyWriter, detect_format, import_policies, iter_rows, write_failures
+from policy_index import ExpiryIndex, PolicyIndex, policy_summary
+from policy_render import LIST_FIELDS, CardRenderer, filter_policies, policy_list_markdown
+from policy_schema import ALLOWED_TYPES, ALLOWED_FILE_TYPES, DEFAULT_SCOPE, validate_policy
+from rerun_profiler import RerunProfiler
+from stats_history import METRICS, RESOLUTIONS, StatsHistory, StatsSampler
+from write_journal import WriteJournal, is_offline
 
 # Configure Streamlit page
 st.set_page_config(
@@ -14,9 +33,41 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# st.fragment (Streamlit >= 1.37) reruns only the decorated function on interaction;
+# older releases ship it as experimental_fragment, very old ones not at all
+def _no_fragment(func=None, **_):
+    return func if func else (lambda f: f)
+
+
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or _no_fragment
+
 # API base URL
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
+CHAT_TRACE_HISTORY = 200  # chat turns kept per session for the latency debug panel
+CATALOG_TTL_SECONDS = int(os.getenv("CATALOG_TTL_SECONDS", "60"))  # max age of the cached catalog index
+EXPIRY_FIELDS = ("name", "type", "scope", "expiry_date")  # all the Statistics page's expiry panel shows
+CHAT_CONTEXT_K = 5  # candidate policies sent with each /chat message
+EXPORT_PAGE_SIZE = 1000  # policies per /policies page when exporting
+DOCUMENT_INDEX_PATH = os.getenv("DOCUMENT_INDEX_PATH", "document_index.db")
+CARD_PAGE_SIZE = 50  # policy cards per page on All Policies and Search
+NAME_CHECK_MIN_CHARS = 3  # don't look up names shorter than this while typing
+WRITE_RETRIES = int(os.getenv("WRITE_RETRIES", "3"))  # extra attempts for writes sent with an idempotency key
+RETRY_BACKOFF_SECONDS = 0.5  # doubled after every failed attempt
+RETRY_STATUS_CODES = {409, 429, 500, 502, 503, 504}
+WRITE_JOURNAL_PATH = os.getenv("WRITE_JOURNAL_PATH", "write_journal.db")
+JOURNAL_REPLAY_LIMIT = 200  # journal entries replayed per rerun once the API is back
+API_TRAFFIC_MODE = os.getenv("API_TRAFFIC_MODE", "off").lower()  # off | record | replay (see api_traffic.py)
+HEALTH_CHECK_SECONDS = float(os.getenv("HEALTH_CHECK_SECONDS", "5"))  # one `/` probe per interval per server process
+SIDEBAR_REFRESH_SECONDS = int(os.getenv("SIDEBAR_REFRESH_SECONDS", "15"))  # API status / quick stats poll interval
+STATS_HISTORY_PATH = os.getenv("STATS_HISTORY_PATH", "stats_history.db")
+STATS_SNAPSHOT_SECONDS = float(os.getenv("STATS_SNAPSHOT_SECONDS", "300"))  # `/stats` snapshot interval for trends
+PROFILE_DIR = os.getenv("RERUN_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("RERUN_PROFILE_KEEP", "50"))  # profiled reruns kept on disk
+PAGE_FUNCTIONS = (
+    "chat_assistant_page", "all_policies_page", "add_policy_page",
+    "search_policies_page", "statistics_page", "bulk_import_page",
+)
 
 
 # Custom CSS
@@ -59,203 +110,883 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def call_api(endpoint, method="GET", data=None, files=None, timeout=30):
-    try:
-        url = f"{API_BASE_URL}{endpoint}"
+@st.cache_resource(show_spinner=False)
+def get_api_traffic():
+    """Recorder or replayer selected by API_TRAFFIC_MODE, shared by all sessions."""
+    return traffic_from_env()
 
-        if method == "GET":
-            response = requests.get(url, timeout=timeout)
 
-        elif method == "POST":
-            if endpoint == "/policies":
-                # FastAPI expects form fields (data=...) and optional files (files=...)
-                if files:
-                    response = requests.post(url, data=data or {}, files=files, timeout=timeout)
-                else:
-                    response = requests.post(url, data=data or {}, timeout=timeout)
+def http_request(method, url, **kwargs):
+    """Every backend request except health probes goes through here, so its traffic can be recorded or replayed."""
+    if API_TRAFFIC_MODE == "off":
+        return requests.request(method, url, **kwargs)
+    return get_api_traffic().request(method, url, **kwargs)
+
+
+class BackendSession(requests.Session):
+    """
+    Pooled session for bulk import and export that goes through the same
+    hooks as call_api: traffic record/replay and the health monitor's fail-fast.
+    """
+
+    def request(self, method, url, **kwargs):
+        if get_health_monitor().fail_fast():
+            raise requests.exceptions.ConnectionError("Cannot connect to API")
+        if API_TRAFFIC_MODE == "off":
+            return super().request(method, url, **kwargs)
+        return get_api_traffic().request(method, url, **kwargs)
+
+
+def _send(url, method, endpoint, data, files, timeout, params, headers):
+    if method == "GET":
+        return http_request("GET", url, params=params, timeout=timeout)
+    if method == "POST":
+        if endpoint == "/policies":
+            # FastAPI expects form fields (data=...) and optional files (files=...)
+            return http_request("POST", url, data=data or {}, files=files or None, headers=headers, timeout=timeout)
+        # Other POSTs usually accept JSON (unless you have more upload endpoints)
+        if files:
+            return http_request("POST", url, data=data or {}, files=files, headers=headers, timeout=timeout)
+        if data:
+            return http_request("POST", url, json=data, headers=headers, timeout=timeout)
+        return http_request("POST", url, headers=headers, timeout=timeout)
+    if method == "PUT":
+        return http_request("PUT", url, json=data or {}, timeout=timeout)
+    if method == "DELETE":
+        return http_request("DELETE", url, timeout=timeout)
+    return None
+
+
+def _probe_api():
+    """
+    Health probe, kept out of the traffic hooks: a recording would otherwise
+    fill up with a `GET /` every few seconds. In replay mode the recording is
+    the backend, so it is always up.
+    """
+    if API_TRAFFIC_MODE == "replay":
+        return {"message": "replaying recorded traffic"}
+    response = requests.get(f"{API_BASE_URL}/", timeout=3)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_resource(show_spinner=False)
+def get_health_monitor():
+    """Background `/` prober shared by all sessions; the sidebar and fail-fast read its status."""
+    return HealthMonitor(_probe_api, interval=HEALTH_CHECK_SECONDS).start()
+
+
+def call_api(endpoint, method="GET", data=None, files=None, timeout=30, params=None, idempotency_key=None):
+    """
+    Call the backend and wrap the outcome in {"success", "data"/"error", ...}.
+    Writes that carry an `idempotency_key` are safe to repeat, so they are
+    retried with backoff on timeouts, dropped connections, 409 (same key
+    still in flight) and 5xx/429 responses. While the health monitor sees the
+    backend down, calls fail at once instead of waiting for their timeout.
+    """
+    monitor = get_health_monitor()
+    if monitor.fail_fast():
+        return {"success": False, "message": "Cannot connect to API", "error": "connection", "fail_fast": True}
+    url = f"{API_BASE_URL}{endpoint}"
+    headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+    attempts = 1 + (WRITE_RETRIES if idempotency_key else 0)
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(min(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1), 5))
+        try:
+            response = _send(url, method, endpoint, data, files, timeout, params, headers)
+            if response is None:
+                return {"success": False, "message": f"Unsupported method {method}"}
+            if attempt + 1 < attempts and response.status_code in RETRY_STATUS_CODES:
+                continue
+
+            if response.status_code in [200, 201, 202, 207]:
+                try:
+                    return {"success": True, "data": response.json(), "status_code": response.status_code,
+                            "bytes": len(response.content), "attempts": attempt + 1}
+                except ValueError:
+                    return {"success": True, "data": response.text, "status_code": response.status_code,
+                            "bytes": len(response.content), "attempts": attempt + 1}
             else:
-                # Other POSTs usually accept JSON (unless you have more upload endpoints)
-                if files:
-                    response = requests.post(url, data=data or {}, files=files, timeout=timeout)
-                elif data:
-                    response = requests.post(url, json=data, timeout=timeout)
-                else:
-                    response = requests.post(url, timeout=timeout)
+                try:
+                    error_detail = response.json()
+                except Exception:
+                    error_detail = response.text
+                return {
+                    "success": False,
+                    "error": error_detail,
+                    "status_code": response.status_code,
+                    "message": f"API Error: {response.status_code}",
+                    "bytes": len(response.content),
+                    "attempts": attempt + 1,
+                }
 
-        elif method == "PUT":
-            response = requests.put(url, json=data or {}, timeout=timeout)
+        except requests.exceptions.Timeout:
+            if attempt + 1 < attempts:
+                continue
+            return {"success": False, "message": "Request timed out", "error": "timeout"}
+        except requests.exceptions.ConnectionError as e:
+            if attempt + 1 < attempts:
+                continue
+            monitor.record_failure(str(e) or "connection")
+            return {"success": False, "message": "Cannot connect to API", "error": "connection"}
+        except Exception as e:
+            return {"success": False, "message": f"Unexpected error: {str(e)}", "error": str(e)}
 
-        elif method == "DELETE":
-            response = requests.delete(url, timeout=timeout)
 
-        else:
-            return {"success": False, "message": f"Unsupported method {method}"}
+def session_id():
+    """Random id of this browser session, recorded on the offline writes it makes."""
+    return st.session_state.setdefault("client_session_id", uuid.uuid4().hex)
 
-        if response.status_code in [200, 201, 202]:
-            try:
-                return {"success": True, "data": response.json(), "status_code": response.status_code}
-            except ValueError:
-                return {"success": True, "data": response.text, "status_code": response.status_code}
+
+def submit_key(intent, *content):
+    """
+    Idempotency key for writes of `intent` ("create", "attach"): a random key
+    kept in the session for as long as the content stays the same, so a
+    double click, an interrupted rerun or a resubmit after an error is
+    applied once even while the first request is still in flight. Changed
+    content gets a new key; `reset_submit_key` starts a deliberate second
+    identical write.
+    """
+    fp = hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    keys = st.session_state.setdefault("submit_keys", {})
+    if intent not in keys or keys[intent][0] != fp:
+        keys[intent] = (fp, uuid.uuid4().hex)
+    return keys[intent][1]
+
+
+def reset_submit_key(intent):
+    """Forget `intent`'s key, so the next write of the same content is a new one."""
+    st.session_state.get("submit_keys", {}).pop(intent, None)
+
+
+def _file_digests(files_param):
+    return sorted((name, hashlib.sha256(content).hexdigest()) for _, (name, content, _) in files_param or [])
+
+
+def remember_catalog(policies):
+    """Index a freshly fetched `/policies` list and cache it for this session."""
+    index = PolicyIndex(policies)
+    st.session_state["catalog_index"] = index
+    return index
+
+
+def invalidate_catalog():
+    """Drop the cached catalog after a write so the next read refetches."""
+    st.session_state.pop("catalog_index", None)
+    st.session_state.pop("expiry_index", None)
+    st.session_state.pop("sidebar_stats", None)
+    view = st.session_state.get("catalog_view")
+    if view is not None:
+        view.fetched_at = 0  # refetched as soon as no optimistic change is in flight
+
+
+def get_catalog_view(max_age=CATALOG_TTL_SECONDS):
+    """
+    Session CatalogView over `/policies` for pages that list policies: only
+    the LIST_FIELDS of each policy are fetched (see `get_policy_detail`).
+    Refetched when older than `max_age`, but not while optimistic changes
+    are still waiting for the backend. Returns (view, failed call_api result).
+    """
+    view = st.session_state.get("catalog_view")
+    if view is not None and (view.pending or time.time() - view.fetched_at < max_age):
+        return view, None
+    with st.spinner("📥 Loading policies..."):
+        res = call_api("/policies", params={"fields": ",".join(LIST_FIELDS)})
+    if not res.get("success"):
+        return view, res
+    view = st.session_state["catalog_view"] = CatalogView(res["data"])
+    return view, None
+
+
+def get_policy_detail(policy):
+    """
+    Full policy (description, documents) for "View Details", fetched from
+    `GET /policies/{id}` on first use and cached per id until the policy's
+    `updated_at` or local revision changes. Unsaved policies are shown as they are.
+    """
+    if policy.get(PENDING_FLAG) or str(policy["id"]).startswith("pending-"):
+        return policy, None
+    details = st.session_state.setdefault("policy_details", {})
+    version = (policy.get("updated_at"), policy.get(REVISION_KEY))
+    cached = details.get(policy["id"])
+    if cached is not None and cached[0] == version:
+        return cached[1], None
+    res = call_api(f"/policies/{policy['id']}", timeout=10)
+    if not res.get("success"):
+        return None, res
+    details[policy["id"]] = (version, res["data"])
+    return res["data"], None
+
+
+@st.cache_resource(show_spinner=False)
+def get_write_executor():
+    """Threads that send optimistic writes, so the script never waits on them."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="policy-write")
+
+
+def start_mutation(mutation, send, *args):
+    """Run `send(*args)` (returns a call_api result) in the background for an optimistic change."""
+    mutation.future = get_write_executor().submit(send, *args)
+
+
+def finish_mutation(view, mutation, res, notify=True):
+    """Confirm or roll back an optimistic change from its call_api result."""
+    if res.get("queued"):
+        view.confirm(mutation)
+        messages = [("info", f"📤 {res['data']['message']}")]
+    elif not res.get("success"):
+        view.rollback(mutation)
+        error = res.get("error") or res.get("message", "Unknown error")
+        messages = [("error", f"❌ {mutation.label} failed and was undone: {error}")]
+    else:
+        data = res.get("data")
+        results = data.get("results") if isinstance(data, dict) else None
+        if results is not None:
+            # Batch call: roll back only the items the backend rejected
+            failed = {r.get("id"): r.get("error", "unknown error") for r in results if not r.get("success")}
+            view.rollback(mutation, list(failed))
+            view.confirm(mutation)
+            if failed:
+                details = "\n".join(f"- `{pid}`: {err}" for pid, err in list(failed.items())[:20])
+                messages = [("warning", f"⚠️ {mutation.label}: {len(failed)} failed and were restored:\n{details}")]
+            else:
+                messages = [("success", f"✅ {mutation.label}: done in one request.")]
         else:
-            try:
-                error_detail = response.json()
-            except Exception:
-                error_detail = response.text
-            return {
-                "success": False,
-                "error": error_detail,
-                "status_code": response.status_code,
-                "message": f"API Error: {response.status_code}",
-            }
+            policy = {k: v for k, v in data.items() if k != "message"} if isinstance(data, dict) else None
+            view.confirm(mutation, [policy] if mutation.kind != "delete" else None)
+            messages = [("success", f"✅ {mutation.label}: done.")]
+        st.session_state.pop("catalog_index", None)  # chat retrieval index is stale now
+        st.session_state.pop("expiry_index", None)
+        st.session_state.pop("sidebar_stats", None)
+    if notify:
+        st.session_state.setdefault("mutation_notices", []).extend(messages)
 
-    except requests.exceptions.Timeout:
-        return {"success": False, "message": "Request timed out", "error": "timeout"}
-    except requests.exceptions.ConnectionError:
-        return {"success": False, "message": "Cannot connect to API", "error": "connection"}
-    except Exception as e:
-        return {"success": False, "message": f"Unexpected error: {str(e)}", "error": str(e)}
+
+def reconcile_mutations(view):
+    """Apply the outcome of background writes that finished since the last rerun."""
+    for mutation in [m for m in view.pending.values() if m.future is not None and m.future.done()]:
+        try:
+            res = mutation.future.result()
+        except Exception as e:
+            res = {"success": False, "message": f"Unexpected error: {e}"}
+        finish_mutation(view, mutation, res)
+
+
+def show_mutation_notices():
+    for level, message in st.session_state.pop("mutation_notices", []):
+        getattr(st, level)(message)
+
+
+@fragment(run_every=1)
+def pending_writes_watcher():
+    """While background writes are in flight, poll them and rerun the page once one finishes."""
+    view = st.session_state.get("catalog_view")
+    in_flight = [m for m in view.pending.values() if m.future is not None] if view else []
+    if not in_flight:
+        return
+    if any(m.future.done() for m in in_flight):
+        st.rerun()
+    st.caption(f"⏳ Saving {len(in_flight)} change(s)...")
+
+
+def get_catalog_index(max_age=CATALOG_TTL_SECONDS, trace=None):
+    """
+    Session-cached PolicyIndex over `/policies`, refetched when older than
+    `max_age` seconds. If the refresh fails the stale index (or None) is returned.
+    """
+    cached = st.session_state.get("catalog_index")
+    if cached is not None and time.time() - cached.built_at < max_age:
+        return cached
+    trace = trace or ChatTrace("")
+    with trace.span("policies_lookup") as sp:
+        res = call_api("/policies")
+        sp.update(status=res.get("status_code"), response_bytes=res.get("bytes", 0))
+    if not res.get("success"):
+        return cached
+    return remember_catalog(res["data"])
+
+
+def get_expiry_index(max_age=CATALOG_TTL_SECONDS):
+    """
+    Session-cached ExpiryIndex for the Statistics page, built from only the
+    EXPIRY_FIELDS of each policy (no keyword index, no descriptions or
+    documents). If the refresh fails the stale index (or None) is returned.
+    """
+    cached = st.session_state.get("expiry_index")
+    if cached is not None and time.time() - cached[0] < max_age:
+        return cached[1]
+    res = call_api("/policies", params={"fields": ",".join(EXPIRY_FIELDS)})
+    if not res.get("success"):
+        return cached[1] if cached else None
+    index = ExpiryIndex(res["data"])
+    st.session_state["expiry_index"] = (time.time(), index)
+    return index
+
+
+def lookup_policy_name(name):
+    """
+    Duplicate-name check without downloading the catalog: asks the backend's
+    name index (GET /policies/lookup), falling back to the session's cached
+    catalog index when the backend has no lookup endpoint.
+    Returns {"exists", "exact": [...], "similar": [...]} or None if unknown.
+    """
+    res = call_api("/policies/lookup", params={"name": name}, timeout=3)
+    if res.get("success"):
+        return res["data"]
+    if res.get("status_code") not in (404, 405):
+        return None
+    index = get_catalog_index()
+    if index is None:
+        return None
+    exact = index.find_by_name(name)
+    exact_ids = {p.get("id") for p in exact}
+    similar = [p for p in index.find_by_normalized_name(name) if p.get("id") not in exact_ids]
+    return {"exists": bool(exact), "exact": exact, "similar": similar}
+
+
+def _files_param(attached_files):
+    """Build the multipart `files` list for uploaded files (None when nothing is attached)."""
+    if not attached_files:
+        return None
+    return [
+        ("files", (uf.name, uf.getvalue(), (uf.type or "application/octet-stream")))
+        for uf in attached_files
+    ]
+
+
+def _files_bytes(files_param) -> int:
+    return sum(len(content) for _, (_, content, _) in files_param) if files_param else 0
+
+
+def upload_documents_by_hash(files_param):
+    """
+    Content-addressed upload: hash each attachment (SHA-256), ask the backend
+    which blobs it already has and upload only the missing ones.
+    Returns (refs, uploaded_bytes); refs is None when the backend has no blob
+    store, in which case callers send the bytes the old way.
+    """
+    docs = [(name, content, ctype, hashlib.sha256(content).hexdigest()) for _, (name, content, ctype) in files_param]
+    check = call_api("/blobs/check", method="POST", data={"hashes": [d[3] for d in docs]})
+    if not check.get("success"):
+        return None, 0
+    missing = set(check["data"].get("missing", []))
+    to_send = {}
+    for name, content, ctype, digest in docs:
+        if digest in missing and digest not in to_send:
+            to_send[digest] = ("files", (name, content, ctype))
+    uploaded_bytes = _files_bytes(list(to_send.values()))
+    if to_send:
+        up = call_api("/blobs", method="POST", files=list(to_send.values()), timeout=60)
+        if not up.get("success"):
+            return None, 0
+    refs = [{"filename": name, "content_type": ctype, "sha256": digest} for name, _, ctype, digest in docs]
+    return refs, uploaded_bytes
+
+
+@st.cache_resource(show_spinner=False)
+def get_write_journal():
+    """Offline write journal shared by all sessions of this server process."""
+    return WriteJournal(WRITE_JOURNAL_PATH)
+
+
+def _queued(message, data=None):
+    """call_api-style result for a write accepted into the offline journal."""
+    return {"success": True, "queued": True, "status_code": 202, "data": {"message": message, **(data or {})}}
+
+
+def create_policy(data, files_param=None):
+    """
+    Create a policy; if the API can't be reached the create (with its
+    attachments) goes to the offline journal and is replayed later.
+    """
+    key = submit_key("create", data, _file_digests(files_param))
+    res = _send_create(data, files_param, key)
+    if is_offline(res):
+        get_write_journal().append("create", data, key, files=files_param, owner=session_id())
+        return _queued(f"API unreachable: '{data['name']}' was saved offline and will sync when it is back.", data)
+    return res
+
+
+def create_policy_in_view(data, files_param=None):
+    """
+    create_policy() that also puts the new policy into this session's catalog
+    view (shown as saving until the backend answers, removed if it fails),
+    so All Policies shows it without refetching the catalog.
+    """
+    view = st.session_state.get("catalog_view")
+    mutation = view.apply_create(data, label=f"Create '{data['name']}'") if view is not None else None
+    res = create_policy(data, files_param)
+    if mutation is not None:
+        finish_mutation(view, mutation, res, notify=False)
+    elif res.get("success"):
+        invalidate_catalog()
+    return res
+
+
+def _send_create(data, files_param, key):
+    """POST /policies, linking attachments by content hash when the backend supports it."""
+    if not files_param:
+        return call_api("/policies", method="POST", data=data, idempotency_key=key)
+    refs, _ = upload_documents_by_hash(files_param)
+    if refs is not None:
+        res = call_api("/policies", method="POST", data={**data, "document_refs": json.dumps(refs)},
+                       idempotency_key=key)
+        if not _blobs_missing(res):
+            return res
+    # No blob store, or a blob was collected between the check and the link: send the bytes
+    return call_api("/policies", method="POST", data=data, files=files_param, idempotency_key=key)
+
+
+def _blobs_missing(res):
+    """True when a hash-linked write failed because the backend no longer has one of the blobs."""
+    return res.get("status_code") == 422 and "Unknown document blobs" in str(res.get("error"))
+
+
+def attach_documents(policy_id, files_param, policy_name=None):
+    """Add files to an existing policy; queued in the offline journal if the API can't be reached."""
+    key = submit_key("attach", policy_id, _file_digests(files_param))
+    res = _send_attach(policy_id, files_param, key)
+    if is_offline(res):
+        get_write_journal().append("attach", {"name": policy_name}, key, target=policy_id, files=files_param,
+                                   owner=session_id())
+        res = _queued("API unreachable: the files were saved offline and will upload when it is back.")
+        res["uploaded_bytes"] = 0
+    return res
+
+
+def _send_attach(policy_id, files_param, key):
+    """Add files to an existing policy, uploading only blobs the backend doesn't have yet."""
+    refs, uploaded_bytes = upload_documents_by_hash(files_param)
+    res = None
+    if refs is not None:
+        res = call_api(f"/policies/{policy_id}/documents", method="POST", data={"refs": refs},
+                       idempotency_key=key)
+    if res is None or _blobs_missing(res):
+        res = call_api(f"/policies/{policy_id}/files", method="POST", files=files_param, timeout=60,
+                       idempotency_key=key)
+        uploaded_bytes += _files_bytes(files_param)
+    res["uploaded_bytes"] = uploaded_bytes
+    return res
+
+
+def delete_policy(policy, owner=None):
+    """
+    DELETE /policies/{id}; queued in the offline journal if the API can't be
+    reached. Runs off the script thread, so the session id comes in as `owner`.
+    """
+    key = uuid.uuid4().hex  # journal key; repeating a delete is harmless anyway
+    res = call_api(f"/policies/{policy['id']}", method="DELETE")
+    if is_offline(res):
+        get_write_journal().append("delete", {"name": policy.get("name")}, key, target=policy["id"], owner=owner)
+        return _queued(f"API unreachable: deleting '{policy.get('name')}' will happen when it is back.")
+    return res
+
+
+def _replay_one(entry):
+    files_param = [("files", f) for f in entry.files] or None
+    if entry.op == "create":
+        return _send_create(entry.payload, files_param, entry.key)
+    if entry.op == "attach":
+        return _send_attach(entry.target, files_param, entry.key)
+    res = call_api(f"/policies/{entry.target}", method="DELETE")
+    # Already gone is what the user asked for
+    return {**res, "success": True} if res.get("status_code") == 404 else res
+
+
+def _replay_batch(entries):
+    """
+    Replay plain creates in one /policies/batch call; None if the backend has
+    no batch endpoint. Each item carries its entry's own key, so the backend
+    dedupes per policy however the entries are grouped from one replay to the
+    next; the request key only covers call_api's retries of this one call.
+    """
+    res = call_api("/policies/batch", method="POST",
+                   data={"policies": [e.payload for e in entries], "keys": [e.key for e in entries]},
+                   idempotency_key=uuid.uuid4().hex)
+    if res.get("status_code") in (404, 405):
+        return None
+    if not res.get("success"):
+        return [res] * len(entries)
+    # 207: one result per policy, in the order sent (as in PolicyWriter.create_batch)
+    results = res["data"].get("results", []) if isinstance(res["data"], dict) else []
+    if len(results) != len(entries):
+        return [{"success": False, "error": "Batch response did not match the request",
+                 "status_code": res["status_code"]}] * len(entries)
+    return [
+        {"success": bool(r.get("success")), "data": r, "error": r.get("error"),
+         "status_code": r.get("status_code", res["status_code"] if r.get("success") else 422)}
+        for r in results
+    ]
+
+
+def replay_write_journal():
+    """
+    Push offline writes to the backend. Runs on a write executor thread (see
+    `start_journal_replay`), so it doesn't touch the session.
+    """
+    journal = get_write_journal()
+    if not journal.counts().get("pending"):
+        return None
+    report = journal.replay(_replay_one, _replay_batch, limit=JOURNAL_REPLAY_LIMIT)
+    for entry, data in report.created:
+        if entry.files and entry.op in ("create", "attach"):
+            policy_id = data.get("id") if isinstance(data, dict) else None
+            index_documents(policy_id or entry.target, entry.payload.get("name"),
+                            [("files", f) for f in entry.files])
+    return report
+
+
+def start_journal_replay():
+    """
+    Replay offline writes in the background once the API is back, so the
+    sidebar never waits on uploads. Returns the report of a replay this
+    session started that has finished since the last call, else None.
+    """
+    future = st.session_state.get("journal_replay")
+    if future is not None and not future.done():
+        return None
+    st.session_state.pop("journal_replay", None)
+    report = None
+    if future is not None:
+        try:
+            report = future.result()
+        except Exception:
+            report = None  # retried on the next refresh
+        if report and report.replayed:
+            invalidate_catalog()
+    if get_write_journal().counts().get("pending"):
+        st.session_state["journal_replay"] = get_write_executor().submit(replay_write_journal)
+    return report
+
+
+def journal_sidebar(report=None):
+    """This session's pending offline writes, the latest replay and its conflicts, in the sidebar."""
+    journal = get_write_journal()
+    owner = session_id()
+    counts = journal.counts(owner=owner)
+    if report and (report.replayed or report.conflicts):
+        st.info(f"📤 Offline writes: {report.summary()}")
+    if counts.get("pending"):
+        st.warning(f"📤 {counts['pending']} write(s) waiting for the API")
+    if counts.get("conflict"):
+        with st.expander(f"⚠️ {counts['conflict']} offline write(s) rejected"):
+            for entry in journal.entries("conflict", owner=owner):
+                st.markdown(f"**{entry.label}** ({entry.created_at})")
+                st.caption(entry.error)
+                if st.button("Discard", key=f"journal_discard_{entry.id}"):
+                    journal.discard(entry.id, owner=owner)
+                    st.rerun()
+
+
+@st.cache_resource(show_spinner=False)
+def get_document_indexer():
+    """One extraction process pool and content index per server process, shared by all sessions."""
+    return DocumentIndexer(ContentIndex(DOCUMENT_INDEX_PATH))
+
+
+def index_documents(policy_id, policy_name, files_param):
+    """Queue uploaded files for background text extraction; never blocks or fails the upload."""
+    if not policy_id or not files_param:
+        return
+    try:
+        indexer = get_document_indexer()
+        for _, (filename, content, _) in files_param:
+            indexer.submit(policy_id, policy_name, filename, content)
+    except Exception:
+        pass  # content search is best-effort
+
+
+def _create_policy_from_chat(extracted, attached_files=None, ai_response=None, trace=None):
+    """Create a policy from chat-extracted fields (local extractor or LLM `extracted_data`)."""
+    name = extracted["name"]
+    ptype = extracted["type"]
+    payload = {
+        "name": name,
+        "type": ptype,
+        "scope": extracted.get("scope") or DEFAULT_SCOPE,
+        "description": extracted.get("description") or f"Auto-created {ptype} policy: {name}",
+        "effective_date": extracted.get("effective_date") or date.today().isoformat(),
+    }
+    if extracted.get("expiry_date"):
+        payload["expiry_date"] = extracted["expiry_date"]
+
+    files_param = _files_param(attached_files)
+    trace = trace or ChatTrace(name)
+    with trace.span("create", request_bytes=len(json.dumps(payload)), file_bytes=_files_bytes(files_param)) as sp:
+        create_res = create_policy_in_view(payload, files_param)
+        sp.update(status=create_res.get("status_code"), response_bytes=create_res.get("bytes", 0))
+    if create_res.get("queued"):
+        return f"📤 {create_res['data']['message']}"
+    if create_res["success"]:
+        created = create_res["data"] if isinstance(create_res["data"], dict) else {}
+        index_documents(created.get("id"), name, files_param)
+        footer = f"*AI:* {ai_response}" if ai_response else "*Parsed locally (no AI call needed).*"
+        return (
+            "✅ **Successfully created policy via chat!**\n\n"
+            f"**Name:** {name}  •  **Type:** {ptype}  •  **Scope:** {payload['scope']}\n"
+            f"**Effective:** {payload['effective_date']}\n\n"
+            f"{footer}"
+        )
+    return f"❌ Create failed: {create_res.get('error','Unknown error')}"
+
+
+def _record_chat_trace(trace):
+    """Keep the last turns for the debug panel and append the trace to the JSONL export."""
+    history = st.session_state.setdefault("chat_traces", [])
+    history.append(trace.to_dict())
+    del history[:-CHAT_TRACE_HISTORY]
+    try:
+        export_trace(trace)
+    except OSError:
+        pass  # tracing must never break the chat
 
 
 def enhanced_chat_with_ai(user_input: str, attached_files=None):
     """
     Minimal chat handler that:
     - Shows all policies deterministically (no LLM)
-    - Creates a policy (with files if attached)
+    - Creates a policy (with files if attached), parsing well-formed "add" prompts locally
     - Adds files to an existing policy when message mentions "file/document" and a policy name
     - Otherwise, falls back to /chat (LLM) for guidance/search/stats
+    Every turn is recorded as a ChatTrace with one span per backend stage.
     """
+    trace = ChatTrace(user_input)
     try:
-        text = (user_input or "").strip()
-        lower = text.lower()
+        response = _chat_turn(user_input, attached_files, trace)
+    except Exception as e:
+        response = f"❌ Chat error: {e}"
+    response = str(response)
+    outcome = "error" if response.startswith("❌") else "warning" if response.startswith("⚠️") else "ok"
+    _record_chat_trace(trace.finish(outcome))
+    return response
+
 
-        # --- Fast path: Show all policies (skip LLM) ---
-        if lower in {"show all policies", "list all policies", "show me all policies"}:
+def _chat_turn(user_input, attached_files, trace):
+    text = (user_input or "").strip()
+    lower = text.lower()
+
+    # --- Fast path: Show all policies (skip LLM) ---
+    if lower in {"show all policies", "list all policies", "show me all policies"}:
+        trace.intent = "show_all"
+        with trace.span("policies_lookup") as sp:
             res = call_api("/policies")
-            if not res.get("success"):
-                return f"❌ Failed to load policies: {res.get('message','Unknown error')}"
-            items = res["data"]
-            if not items:
-                return "ℹ️ No policies found."
-            st.session_state["last_search_results"] = items  # remember for next action
-            lines = [f"✅ Found {len(items)} policies.", "\n### 📋 All Policies\n"]
-            for i, p in enumerate(items, 1):
-                lines.append(f"**{i}. 📄 {p.get('name','Unnamed')}**")
-                lines.append(f" - **Type:** {p.get('type','N/A')}  •  **Scope:** {p.get('scope','N/A')}")
-                lines.append(f" - **Effective:** {p.get('effective_date','N/A')}")
-                if p.get('expiry_date'):
-                    lines.append(f" - **Expires:** {p.get('expiry_date')}")
-                lines.append("")
-            return "\n".join(lines)
-
-        # --- If message looks like file operation and files are attached, upload to a policy ---
-        looks_like_file_op = any(k in lower for k in ["file", "files", "document", "attach", "upload", "replace"])
-        if looks_like_file_op and attached_files:
-            # Try to grab a policy name after "to "
-            policy_name = None
-            if " to " in lower:
-                policy_name = text.split(" to ", 1)[1].strip().strip("'\"")
-
-            # If not found, use last single search result if available
-            if not policy_name:
-                last_results = st.session_state.get("last_search_results")
-                if last_results and len(last_results) == 1:
-                    policy_name = last_results[0].get("name")
-
-            if not policy_name:
-                return "❌ Please mention the policy name, e.g., “Add this file to **Customer Refund Policy**”."
-
-            # Find policy by name (case-insensitive)
+            sp.update(status=res.get("status_code"), response_bytes=res.get("bytes", 0))
+        if not res.get("success"):
+            return f"❌ Failed to load policies: {res.get('message','Unknown error')}"
+        items = res["data"]
+        if not items:
+            return "ℹ️ No policies found."
+        st.session_state["last_search_results"] = items  # remember for next action
+        remember_catalog(items)
+        with trace.span("render", items=len(items)):
+            return policy_list_markdown(items)
+
+    # --- Fast path: expired / expiring-soon questions, answered from the expiry index ---
+    expiry_query = extract_expiry_query(text)
+    if expiry_query:
+        trace.intent = "expiry_local"
+        index = get_catalog_index(trace=trace)
+        if index is None:
+            return "❌ Failed to load policies."
+        today = date.today().isoformat()
+        with trace.span("expiry_lookup") as sp:
+            if expiry_query.kind == "expired":
+                items = index.expiry.expired(today)[::-1]  # most recently expired first
+                title, phrase = "Expired Policies", "have expired"
+            else:
+                items = index.expiry.expiring_within(expiry_query.days, today)
+                title = f"Policies Expiring in the Next {expiry_query.days} Days"
+                phrase = f"expire in the next {expiry_query.days} days"
+            if expiry_query.type:
+                items = [p for p in items if p.get("type") == expiry_query.type]
+                title = f"{expiry_query.type} {title}"
+            sp["items"] = len(items)
+        if not items:
+            kind = f"{expiry_query.type} " if expiry_query.type else ""
+            return f"ℹ️ No {kind}policies {phrase}."
+        st.session_state["last_search_results"] = items
+        with trace.span("render", items=len(items)):
+            return policy_list_markdown(items, title=title)
+
+    # --- If message looks like file operation and files are attached, upload to a policy ---
+    looks_like_file_op = any(k in lower for k in ["file", "files", "document", "attach", "upload", "replace"])
+    if looks_like_file_op and attached_files:
+        trace.intent = "file_upload"
+        # Try to grab a policy name after "to "
+        policy_name = None
+        if " to " in lower:
+            policy_name = text.split(" to ", 1)[1].strip().strip("'\"")
+
+        # If not found, use last single search result if available
+        if not policy_name:
+            last_results = st.session_state.get("last_search_results")
+            if last_results and len(last_results) == 1:
+                policy_name = last_results[0].get("name")
+
+        if not policy_name:
+            return "❌ Please mention the policy name, e.g., “Add this file to **Customer Refund Policy**”."
+
+        # Find policy by name (case-insensitive)
+        with trace.span("policies_lookup") as sp:
             all_res = call_api("/policies")
-            if not all_res.get("success"):
-                return f"❌ Could not fetch policies: {all_res.get('message','unknown error')}"
-            all_policies = all_res["data"]
-            matches = [p for p in all_policies if (p.get("name","").strip().lower() == policy_name.strip().lower())]
-
-            if len(matches) == 0:
-                return f"❌ Policy '{policy_name}' not found. Try **Show all policies** and copy the exact name."
-            if len(matches) > 1:
-                opts = "\n".join([f"- {p['name']} (id: `{p['id']}`)" for p in matches])
-                return f"⚠️ Multiple '{policy_name}'. Please specify the **ID** next time:\n{opts}"
-
-            target = matches[0]
-            files_param = [
-                ("files", (uf.name, uf.getvalue(), (uf.type or "application/octet-stream")))
-                for uf in attached_files
-            ]
-            # Upload to backend
-            upload = requests.post(f"{API_BASE_URL}/policies/{target['id']}/files", files=files_param, timeout=60)
-            if upload.status_code in (200, 201):
-                return f"✅ Uploaded {len(attached_files)} file(s) to **{target['name']}**."
-            return f"❌ Failed to upload files: {upload.text}"
-
-        # --- Regular chat: let LLM handle add/update/search/stats text ---
-        chat_response = requests.post(f"{API_BASE_URL}/chat", json={"message": text}, timeout=30)
-        if chat_response.status_code != 200:
-            return f"❌ Chat service error: {chat_response.status_code}"
-        chat_result = chat_response.json()
-        ai_response = chat_result.get("response", "No response received")
-        data = chat_result.get("data", {}) or {}
-        action = data.get("action")
-
-        # Create policy via API if LLM extracted fields (and include attached files if any)
-        if action == "add":
-            extracted = data.get("extracted_data", {}) or {}
-            name = extracted.get("name")
-            ptype = extracted.get("type")
-            if not name or not ptype:
-                return ai_response
-
-            payload = {
-                "name": name,
-                "type": ptype,
-                "scope": extracted.get("scope") or "All Employees",
-                "description": extracted.get("description") or f"Auto-created {ptype} policy: {name}",
-                "effective_date": extracted.get("effective_date") or date.today().isoformat(),
-            }
-            if extracted.get("expiry_date"):
-                payload["expiry_date"] = extracted["expiry_date"]
-
-            files_param = None
-            if attached_files:
-                files_param = [
-                    ("files", (uf.name, uf.getvalue(), (uf.type or "application/octet-stream")))
-                    for uf in attached_files
-                ]
-            create_res = call_api("/policies", method="POST", data=payload, files=files_param)
-            if create_res["success"]:
-                return (
-                    "✅ **Successfully created policy via chat!**\n\n"
-                    f"**Name:** {name}  •  **Type:** {ptype}  •  **Scope:** {payload['scope']}\n"
-                    f"**Effective:** {payload['effective_date']}\n\n"
-                    f"*AI:* {ai_response}"
-                )
-            return f"❌ Create failed: {create_res.get('error','Unknown error')}"
+            sp.update(status=all_res.get("status_code"), response_bytes=all_res.get("bytes", 0))
+        if not all_res.get("success"):
+            return f"❌ Could not fetch policies: {all_res.get('message','unknown error')}"
+        all_policies = all_res["data"]
+        remember_catalog(all_policies)
+        matches = [p for p in all_policies if (p.get("name","").strip().lower() == policy_name.strip().lower())]
 
-        # Everything else: return what the LLM/agents produced (search/stats/update/delete guidance)
-        # (If search returned results, you can stash them for next step here)
-        if action == "search":
-            results = data.get("results", [])
-            st.session_state["last_search_results"] = results
-        return ai_response
+        if len(matches) == 0:
+            return f"❌ Policy '{policy_name}' not found. Try **Show all policies** and copy the exact name."
+        if len(matches) > 1:
+            opts = "\n".join([f"- {p['name']} (id: `{p['id']}`)" for p in matches])
+            return f"⚠️ Multiple '{policy_name}'. Please specify the **ID** next time:\n{opts}"
 
-    except Exception as e:
-        return f"❌ Chat error: {e}"
+        target = matches[0]
+        files_param = _files_param(attached_files)
+        # Upload to backend
+        with trace.span("file_upload", file_bytes=_files_bytes(files_param), files=len(files_param)) as sp:
+            upload = attach_documents(target["id"], files_param, target["name"])
+            sp.update(status=upload.get("status_code"), uploaded_bytes=upload["uploaded_bytes"],
+                      response_bytes=upload.get("bytes", 0))
+        if upload.get("queued"):
+            return f"📤 {upload['data']['message']}"
+        if upload["success"]:
+            invalidate_catalog()
+            index_documents(target["id"], target["name"], files_param)
+            return f"✅ Uploaded {len(attached_files)} file(s) to **{target['name']}**."
+        return f"❌ Failed to upload files: {upload.get('error') or upload.get('message', 'Unknown error')}"
 
+    # --- Fast path: well-formed "add" prompts are parsed locally (skip LLM) ---
+    with trace.span("local_extract") as sp:
+        extraction = extract_add_fields(text)
+        sp["confident"] = extraction.confident
+    if extraction.confident:
+        trace.intent = "add_local"
+        return _create_policy_from_chat(extraction.fields, attached_files, trace=trace)
 
+    # --- Regular chat: let LLM handle add/update/search/stats text ---
+    trace.intent = "chat"
+    chat_body = {"message": text}
+
+    # Pre-select the most relevant policies locally so the backend doesn't
+    # have to put the whole catalog into the LLM prompt
+    index = get_catalog_index(trace=trace)
+    if index is not None:
+        with trace.span("retrieve", catalog=len(index)) as sp:
+            candidates = [policy_summary(p) for p in index.search(text, k=CHAT_CONTEXT_K)]
+            sp["candidates"] = len(candidates)
+        if candidates:
+            chat_body["context"] = {"candidates": candidates, "catalog_size": len(index)}
+    with trace.span("chat_llm", request_bytes=len(json.dumps(chat_body))) as sp:
+        chat_response = http_request("POST", f"{API_BASE_URL}/chat", json=chat_body, timeout=30)
+        sp.update(status=chat_response.status_code, response_bytes=len(chat_response.content))
+    if chat_response.status_code != 200:
+        return f"❌ Chat service error: {chat_response.status_code}"
+    chat_result = chat_response.json()
+    ai_response = chat_result.get("response", "No response received")
+    data = chat_result.get("data", {}) or {}
+    action = data.get("action")
+    if action:
+        trace.intent = action
+
+    # Create policy via API if LLM extracted fields (and include attached files if any)
+    if action == "add":
+        extracted = data.get("extracted_data", {}) or {}
+        if not extracted.get("name") or not extracted.get("type"):
+            return ai_response
+        return _create_policy_from_chat(extracted, attached_files, ai_response=ai_response, trace=trace)
+
+    # Everything else: return what the LLM/agents produced (search/stats/update/delete guidance)
+    # (If search returned results, you can stash them for next step here)
+    if action == "search":
+        results = data.get("results", [])
+        st.session_state["last_search_results"] = results
+    return ai_response
+
+
+@st.cache_resource(show_spinner=False)
+def get_card_renderer():
+    """Per-policy card HTML memoized by id and version, shared by all sessions."""
+    return CardRenderer()
+
+
+def paginate(items, key, page_size=CARD_PAGE_SIZE):
+    """The slice of `items` on the page picked with a pager widget (shown only when there is more than one)."""
+    pages = max(1, -(-len(items) // page_size))
+    if pages == 1:
+        return items
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages  # the list shrank under the selected page
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=key)
+    start = (page - 1) * page_size
+    st.caption(f"Showing {start + 1}–{min(start + page_size, len(items))} of {len(items)}")
+    return items[start:start + page_size]
+
+
+def display_policy_cards(policies):
+    """Display policies as cards in a single HTML element."""
+    if policies:
+        st.markdown(get_card_renderer().render(policies), unsafe_allow_html=True)
+
+def _sidebar_poll(key, fetch):
+    """
+    Result of `fetch()` cached in the session for SIDEBAR_REFRESH_SECONDS. The
+    sidebar fragment's timer finds it expired and refetches; a full rerun
+    caused by a page widget reuses it, so it costs no round trip.
+    """
+    cached = st.session_state.get(key)
+    if cached is None or time.time() - cached[0] >= SIDEBAR_REFRESH_SECONDS - 0.5:
+        cached = (time.time(), fetch())
+        st.session_state[key] = cached
+    return cached[1]
+
+
+@fragment(run_every=SIDEBAR_REFRESH_SECONDS)
+def sidebar_health():
+    """API status from the shared health monitor; reading it costs no request."""
+    report = None
+    health = get_health_monitor().status()
+    if health.up:
+        st.success("✅ API Connected")
+        st.info(f"**Version:** {health.info.get('version', 'Unknown')}")
+        report = start_journal_replay()
+    elif health.up is None:
+        st.info("⏳ Checking API...")
+    else:
+        st.error("❌ API Offline")
+    if health.checks:
+        latency = f" • p50 {health.p50_ms:.0f} ms, p95 {health.p95_ms:.0f} ms" if health.p50_ms is not None else ""
+        st.caption(f"{health.availability:.0%} of the last {health.checks} checks OK{latency}")
+    journal_sidebar(report)
+
+
+def _fetch_stats():
+    res = call_api("/stats", timeout=10)
+    return res["data"] if res["success"] else None
+
+
+@st.cache_resource(show_spinner=False)
+def get_stats_history():
+    """Stats time series shared by all sessions, fed by one background sampler per server process."""
+    history = StatsHistory(STATS_HISTORY_PATH, min_interval=STATS_SNAPSHOT_SECONDS / 2)
+    StatsSampler(history, _fetch_stats, interval=STATS_SNAPSHOT_SECONDS).start()
+    return history
+
+
+@fragment(run_every=SIDEBAR_REFRESH_SECONDS)
+def sidebar_stats():
+    try:
+        stats_result = _sidebar_poll("sidebar_stats", lambda: call_api("/stats", timeout=5))
+        if stats_result["success"]:
+            stats = stats_result["data"]
+            get_stats_history().record(stats)  # no-op unless a snapshot is due
+            st.metric("Total Policies", stats.get('total_policies', 0))
+            st.metric("Active Policies", stats.get('active_policies', 0))
+    except:
+        pass
 
-        
-def display_policy_card(policy):
-    """Display a policy in a card format"""
-    with st.container():
-        st.markdown(f"""
-        <div class="policy-card">
-            <h4>📄 {policy['name']}</h4>
-            <p><strong>Type:</strong> {policy['type']} | <strong>Scope:</strong> {policy['scope']}</p>
-            <p><strong>Description:</strong> {policy['description']}</p>
-            <p><strong>Effective:</strong> {policy['effective_date']} | <strong>Expires:</strong> {policy.get('expiry_date', 'No expiry')}</p>
-            <p><strong>Documents:</strong> {len(policy.get('documents', []))} files</p>
-        </div>
-        """, unsafe_allow_html=True)
 
 def main():
     # Main header
@@ -271,33 +1002,16 @@ def main():
                 "📋 All Policies", 
                 "➕ Add Policy", 
                 "🔍 Search Policies", 
-                "📊 Statistics"
+                "📊 Statistics",
+                "📥 Bulk Import"
             ]
         )
         
         st.markdown("---")
         
-        # Quick system info
-        try:
-            api_test = call_api("/", timeout=3)
-            if api_test["success"]:
-                st.success("✅ API Connected")
-                api_data = api_test["data"]
-                st.info(f"**Version:** {api_data.get('version', 'Unknown')}")
-            else:
-                st.error("❌ API Offline")
-        except:
-            st.error("❌ API Offline")
-        
-        # Quick stats
-        try:
-            stats_result = call_api("/stats", timeout=5)
-            if stats_result["success"]:
-                stats = stats_result["data"]
-                st.metric("Total Policies", stats.get('total_policies', 0))
-                st.metric("Active Policies", stats.get('active_policies', 0))
-        except:
-            pass
+        # Quick system info and stats refresh on their own timers
+        sidebar_health()
+        sidebar_stats()
     
     # Page routing
     if page == "🤖 AI Chat Assistant":
@@ -310,6 +1024,8 @@ def main():
         search_policies_page()
     elif page == "📊 Statistics":
         statistics_page()
+    elif page == "📥 Bulk Import":
+        bulk_import_page()
 
 def chat_assistant_page():
     st.header("🤖 AI Policy Assistant")
@@ -332,7 +1048,7 @@ def chat_assistant_page():
     attached_files = st.file_uploader(
         "Attach documents (optional)",
         accept_multiple_files=True,
-        type=['pdf', 'doc', 'docx', 'txt']
+        type=ALLOWED_FILE_TYPES
     )
 
     # Chat input
@@ -406,49 +1122,246 @@ def chat_assistant_page():
         - "What's the system status?"
         """)
 
+    # Optional latency debug panel (per-stage spans of this session's chat turns)
+    if st.checkbox("⏱️ Show latency debug panel", key="chat_debug_panel", value=os.getenv("CHAT_DEBUG") == "1"):
+        traces = st.session_state.get("chat_traces", [])
+        if not traces:
+            st.info("ℹ️ No chat turns recorded yet in this session.")
+        else:
+            last = traces[-1]
+            st.caption(
+                f"Last turn: intent `{last['intent']}` • outcome `{last['outcome']}` • "
+                f"total {last['total_ms']:.1f} ms"
+            )
+            st.dataframe(last["spans"], use_container_width=True)
+            st.markdown("**Session latency by intent and stage (ms)**")
+            st.dataframe(latency_breakdown(traces), use_container_width=True)
+            st.download_button(
+                "⬇️ Download traces (JSONL)",
+                data="\n".join(json.dumps(t, ensure_ascii=False) for t in traces) + "\n",
+                file_name="chat_traces.jsonl",
+                mime="application/x-ndjson",
+            )
+
 def all_policies_page():
     st.header("📋 All Policies")
-    
-    # Get all policies
-    with st.spinner("📥 Loading policies..."):
-        result = call_api("/policies")
-    
-    if result["success"]:
-        policies = result["data"]
-        st.success(f"✅ Found {len(policies)} policies")
-        
-        # Display policies
-        for i, policy in enumerate(policies):
-            display_policy_card(policy)
-            
-            # Action buttons
-            # Action buttons
-            col1, col2, col3 = st.columns(3)
- 
-            with col1:
-                if st.button(f"👁️ View Details", key=f"view_{i}"):
-                    with st.expander(f"📄 {policy['name']} - Details", expanded=True):
-                        st.json(policy)
- 
-            with col2:
-    # ✅ Implement Edit (guide to chat)
-                if st.button(f"✏️ Edit", key=f"edit_{i}"):
-                    st.warning(f"Edit functionality for '{policy['name']}' is not fully implemented yet.")
-                    st.info("💡 Use the Chat Assistant: 'Update [Policy Name] [field] to [new value]'")
- 
-            with col3:
-    # ✅ Implement Delete
-                if st.button(f"🗑️ Delete", key=f"delete_{i}", type="secondary"):
-        # Show confirmation
-                    if st.button(f"⚠️ Confirm Delete '{policy['name']}'", key=f"confirm_delete_{i}"):
-                        with st.spinner("🗑️ Deleting policy..."):
-                            delete_result = call_api(f"/policies/{policy['id']}", method="DELETE")
-                            if delete_result["success"]:
-                                st.success(f"✅ Deleted '{policy['name']}'")
-                                st.rerun()
-                            else:
-                                st.error(f"❌ Failed to delete: {delete_result.get('message', 'Unknown error')}")
- 
+
+    view, error = get_catalog_view()
+    if view is None:
+        st.error(f"❌ Could not load policies: {error.get('message', 'Unknown error')}")
+        return
+    reconcile_mutations(view)
+    show_mutation_notices()
+    pending_writes_watcher()
+
+    policies = view.policies()
+    st.success(f"✅ Found {len(policies)} policies")
+    export_catalog_panel()
+    policies = paginate(policies, key="all_policies_page_no")
+    bulk_actions_panel(view, policies)
+
+    # Each card (memoized HTML) directly above its action row; widget keys use
+    # the policy id so optimistic inserts/removals don't shift them. Cards stay
+    # one element each here: widgets can't sit inside a markdown element, and
+    # a per-policy action row (4 columns, 3-4 widgets) costs more elements than
+    # its card, so merging the cards would only separate them from their buttons.
+    # Search, which has no action rows, renders its page as one element.
+    renderer = get_card_renderer()
+    for policy in policies:
+        pid = policy["id"]
+        saving = bool(policy.get(PENDING_FLAG))
+        st.markdown(renderer.render([policy]), unsafe_allow_html=True)
+
+        # Action buttons
+        col0, col1, col2, col3 = st.columns(4)
+
+        with col0:
+            st.checkbox(policy["name"], key=f"select_{pid}", disabled=saving)
+
+        with col1:
+            if st.button(f"👁️ View Details", key=f"view_{pid}"):
+                detail, error = get_policy_detail(policy)
+                with st.expander(f"📄 {policy['name']} - Details", expanded=True):
+                    if detail is None:
+                        st.error(f"❌ Could not load details: {error.get('message', 'Unknown error')}")
+                    st.json(detail or policy)
+
+        with col2:
+            # ✅ Implement Edit (guide to chat)
+            if st.button(f"✏️ Edit", key=f"edit_{pid}", disabled=saving):
+                st.warning(f"Edit functionality for '{policy['name']}' is not fully implemented yet.")
+                st.info("💡 Use the Chat Assistant: 'Update [Policy Name] [field] to [new value]'")
+
+        with col3:
+            # ✅ Implement Delete: ask for confirmation, then remove the card right away
+            if st.session_state.get("confirm_delete") == pid:
+                st.button(f"⚠️ Confirm Delete '{policy['name']}'", key=f"confirm_delete_{pid}",
+                          on_click=_optimistic_delete, args=(view, policy))
+                st.button("Cancel", key=f"cancel_delete_{pid}", on_click=st.session_state.pop,
+                          args=("confirm_delete", None))
+            else:
+                st.button(f"🗑️ Delete", key=f"delete_{pid}", type="secondary", disabled=saving,
+                          on_click=st.session_state.__setitem__, args=("confirm_delete", pid))
+
+
+def _optimistic_delete(view, policy):
+    st.session_state.pop("confirm_delete", None)
+    mutation = view.apply_delete([policy["id"]], label=f"Delete '{policy['name']}'")
+    start_mutation(mutation, delete_policy, policy, session_id())
+
+
+def _set_selection(policies, selected):
+    for p in policies:
+        if not p.get(PENDING_FLAG):
+            st.session_state[f"select_{p['id']}"] = selected(p)
+
+
+def bulk_actions_panel(view, policies):
+    """
+    Multi-select toolbar for All Policies: delete or update (scope, expiry) the
+    ticked policies of the current page with a single batch request. The list changes right away
+    and the batch call is confirmed in the background.
+    """
+    selected = [p for p in policies if st.session_state.get(f"select_{p['id']}") and not p.get(PENDING_FLAG)]
+    with st.expander(f"☑️ Bulk actions ({len(selected)} selected)", expanded=bool(selected)):
+        today = date.today().isoformat()
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            if st.button("Select all", key="bulk_select_all"):
+                _set_selection(policies, lambda p: True)
+                st.rerun()
+        with c2:
+            if st.button("Select expired", key="bulk_select_expired"):
+                _set_selection(policies, lambda p: bool(p.get("expiry_date")) and p["expiry_date"] < today)
+                st.rerun()
+        with c3:
+            if st.button("Clear selection", key="bulk_select_none"):
+                _set_selection(policies, lambda p: False)
+                st.rerun()
+
+        if not selected:
+            st.caption("Tick the policies below to delete or update them together.")
+            return
+
+        # Type travels with each id so the backend can group work by partition
+        items = [{"id": p["id"], "type": p.get("type")} for p in selected]
+        ids = [p["id"] for p in selected]
+        tab_delete, tab_update = st.tabs(["🗑️ Delete", "✏️ Update"])
+
+        with tab_delete:
+            confirm = st.checkbox(f"Yes, delete {len(selected)} policies", key="bulk_delete_confirm")
+            if st.button("🗑️ Delete selected", key="bulk_delete", disabled=not confirm):
+                mutation = view.apply_delete(ids, label=f"Delete {len(ids)} policies")
+                start_mutation(mutation, call_api, "/policies/batch/delete", "POST", {"items": items})
+                _set_selection(selected, lambda p: False)
+                st.rerun()
+
+        with tab_update:
+            new_scope = st.text_input("New scope", placeholder="Leave empty to keep each policy's scope", key="bulk_scope")
+            expiry_mode = st.radio("Expiry", ["Keep", "Set date", "Remove expiry"], horizontal=True, key="bulk_expiry_mode")
+            new_expiry = None
+            if expiry_mode == "Set date":
+                new_expiry = st.date_input("New expiry date", value=date.today(), key="bulk_expiry")
+
+            changes = {}
+            if new_scope.strip():
+                changes["scope"] = new_scope.strip()
+            if expiry_mode == "Set date":
+                changes["expiry_date"] = new_expiry.isoformat()
+            elif expiry_mode == "Remove expiry":
+                changes["expiry_date"] = None
+
+            if st.button("✏️ Apply to selected", key="bulk_update", disabled=not changes):
+                mutation = view.apply_update(ids, changes, label=f"Update {len(ids)} policies")
+                start_mutation(mutation, call_api, "/policies/batch/update", "POST",
+                               {"items": items, "changes": changes})
+                st.rerun()
+
+
+def export_catalog_panel():
+    """Download the whole catalog (with document manifests) as CSV, JSONL or Parquet."""
+    with st.expander("📤 Export catalog"):
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            fmt = st.selectbox("Format", EXPORT_FORMATS, key="export_format")
+        with col2:
+            st.caption("Pages through the API, so large catalogs don't have to fit in memory at once.")
+        if st.button("📦 Prepare export", key="export_prepare"):
+            progress = st.empty()
+            # Streamed to disk page by page; download_button takes the reopened file
+            with tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False) as out:
+                path = out.name
+            try:
+                with open(path, "wb") as out:
+                    summary = export_catalog(
+                        iter_pages(http_page_fetcher(API_BASE_URL, session=BackendSession()), EXPORT_PAGE_SIZE),
+                        out, fmt, on_page=lambda stats: progress.caption(f"{stats.policies} policies exported..."),
+                    )
+                progress.caption(
+                    f"✅ {summary['policies']} policies, {summary['documents']} documents "
+                    f"in {summary['elapsed_s']} s"
+                )
+                with open(path, "rb") as data:
+                    st.download_button(
+                        f"⬇️ Download policies.{fmt}", data, file_name=f"policies.{fmt}",
+                        mime=EXPORT_MIME[fmt], key="export_download",
+                    )
+            except Exception as e:
+                st.error(f"❌ Export failed: {e}")
+            finally:
+                os.remove(path)
+
+
+def _cached_name_lookup(name):
+    """Name lookup, repeated only when the (case-insensitive) name actually changed."""
+    key = name.strip().lower()
+    cached = st.session_state.get("name_lookup")
+    if cached and cached[0] == key:
+        return cached[1]
+    result = lookup_policy_name(name.strip())
+    if result is not None:
+        st.session_state["name_lookup"] = (key, result)
+    return result
+
+
+def _show_duplicate_warning(name, dup):
+    st.warning(
+        f"⚠️ A policy with the name **{name.strip()}** already exists "
+        f"(ID: `{dup.get('id', 'unknown')}`, Type: `{dup.get('type', 'N/A')}`).\n\n"
+        f"You can still proceed, but consider using a unique name."
+    )
+
+
+@fragment
+def policy_name_field():
+    """
+    Policy name input with a live duplicate check. As a fragment, editing the
+    name reruns only this block, and the lookup hits the backend's name index
+    instead of downloading every policy.
+    """
+    name = st.text_input("Policy Name *", placeholder="e.g., Remote Work Policy", key="add_policy_name")
+    check = st.checkbox(
+        "Check duplicate name", value=True, key="add_policy_dup_check",
+        help="Warns while you type if a policy with the same name already exists."
+    )
+    if not check or len(name.strip()) < NAME_CHECK_MIN_CHARS:
+        return
+    lookup = _cached_name_lookup(name)
+    if lookup is None:
+        st.caption("Couldn't check for duplicate names right now.")
+    elif lookup["exact"]:
+        _show_duplicate_warning(name, lookup["exact"][0])
+    elif lookup["similar"]:
+        names = ", ".join(f"**{p.get('name')}**" for p in lookup["similar"][:5])
+        st.info(f"ℹ️ Similar existing names: {names}")
+    else:
+        st.caption("✅ Name is available.")
+
+
+def _create_another_policy():
+    st.session_state.policy_created = False
+    reset_submit_key("create")  # submitting the same fields again now creates a second policy
+
 
 def add_policy_page():
     """
@@ -467,8 +1380,6 @@ def add_policy_page():
         st.session_state.last_policy_name = ""
 
     # --- Client-side config ---
-    ALLOWED_TYPES = ["HR", "IT", "Leave", "Customer"]
-    ALLOWED_FILE_TYPES = ['pdf', 'doc', 'docx', 'txt']
     MAX_TOTAL_UPLOAD_MB = 25  # safety limit for combined uploads
 
     # Small helper: total size of uploaded files
@@ -479,21 +1390,20 @@ def add_policy_page():
             # Fallback if getvalue not available
             return 0
 
+    # Name lives outside the form so it can be checked for duplicates as it changes
+    policy_name_field()
+
     with st.form("add_policy_form", clear_on_submit=False):
         col1, col2 = st.columns(2)
 
         with col1:
-            name = st.text_input(
-                "Policy Name *",
-                placeholder="e.g., Remote Work Policy"
-            )
             type_option = st.selectbox(
                 "Policy Type *", ALLOWED_TYPES, index=0, help="Required. Matches DB partition key."
             )
             scope = st.text_input(
                 "Scope *",
                 placeholder="e.g., All Employees",
-                value="All Employees"
+                value=DEFAULT_SCOPE
             )
 
         with col2:
@@ -519,27 +1429,18 @@ def add_policy_page():
             help=f"Accepted: {', '.join(ALLOWED_FILE_TYPES)}"
         )
 
-        # Optional duplicate check toggle
-        colc1, colc2 = st.columns([1, 2])
-        with colc1:
-            run_dup_check = st.checkbox("Check duplicate name", value=True)
-        with colc2:
-            st.caption("If enabled, we'll warn if a policy with the same name already exists.")
-
         submitted = st.form_submit_button("🚀 Create Policy", type="primary")
 
     # --- Handle submit ---
     if submitted:
+        name = st.session_state.get("add_policy_name", "")
         # --- Client-side validations ---
-        errors = []
-        if not name or not name.strip():
-            errors.append("Policy Name is required.")
-        if type_option not in ALLOWED_TYPES:
-            errors.append(f"Policy Type must be one of: {', '.join(ALLOWED_TYPES)}.")
-        if not scope or not scope.strip():
-            errors.append("Scope is required.")
-        if not description or not description.strip():
-            errors.append("Description is required.")
+        errors = validate_policy({
+            "name": name,
+            "type": type_option,
+            "scope": scope,
+            "description": description,
+        })
         # File validations
         if uploaded_files:
             total_size = _total_upload_size(uploaded_files)
@@ -551,19 +1452,11 @@ def add_policy_page():
                 st.write(f"- {e}")
             return
 
-        # Optional: duplicate name pre-check (case-insensitive)
-        if run_dup_check:
-            with st.spinner("🔎 Checking for duplicate policy names..."):
-                all_res = call_api("/policies")
-                if all_res.get("success"):
-                    existing = all_res["data"]
-                    dup = next((p for p in existing if p.get("name", "").strip().lower() == name.strip().lower()), None)
-                    if dup:
-                        st.warning(
-                            f"⚠️ A policy with the name **{name.strip()}** already exists "
-                            f"(ID: `{dup.get('id', 'unknown')}`, Type: `{dup.get('type', 'N/A')}`).\n\n"
-                            f"You can still proceed, but consider using a unique name."
-                        )
+        # Optional: duplicate name pre-check (case-insensitive), served by the name lookup
+        if st.session_state.get("add_policy_dup_check", True):
+            lookup = _cached_name_lookup(name)
+            if lookup and lookup["exact"]:
+                _show_duplicate_warning(name, lookup["exact"][0])
 
         # Prepare form data
         policy_data = {
@@ -590,10 +1483,13 @@ def add_policy_page():
 
         # Create policy via API
         with st.spinner("🔄 Creating policy..."):
-            result = call_api("/policies", method="POST", data=policy_data, files=files_param)
+            result = create_policy_in_view(policy_data, files_param)
 
         # Handle response
-        if result.get("success"):
+        if result.get("queued"):
+            st.info(f"📤 {result['data']['message']}")
+            st.session_state.pop("name_lookup", None)
+        elif result.get("success"):
             payload = result.get("data", {})
             # Normalize message
             msg = (
@@ -601,6 +1497,8 @@ def add_policy_page():
                 or f"Policy '{policy_data['name']}' created successfully."
             )
             st.success(f"✅ {msg}")
+            if isinstance(payload, dict):
+                index_documents(payload.get("id"), policy_data["name"], files_param)
 
             # Show details
             with st.expander("📄 Created Policy (API Response)", expanded=True):
@@ -609,12 +1507,12 @@ def add_policy_page():
             # Set flags and show next-step buttons
             st.session_state.policy_created = True
             st.session_state.last_policy_name = policy_data["name"]
+            st.session_state.pop("name_lookup", None)
 
             c1, c2, c3 = st.columns(3)
             with c1:
-                if st.button("🔁 Create Another Policy"):
-                    st.session_state.policy_created = False
-                    st.experimental_rerun()
+                # A callback, because this button is not drawn again on the rerun its click starts
+                st.button("🔁 Create Another Policy", on_click=_create_another_policy)
             with c2:
                 if st.button("📋 View All Policies"):
                     # If you use a page router variable, set it; otherwise inform the user
@@ -644,6 +1542,7 @@ def search_policies_page():
     st.header("🔍 Search Policies")
     
     search_query = st.text_input("Search policies:", placeholder="Enter policy name, type, or keywords...")
+    search_documents = st.checkbox("Also search inside attached documents", value=True)
     
     if st.button("🔍 Search") or search_query:
         if search_query:
@@ -655,26 +1554,38 @@ def search_policies_page():
                     all_policies = all_policies_result["data"]
                     
                     # ✅ CASE-INSENSITIVE SEARCH
-                    query_lower = search_query.lower()
-                    policies = [
-                        p for p in all_policies
-                        if query_lower in p.get('name', '').lower() or
-                           query_lower in p.get('description', '').lower() or
-                           query_lower in p.get('type', '').lower() or
-                           query_lower in p.get('scope', '').lower()
-                    ]
+                    policies = filter_policies(all_policies, search_query)
                     
                     if policies:
                         st.success(f"✅ Found {len(policies)} matching policies")
-                        for policy in policies:
-                            display_policy_card(policy)
+                        display_policy_cards(paginate(policies, key="search_page_no"))
                     else:
                         st.info("ℹ️ No policies found matching your search.")
+
+                    if search_documents:
+                        document_matches_section(search_query, all_policies)
                 else:
                     st.error(f"❌ Failed to load policies: {all_policies_result.get('message', 'Unknown error')}")
         else:
             st.info("ℹ️ Enter a search term to find policies.")
 
+def document_matches_section(search_query, all_policies):
+    """Show full-text hits inside attached documents, linked back to their policies."""
+    indexer = get_document_indexer()
+    live_ids = {p.get("id") for p in all_policies}
+    hits = [h for h in indexer.index.search(search_query) if h["policy_id"] in live_ids]
+    if indexer.pending:
+        st.caption(f"⏳ {indexer.pending} document(s) are still being indexed.")
+    if not hits:
+        return
+    st.subheader(f"📎 Matches inside documents ({len(hits)})")
+    for hit in hits:
+        where = f"page {hit['page']}" if hit["page"] and hit["filename"].lower().endswith(".pdf") else "text"
+        st.markdown(
+            f"**📄 {hit['policy_name']}** → `{hit['filename']}` ({where})  \n"
+            f"> {hit['snippet'].strip()}"
+        )
+
 def statistics_page():
     st.header("📊 System Statistics")
     
@@ -724,7 +1635,9 @@ def statistics_page():
         if policy_types:
             st.subheader("📊 Policies by Type")
             
-            # Create DataFrame
+            # Create DataFrame (pandas is only loaded once this page is opened)
+            import pandas as pd
+
             type_df = pd.DataFrame(
                 list(policy_types.items()),
                 columns=['Type', 'Count']
@@ -736,6 +1649,10 @@ def statistics_page():
             with col2:
                 st.bar_chart(type_df.set_index('Type'))
         
+        get_stats_history().record(stats)
+        stats_trends_section()
+        expiring_soon_section()
+
         # System info
         st.subheader("ℹ️ System Information")
         st.info(f"**Last Updated:** {stats.get('timestamp', 'Unknown')}")
@@ -744,5 +1661,204 @@ def statistics_page():
     else:
         st.error(f"❌ Failed to load statistics: {stats_result['message']}")
 
+
+def expiring_soon_section():
+    """Policies expiring in the next N days, from an expiry index over the policies' expiry fields."""
+    st.subheader("⏰ Expiring Soon")
+    days = st.slider("Expiring within (days)", min_value=7, max_value=180, value=30, step=7, key="expiring_days")
+    expiry = get_expiry_index()
+    if expiry is None:
+        st.warning("⚠️ Could not load policies for the expiry overview.")
+        return
+    today = date.today()
+    soon = expiry.expiring_within(days, today.isoformat())
+    col1, col2 = st.columns(2)
+    col1.metric(f"Expiring in {days} days", len(soon))
+    col2.metric("Already expired", len(expiry.expired(today.isoformat())))
+    if soon:
+        st.dataframe(
+            [{"Name": p.get("name"), "Type": p.get("type"), "Scope": p.get("scope"),
+              "Expires": p["expiry_date"], "Days left": (date.fromisoformat(p["expiry_date"]) - today).days}
+             for p in soon],
+            use_container_width=True,
+        )
+    else:
+        st.caption("Nothing expires in that window.")
+
+
+def stats_trends_section():
+    """Trend charts from the local stats history (pre-aggregated hourly/daily buckets)."""
+    import pandas as pd
+
+    st.subheader("📈 Trends")
+    history = get_stats_history()
+    col1, col2 = st.columns(2)
+    with col1:
+        resolution = st.radio("Resolution", list(RESOLUTIONS), horizontal=True, key="trend_resolution")
+    with col2:
+        days = st.selectbox("Window", [1, 7, 30, 90, 365], index=2, format_func=lambda d: f"Last {d} days",
+                            key="trend_days")
+    since = time.time() - days * 86400
+
+    def frame(trend):
+        series = {name: pd.Series(dict(points)) for name, points in trend.items() if points}
+        if not series:
+            return None
+        df = pd.DataFrame(series)
+        df.index = pd.to_datetime(df.index, unit="s")
+        return df
+
+    overall = frame(history.trend(list(METRICS), resolution, since))
+    if overall is None:
+        st.info(f"No history yet: a snapshot is recorded every {STATS_SNAPSHOT_SECONDS / 60:.0f} minutes.")
+        return
+    st.line_chart(overall)
+
+    metric = st.selectbox("By type", METRICS, key="trend_metric")
+    names = [n for n in history.series_names() if n.endswith(f"/{metric}")]
+    by_type = frame(history.trend(names, resolution, since))
+    if by_type is not None:
+        st.line_chart(by_type.rename(columns=lambda n: n.rsplit("/", 1)[0]))
+    else:
+        st.caption(f"The backend doesn't report {metric} counts per type.")
+    counts = history.counts()
+    st.caption(f"History: {counts['series']} series, {counts['points']} changes, {counts['rollups']} buckets")
+
+
+def bulk_import_page():
+    """
+    Streamlit page: Bulk Import
+    - Streams rows from CSV / JSONL / Excel and validates them like Add Policy
+    - Skips names that already exist (or repeat within the file)
+    - Creates policies in batches via POST /policies/batch (parallel POSTs as fallback)
+    """
+    st.header("📥 Bulk Import")
+    st.write("Import many policies at once. Rows are validated with the same rules as **Add Policy**.")
+
+    with st.expander("📄 Expected columns"):
+        st.markdown("""
+        - **name**, **type** (HR, IT, Leave or Customer), **scope**, **description** — required
+        - **effective_date**, **expiry_date** — optional, `YYYY-MM-DD` (effective defaults to today)
+        
+        CSV and Excel need a header row; JSONL has one JSON object per line.
+        """)
+
+    upload = st.file_uploader("Policy file", type=["csv", "jsonl", "ndjson", "xlsx"])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        skip_dups = st.checkbox("Skip duplicate names", value=True)
+        dry_run = st.checkbox("Dry run (validate only)", value=False)
+    with col2:
+        batch_size = st.number_input("Batch size", min_value=10, max_value=1000, value=200, step=10)
+    with col3:
+        concurrency = st.number_input(
+            "Parallel requests", min_value=1, max_value=32, value=8,
+            help="Used only if the backend has no batch endpoint."
+        )
+
+    if not upload or not st.button("🚀 Start Import", type="primary"):
+        return
+
+    existing = set()
+    if skip_dups:
+        with st.spinner("🔎 Loading existing policy names..."):
+            index = get_catalog_index(max_age=0)
+        if index is None:
+            st.error("❌ Could not load existing policies for the duplicate check.")
+            return
+        existing = set(index.by_normalized)
+
+    fmt = detect_format(upload.name)
+    progress = st.progress(0.0)
+    status = st.empty()
+
+    def on_progress(report):
+        if fmt != "xlsx" and upload.size:
+            progress.progress(min(upload.tell() / upload.size, 1.0))
+        status.caption(
+            f"{report.total} rows • {report.created} created • {report.duplicates} duplicates • "
+            f"{len(report.failed)} failed"
+        )
+
+    try:
+        report = import_policies(
+            iter_rows(upload, fmt),
+            PolicyWriter(API_BASE_URL, concurrency=int(concurrency), session=BackendSession()),
+            existing_names=existing,
+            skip_duplicates=skip_dups,
+            batch_size=int(batch_size),
+            dry_run=dry_run,
+            on_progress=on_progress,
+        )
+    except Exception as e:
+        st.error(f"❌ Import stopped: {e}")
+        return
+    progress.progress(1.0)
+    if not dry_run:
+        invalidate_catalog()
+
+    summary = report.summary()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Rows", summary["total"])
+    c2.metric("Validated" if dry_run else "Created", summary["created"])
+    c3.metric("Duplicates skipped", summary["duplicates"])
+    c4.metric("Failed", summary["failed"])
+    st.caption(f"⏱️ {summary['elapsed_s']} s • {summary['rows_per_s']} rows/s")
+
+    if report.failed:
+        st.warning(f"⚠️ {len(report.failed)} rows were not imported.")
+        st.dataframe(
+            [{**f, "errors": "; ".join(f["errors"])} for f in report.failed],
+            use_container_width=True,
+        )
+        out = io.StringIO()
+        write_failures(report.failed, out)
+        st.download_button("⬇️ Download failed rows (CSV)", out.getvalue(), file_name="import_failures.csv", mime="text/csv")
+    else:
+        st.success("✅ All rows processed without errors.")
+
+def profiling_enabled():
+    """Sample-profile reruns when RERUN_PROFILE=1 or the page URL has ?profile=1."""
+    if os.getenv("RERUN_PROFILE") == "1":
+        return True
+    params = getattr(st, "query_params", None)
+    return params is not None and params.get("profile") == "1"
+
+
+def profile_panel():
+    """Where the previous rerun spent its time (the current one is still running)."""
+    profile = st.session_state.get("last_profile")
+    if not profile:
+        return
+    with st.sidebar.expander(f"🔥 Last rerun: {profile['elapsed_ms']:.0f} ms"):
+        st.caption("Page functions (ms)")
+        st.table({"ms": profile["pages"]})
+        if profile["endpoints"]:
+            st.caption("Backend calls (ms)")
+            st.table({"ms": profile["endpoints"]})
+        st.caption(f"Flame graph stacks: `{profile['folded_path']}` (open in speedscope.app)")
+        try:
+            with open(profile["folded_path"], "rb") as f:
+                st.download_button("Download .folded", f.read(), file_name=os.path.basename(profile["folded_path"]))
+        except OSError:
+            pass  # pruned by retention
+
+
+def run_profiled():
+    profiler = RerunProfiler(__file__, PAGE_FUNCTIONS, PROFILE_DIR, keep=PROFILE_KEEP)
+    try:
+        with profiler:
+            profile_panel()
+            main()
+    finally:
+        # Also runs when the script stops early for st.rerun()
+        pages = [p for p in profiler.summary()["pages"] if p in PAGE_FUNCTIONS]
+        st.session_state["last_profile"] = profiler.write(label=pages[0] if pages else "rerun")
+
+
 if __name__ == "__main__":
-    main()
+    if profiling_enabled():
+        run_profiled()
+    else:
+        main()
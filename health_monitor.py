@@ -0,0 +1,121 @@
+"""
+Backend health monitor shared by every session of a server process.
+
+A daemon thread calls `probe()` every `interval` seconds and keeps a rolling
+history of the outcomes (availability, latency). Sessions read the latest
+`HealthStatus` instead of pinging the backend themselves, and use
+`fail_fast()` to skip requests that cannot succeed while the backend is down.
+Callers that hit a dropped connection can report it with `record_failure()`,
+so fail-fast engages without waiting for the next probe.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from latency_stats import percentile
+
+
+@dataclass
+class HealthStatus:
+    up: bool = None  # None until the first probe has finished
+    checked_at: float = 0.0
+    latency_ms: float = None
+    info: dict = field(default_factory=dict)  # the probe's payload, e.g. the backend version
+    error: str = None
+    consecutive_failures: int = 0
+    checks: int = 0  # probes in the history window
+    availability: float = None  # share of successful probes in the window
+    p50_ms: float = None
+    p95_ms: float = None
+
+
+class HealthMonitor:
+    """
+    Periodic prober. `probe()` returns a dict on success and raises on
+    failure; the thread starts on the first `status()` call.
+    """
+
+    def __init__(self, probe, interval: float = 5.0, history: int = 120, fail_after: int = 2):
+        self.probe = probe
+        self.interval = interval
+        self.fail_after = fail_after
+        self._history = deque(maxlen=history)  # (checked_at, ok, latency_ms)
+        self._status = HealthStatus()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            self.check()
+            if self._stop.wait(self.interval):
+                return
+
+    def check(self) -> HealthStatus:
+        """Probe once now and publish the result."""
+        start = time.perf_counter()
+        try:
+            info, error = self.probe() or {}, None
+        except Exception as e:
+            info, error = None, str(e) or type(e).__name__
+        latency = (time.perf_counter() - start) * 1000
+        return self._publish(error is None, latency, info, error)
+
+    def record_failure(self, error: str):
+        """
+        A request outside the monitor found the backend unreachable. Counts
+        towards fail-fast but is not a probe, so the history is unchanged.
+        """
+        self._publish(False, None, None, error, sample=False)
+
+    def _publish(self, ok, latency_ms, info, error, sample=True) -> HealthStatus:
+        now = time.time()
+        with self._lock:
+            previous = self._status
+            if sample:
+                self._history.append((now, ok, latency_ms))
+            latencies = [ms for _, good, ms in self._history if good and ms is not None]
+            self._status = HealthStatus(
+                up=ok,
+                checked_at=now,
+                latency_ms=latency_ms,
+                info=info if ok else previous.info,
+                error=error,
+                consecutive_failures=0 if ok else previous.consecutive_failures + 1,
+                checks=len(self._history),
+                availability=(sum(1 for _, good, _ in self._history if good) / len(self._history)
+                              if self._history else None),
+                p50_ms=percentile(latencies, 50),
+                p95_ms=percentile(latencies, 95),
+            )
+            return self._status
+
+    def status(self) -> HealthStatus:
+        self.start()
+        with self._lock:
+            return self._status
+
+    def history(self) -> list:
+        """(checked_at, ok, latency_ms) tuples, oldest first."""
+        with self._lock:
+            return list(self._history)
+
+    def fail_fast(self) -> bool:
+        """
+        True when recent checks agree the backend is down: `fail_after`
+        failures in a row, the latest no older than three probe intervals.
+        """
+        status = self.status()
+        return (status.consecutive_failures >= self.fail_after
+                and time.time() - status.checked_at < 3 * self.interval)
@@ -0,0 +1,12 @@
+"""
+Latency percentiles shared by the app's telemetry (chat traces, API traffic,
+health monitor) and the benchmarks, so every report ranks samples the same way.
+"""
+
+
+def percentile(values, pct, default=None):
+    """`pct` percentile of `values` by nearest rank (index rounded), or `default` if there are none."""
+    if not values:
+        return default
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))]
@@ -0,0 +1,20 @@
+"""
+Local stand-in for the policy backend the Streamlit app talks to.
+
+Lets the frontend (and its benchmarks) run offline:
+
+    python -m local_backend --port 8000 [--seed-policies 5000]
+    API_BASE_URL=http://127.0.0.1:8000 streamlit run fixed_app.py
+
+It serves every endpoint the app calls (`/`, `/policies`, `/policies/{id}`,
+`/policies/{id}/files`, `/chat`, `/stats`, plus the batch, blob and lookup
+endpoints) from an in-memory store partitioned by policy type. The store,
+the fake `/chat` and the seeding (`store.py`, `fake_llm.py`, `seed.py`) are
+plain Python so benchmarks can drive them in-process; only `app.py` needs
+FastAPI.
+"""
+from .store import PolicyStore
+from .fake_llm import FakeChat
+from .seed import make_catalog, seed_store
+
+__all__ = ["PolicyStore", "FakeChat", "make_catalog", "seed_store"]
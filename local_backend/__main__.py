@@ -0,0 +1,41 @@
+"""
+Run the local backend stand-in:
+
+    python -m local_backend [--host 127.0.0.1] [--port 8000] [--chat-base-ms 400]
+                            [--seed-policies 5000] [--seed 42] [--no-documents]
+"""
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the policy API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--chat-base-ms", type=float, help="fixed latency of each fake /chat call")
+    parser.add_argument("--chat-ms-per-1k-tokens", type=float, help="extra /chat latency per 1k prompt tokens")
+    parser.add_argument("--seed-policies", type=int, default=0, help="start with this many synthetic policies")
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the synthetic catalog")
+    parser.add_argument("--no-documents", action="store_true", help="seed policies without attachment blobs")
+    args = parser.parse_args()
+
+    if args.chat_base_ms is not None:
+        os.environ["FAKE_CHAT_BASE_MS"] = str(args.chat_base_ms)
+    if args.chat_ms_per_1k_tokens is not None:
+        os.environ["FAKE_CHAT_MS_PER_1K_TOKENS"] = str(args.chat_ms_per_1k_tokens)
+
+    import uvicorn
+
+    from .app import create_app
+    from .seed import seed_store
+    from .store import PolicyStore
+
+    store = PolicyStore()
+    if args.seed_policies:
+        seed_store(store, args.seed_policies, seed=args.seed, documents=not args.no_documents)
+        print(f"Seeded {len(store)} policies ({store.blobs.stats()['stored_bytes'] / 1024 / 1024:.0f} MB of documents)")
+    uvicorn.run(create_app(store), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
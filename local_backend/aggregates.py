@@ -0,0 +1,123 @@
+"""
+Incrementally maintained `/stats` counters for the policy store.
+
+Every policy is in one status on a given day: expired (expiry before
+today), upcoming (effective after today) or active. Counts per type and
+status are adjusted as policies are added, changed and removed, so
+`/stats` never walks the catalog. Status changes caused by the calendar
+alone come from a heap of transition dates (the day a policy takes effect,
+the day after it expires): moving `today` forward pops only the policies
+whose status actually changes.
+"""
+import heapq
+from datetime import date, timedelta
+
+STATUSES = ("active", "expired", "upcoming")
+
+
+def policy_status(policy: dict, today: str) -> str:
+    if policy.get("expiry_date") and policy["expiry_date"] < today:
+        return "expired"
+    if (policy.get("effective_date") or "") > today:
+        return "upcoming"
+    return "active"
+
+
+def _next_transition(policy: dict, status: str):
+    """First day on which `policy` leaves `status`, or None if it never does."""
+    if status == "expired":
+        return None
+    days = [policy["effective_date"]] if status == "upcoming" else []
+    if policy.get("expiry_date"):
+        try:
+            days.append((date.fromisoformat(policy["expiry_date"]) + timedelta(days=1)).isoformat())
+        except ValueError:
+            pass
+    return min(days) if days else None
+
+
+def scan_stats(policies, today: str) -> dict:
+    """The same counts by walking every policy (the reference the counters are checked against)."""
+    by_type, documents = {}, 0
+    for p in policies:
+        counts = by_type.setdefault(p["type"], {"total": 0, "active": 0, "expired": 0, "upcoming": 0})
+        counts["total"] += 1
+        counts[policy_status(p, today)] += 1
+        documents += len(p["documents"])
+    return {"by_type": by_type, "documents": documents}
+
+
+class StatusAggregates:
+    """Per-type status counts and document total, kept current by the store under its lock."""
+
+    def __init__(self, today: str = None):
+        self.today = today or date.today().isoformat()
+        self.documents = 0
+        self._by_type = {}
+        self._status = {}  # policy id -> (type, status, version, next transition)
+        self._transitions = []  # heap of (date, version, policy id); stale versions are skipped
+        self._versions = 0
+
+    def add(self, policy: dict):
+        counts = self._by_type.setdefault(policy["type"], {"total": 0, "active": 0, "expired": 0, "upcoming": 0})
+        counts["total"] += 1
+        self.documents += len(policy["documents"])
+        self._track(policy, policy_status(policy, self.today))
+
+    def remove(self, policy: dict):
+        ptype, status, _, _ = self._status.pop(policy["id"])
+        counts = self._by_type[ptype]
+        counts["total"] -= 1
+        counts[status] -= 1
+        if not counts["total"]:
+            del self._by_type[ptype]
+        self.documents -= len(policy["documents"])
+
+    def _track(self, policy, status):
+        self._versions += 1
+        when = _next_transition(policy, status)
+        self._status[policy["id"]] = (policy["type"], status, self._versions, when)
+        self._by_type[policy["type"]][status] += 1
+        if when is not None:
+            heapq.heappush(self._transitions, (when, self._versions, policy["id"]))
+            if len(self._transitions) > 2 * len(self._status) + 1024:
+                self._compact()
+
+    def _compact(self):
+        """Drop heap entries left behind by updates and removals."""
+        self._transitions = [(when, version, pid) for pid, (_, _, version, when) in self._status.items()
+                             if when is not None]
+        heapq.heapify(self._transitions)
+
+    def advance(self, today: str, policies: dict):
+        """
+        Move the calendar to `today`, re-checking only policies with a
+        transition due. Going back in time re-evaluates everything.
+        """
+        if today < self.today:
+            self.rebuild(policies.values(), today)
+            return
+        self.today = today
+        while self._transitions and self._transitions[0][0] <= today:
+            _, version, pid = heapq.heappop(self._transitions)
+            current = self._status.get(pid)
+            if current is None or current[2] != version:
+                continue  # policy removed or changed since this transition was scheduled
+            ptype, status, _, _ = current
+            self._by_type[ptype][status] -= 1
+            self._track(policies[pid], policy_status(policies[pid], today))
+
+    def rebuild(self, policies, today: str = None):
+        self.__init__(today or self.today)
+        for policy in policies:
+            self.add(policy)
+
+    def by_type(self) -> dict:
+        return {ptype: dict(counts) for ptype, counts in self._by_type.items()}
+
+    def totals(self) -> dict:
+        totals = dict.fromkeys(STATUSES, 0)
+        for counts in self._by_type.values():
+            for status in STATUSES:
+                totals[status] += counts[status]
+        return totals
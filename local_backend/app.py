@@ -0,0 +1,328 @@
+"""
+FastAPI app exposing the endpoints `fixed_app.py` calls.
+"""
+import json
+import os
+import time
+from typing import List, Optional
+
+from fastapi import Body, FastAPI, File, Form, Header, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from .fake_llm import FakeChat
+from .idempotency import IdempotencyConflict, IdempotencyStore, fingerprint
+from .metrics import RequestMetrics
+from .blobs import sha256_hex
+from .store import DERIVED_FIELDS, POLICY_FIELDS, PolicyStore
+
+from policy_schema import ALLOWED_TYPES, validate_policy
+
+API_VERSION = "local-1.0"
+
+
+class BatchCreateRequest(BaseModel):
+    policies: List[dict]
+    # Optional per-item Idempotency-Keys (parallel to `policies`): an item whose key
+    # was already used, alone or in another batch, gets its stored result back
+    keys: Optional[List[Optional[str]]] = None
+
+
+class BatchItem(BaseModel):
+    id: str
+    type: Optional[str] = None  # partition key; lets the store group without a lookup
+
+
+class BatchDeleteRequest(BaseModel):
+    items: List[BatchItem]
+
+
+class BatchUpdateRequest(BaseModel):
+    items: List[BatchItem]
+    changes: dict
+
+
+# Fields a (batch) update may change; the partition key `type` is immutable
+UPDATABLE_FIELDS = {"name", "scope", "description", "effective_date", "expiry_date"}
+
+
+def _check_changes(changes: dict):
+    unknown = set(changes) - UPDATABLE_FIELDS
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Cannot update: {', '.join(sorted(unknown))}")
+    # Validate the changed fields only, on top of a placeholder valid policy
+    errors = validate_policy({"name": "x", "type": ALLOWED_TYPES[0], "scope": "x", "description": "x", **changes})
+    if errors:
+        raise HTTPException(status_code=422, detail="; ".join(errors))
+
+
+class BlobCheckRequest(BaseModel):
+    hashes: List[str]
+
+
+class DocumentRef(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    sha256: str
+
+
+class DocumentLinkRequest(BaseModel):
+    refs: List[DocumentRef]
+
+
+def _parse_refs(document_refs: Optional[str]) -> list:
+    """`document_refs` arrives as a JSON string form field next to the policy fields."""
+    if not document_refs:
+        return []
+    try:
+        return [DocumentRef(**r).dict() for r in json.loads(document_refs)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid document_refs: {e}")
+
+
+def _form_fields(fields: dict) -> dict:
+    """Policy fields as `POST /policies` sees them, with its form defaults filled in."""
+    return {
+        "name": fields.get("name"),
+        "type": fields.get("type"),
+        "scope": fields.get("scope", "All Employees"),
+        "description": fields.get("description", ""),
+        "effective_date": fields.get("effective_date"),
+        "expiry_date": fields.get("expiry_date"),
+    }
+
+
+def _document_fingerprint(uploads, refs) -> list:
+    """Attachments by (filename, digest), so a multipart upload and its hash-linked retry match."""
+    docs = [(name, sha256_hex(content)) for name, _, content in uploads] + [(r["filename"], r["sha256"]) for r in refs]
+    return sorted(docs)
+
+
+class ChatRequest(BaseModel):
+    message: str
+    # Optional client-side retrieval result: {"candidates": [policy summaries], ...}
+    context: Optional[dict] = None
+
+
+def create_app(store: PolicyStore = None, chat: FakeChat = None) -> FastAPI:
+    store = store or PolicyStore()
+    chat = chat or FakeChat(
+        base_latency_ms=float(os.getenv("FAKE_CHAT_BASE_MS", "400")),
+        ms_per_1k_tokens=float(os.getenv("FAKE_CHAT_MS_PER_1K_TOKENS", "150")),
+    )
+    app = FastAPI(title="Policy Management API (local stand-in)", version=API_VERSION)
+    app.state.store = store
+    app.state.chat = chat
+    metrics = app.state.metrics = RequestMetrics()
+    idempotency = app.state.idempotency = IdempotencyStore(
+        ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600))),
+    )
+
+    def idempotent(key, request_fingerprint, status_code, run):
+        """Run `run()` once per Idempotency-Key; repeats get the stored response back."""
+        if not key:
+            return run()
+        try:
+            stored = idempotency.begin(key, request_fingerprint)
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        if stored is not None:
+            return JSONResponse(stored[1], status_code=stored[0], headers={"Idempotent-Replayed": "true"})
+        try:
+            result = run()
+        except Exception:
+            idempotency.abort(key)
+            raise
+        idempotency.finish(key, status_code, result)
+        return result
+
+    @app.middleware("http")
+    async def count_requests(request: Request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        # Route template ("/policies/{policy_id}") keeps per-id paths in one bucket
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        metrics.record(f"{request.method} {route}", (time.perf_counter() - started) * 1000)
+        return response
+
+    @app.get("/metrics")
+    def get_metrics():
+        """Request counts, average latency per route and RSS, for load tests."""
+        return metrics.snapshot()
+
+    @app.get("/")
+    def root():
+        return {"message": "Policy Management API (local stand-in)", "version": API_VERSION}
+
+    @app.get("/policies")
+    def list_policies(offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1),
+                      type: Optional[str] = Query(None), fields: Optional[str] = Query(None)):
+        """`fields=name,type,...` returns only those fields (and id) of each policy."""
+        selected = None
+        if fields:
+            selected = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = set(selected) - POLICY_FIELDS - DERIVED_FIELDS
+            if unknown:
+                raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        return store.list(offset=offset, limit=limit, type=type, fields=selected)
+
+    @app.get("/policies/lookup")
+    def lookup_policy_name(name: str = Query(..., min_length=1)):
+        """O(1) duplicate-name check from the store's name index."""
+        return store.lookup_name(name)
+
+    @app.post("/policies", status_code=201)
+    async def create_policy(
+        name: str = Form(...),
+        type: str = Form(...),
+        scope: str = Form("All Employees"),
+        description: str = Form(""),
+        effective_date: Optional[str] = Form(None),
+        expiry_date: Optional[str] = Form(None),
+        document_refs: Optional[str] = Form(None),
+        files: List[UploadFile] = File(default=[]),
+        idempotency_key: Optional[str] = Header(None),
+    ):
+        fields = _form_fields({"name": name, "type": type, "scope": scope, "description": description,
+                               "effective_date": effective_date, "expiry_date": expiry_date})
+        # Same rules as the batch route and bulk import
+        errors = validate_policy(fields)
+        if errors:
+            raise HTTPException(status_code=422, detail="; ".join(errors))
+        uploads = [(f.filename, f.content_type, await f.read()) for f in files]
+        refs = _parse_refs(document_refs)
+
+        def create():
+            try:
+                policy = store.create(fields, files=uploads, refs=refs)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            return {"message": f"Policy '{name}' created successfully.", **policy}
+
+        return idempotent(idempotency_key, fingerprint("create", fields, _document_fingerprint(uploads, refs)),
+                          201, create)
+
+    @app.post("/policies/batch", status_code=207)
+    def create_policies_batch(request: BatchCreateRequest, idempotency_key: Optional[str] = Header(None)):
+        """Create many policies in one call; per-item results keep the request order."""
+        if request.keys is not None and len(request.keys) != len(request.policies):
+            raise HTTPException(status_code=422, detail="keys must have one entry per policy")
+        return idempotent(idempotency_key, fingerprint("batch", request.policies, request.keys), 207,
+                          lambda: _create_batch(request.policies, request.keys))
+
+    def _create_batch(policies, keys=None):
+        keys = keys or [None] * len(policies)
+        results = [None] * len(policies)
+        valid = []
+        for i, fields in enumerate(policies):
+            errors = validate_policy(fields)
+            if errors:
+                results[i] = {"success": False, "error": "; ".join(errors)}
+                continue
+            if keys[i]:
+                # Same fingerprint as a single POST /policies of these fields, so a
+                # create first sent alone and replayed in a batch is not repeated
+                try:
+                    stored = idempotency.begin(keys[i], fingerprint("create", _form_fields(fields), []))
+                except IdempotencyConflict as e:
+                    results[i] = {"success": False, "error": e.detail, "status_code": e.status_code}
+                    continue
+                if stored is not None:
+                    results[i] = {"success": True, "id": stored[1].get("id"), "replayed": True}
+                    continue
+            valid.append(i)
+        try:
+            created = store.create_many([policies[i] for i in valid])
+        except Exception:
+            for i in valid:
+                if keys[i]:
+                    idempotency.abort(keys[i])
+            raise
+        for i, policy in zip(valid, created):
+            results[i] = {"success": True, "id": policy["id"]}
+            if keys[i]:
+                idempotency.finish(keys[i], 201, {"message": f"Policy '{policy['name']}' created successfully.",
+                                                  **policy})
+        return {"created": len(created), "results": results}
+
+    @app.post("/policies/batch/delete")
+    def delete_policies_batch(request: BatchDeleteRequest):
+        results = store.delete_many([item.dict() for item in request.items])
+        return {"deleted": sum(r["success"] for r in results), "results": results}
+
+    @app.post("/policies/batch/update")
+    def update_policies_batch(request: BatchUpdateRequest):
+        _check_changes(request.changes)
+        results = store.update_many([item.dict() for item in request.items], request.changes)
+        return {"updated": sum(r["success"] for r in results), "results": results}
+
+    @app.get("/policies/{policy_id}")
+    def get_policy(policy_id: str):
+        policy = store.get(policy_id)
+        if policy is None:
+            raise HTTPException(status_code=404, detail="Policy not found")
+        return policy
+
+    @app.delete("/policies/{policy_id}")
+    def delete_policy(policy_id: str):
+        if not store.delete(policy_id):
+            raise HTTPException(status_code=404, detail="Policy not found")
+        return {"message": "Policy deleted", "id": policy_id}
+
+    @app.put("/policies/{policy_id}")
+    def update_policy(policy_id: str, changes: dict = Body(...)):
+        _check_changes(changes)
+        policy = store.update(policy_id, changes)
+        if policy is None:
+            raise HTTPException(status_code=404, detail="Policy not found")
+        return policy
+
+    @app.post("/policies/{policy_id}/files", status_code=201)
+    async def upload_files(policy_id: str, files: List[UploadFile] = File(...),
+                           idempotency_key: Optional[str] = Header(None)):
+        uploads = [(f.filename, f.content_type, await f.read()) for f in files]
+        return idempotent(idempotency_key, fingerprint("attach", policy_id, _document_fingerprint(uploads, [])),
+                          201, lambda: _attach(policy_id, files=uploads))
+
+    @app.post("/policies/{policy_id}/documents", status_code=201)
+    def link_documents(policy_id: str, request: DocumentLinkRequest, idempotency_key: Optional[str] = Header(None)):
+        """Attach blobs that are already stored, by digest, without re-sending bytes."""
+        refs = [r.dict() for r in request.refs]
+        return idempotent(idempotency_key, fingerprint("attach", policy_id, _document_fingerprint([], refs)),
+                          201, lambda: _attach(policy_id, refs=refs))
+
+    def _attach(policy_id, files=None, refs=None):
+        try:
+            policy = store.add_files(policy_id, files=files, refs=refs)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if policy is None:
+            raise HTTPException(status_code=404, detail="Policy not found")
+        return policy
+
+    @app.post("/blobs/check")
+    def check_blobs(request: BlobCheckRequest):
+        return {"missing": store.blobs.missing(request.hashes)}
+
+    @app.post("/blobs", status_code=201)
+    async def upload_blobs(files: List[UploadFile] = File(...)):
+        stored = []
+        for f in files:
+            content = await f.read()
+            stored.append({"filename": f.filename, "sha256": store.blobs.put(content), "size": len(content)})
+        return {"blobs": stored}
+
+    @app.get("/blobs/stats")
+    def blob_stats():
+        return store.blobs.stats()
+
+    @app.get("/stats")
+    def stats():
+        return store.stats()
+
+    @app.post("/chat")
+    def chat_endpoint(request: ChatRequest):
+        # The catalog is only copied when the client sent no candidates; stats come from the counters
+        return chat.respond(request.message, store.list, context=request.context, stats=store.stats)
+
+    return app
@@ -0,0 +1,106 @@
+"""
+Content-addressed blob store for policy documents.
+
+Documents are stored once per SHA-256 digest and reference-counted by the
+policies that link them, so the same handbook attached to many policies
+costs its bytes only once. A blob nothing links (uploaded through `/blobs`
+but never attached, or whose last document was removed) is kept for
+`grace_seconds`, so a client that was just told the blob exists can still
+link it, and collected after that.
+"""
+import hashlib
+import threading
+import time
+
+
+def sha256_hex(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, grace_seconds: float = 3600.0):
+        self.grace_seconds = grace_seconds
+        self._lock = threading.Lock()
+        self._blobs = {}     # sha256 -> bytes
+        self._refs = {}      # sha256 -> number of documents linking it
+        self._unlinked = {}  # sha256 -> time it last had no links, oldest first
+        self._collected_at = time.monotonic()
+        self.logical_bytes = 0  # bytes that would be stored without dedup
+
+    def missing(self, hashes) -> list:
+        """Hashes (in request order, deduplicated) that are not stored yet."""
+        with self._lock:
+            return [h for h in dict.fromkeys(hashes) if h not in self._blobs]
+
+    def put(self, content: bytes) -> str:
+        """Store `content` (no-op if already present) and return its digest."""
+        digest = sha256_hex(content)
+        with self._lock:
+            self._blobs.setdefault(digest, content)
+            if not self._refs.setdefault(digest, 0):
+                self._unlink(digest)  # a fresh upload restarts the grace period
+            self._maybe_collect()
+        return digest
+
+    def get(self, digest: str):
+        return self._blobs.get(digest)
+
+    def size(self, digest: str):
+        blob = self._blobs.get(digest)
+        return None if blob is None else len(blob)
+
+    def incref(self, digest: str):
+        with self._lock:
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            self._unlinked.pop(digest, None)
+            self.logical_bytes += len(self._blobs[digest])
+
+    def decref(self, digest: str):
+        """Drop one link; once nothing links the blob it is collected after the grace period."""
+        with self._lock:
+            if digest not in self._refs:
+                return
+            self._refs[digest] -= 1
+            self.logical_bytes -= len(self._blobs[digest])
+            if self._refs[digest] <= 0:
+                self._refs[digest] = 0
+                self._unlink(digest)
+            self._maybe_collect()
+
+    def collect(self, now: float = None) -> int:
+        """Remove blobs unlinked for longer than the grace period; returns how many."""
+        with self._lock:
+            return self._collect(time.monotonic() if now is None else now)
+
+    def _unlink(self, digest):
+        self._unlinked.pop(digest, None)
+        self._unlinked[digest] = time.monotonic()
+
+    def _maybe_collect(self):
+        now = time.monotonic()
+        if now - self._collected_at >= min(60.0, self.grace_seconds):
+            self._collect(now)
+
+    def _collect(self, now):
+        self._collected_at = now
+        expired = []
+        for digest, since in self._unlinked.items():
+            if now - since < self.grace_seconds:
+                break  # the rest were unlinked later
+            expired.append(digest)
+        for digest in expired:
+            del self._unlinked[digest]
+            del self._refs[digest]
+            del self._blobs[digest]
+        return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stored = sum(len(b) for b in self._blobs.values())
+            return {
+                "blobs": len(self._blobs),
+                "unlinked_blobs": len(self._unlinked),
+                "stored_bytes": stored,
+                "logical_bytes": self.logical_bytes,
+                "saved_bytes": self.logical_bytes - stored,
+            }
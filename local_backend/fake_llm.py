@@ -0,0 +1,131 @@
+"""
+Deterministic stand-in for the backend's LLM `/chat` agent.
+
+Builds the prompt a real agent would send (system text + policy context +
+user message), reports its size, and sleeps for a latency modelled on the
+prompt length, so client-side changes that shrink the prompt show up as
+lower response times.
+"""
+import json
+import re
+import time
+from datetime import date
+
+from chat_extractor import extract_add_fields
+from policy_index import PolicyIndex, policy_summary
+
+SYSTEM_PROMPT = (
+    "You are a policy management assistant. Classify the user's request as "
+    "add, search, update, delete or stats, extract policy fields for add, and "
+    "answer using only the policies listed below."
+)
+CHARS_PER_TOKEN = 4
+
+
+class FakeChat:
+    """
+    `base_latency_ms` is the fixed cost of a call; `ms_per_1k_tokens` scales it
+    with prompt size. Set `sleep=False` to only report the modelled latency.
+    """
+
+    def __init__(self, base_latency_ms=400.0, ms_per_1k_tokens=150.0, sleep=True):
+        self.base_latency_ms = base_latency_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.sleep = sleep
+
+    def modelled_latency_ms(self, prompt_tokens: int) -> float:
+        return self.base_latency_ms + prompt_tokens * self.ms_per_1k_tokens / 1000
+
+    def respond(self, message: str, policies, context=None, stats=None) -> dict:
+        """
+        Answer `message`. `policies` is the full catalog, or a callable
+        returning it; `context` is the optional client-side retrieval result
+        ({"candidates": [...]}). With candidates the prompt only carries those
+        and the catalog is never loaded, otherwise it carries the whole
+        catalog. Stats are answered like a tool call, not from the prompt:
+        from `stats()` (a `/stats` dict) when given, else by counting `policies`.
+        """
+        started = time.perf_counter()
+        catalog = policies if callable(policies) else (lambda: policies)
+        candidates = (context or {}).get("candidates")
+        if candidates:
+            prompt_policies, context_source = candidates, "client"
+        else:
+            prompt_policies, context_source = [policy_summary(p) for p in catalog()], "full_catalog"
+
+        prompt = "\n".join([
+            SYSTEM_PROMPT,
+            "Policies:",
+            json.dumps(prompt_policies, ensure_ascii=False),
+            f"User: {message}",
+        ])
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+        response, data = self._answer(message, prompt_policies, catalog, stats)
+
+        latency_ms = self.modelled_latency_ms(prompt_tokens)
+        if self.sleep:
+            remaining = latency_ms / 1000 - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+        return {
+            "response": response,
+            "data": data,
+            "usage": {
+                "context": context_source,
+                "context_policies": len(prompt_policies),
+                "prompt_chars": len(prompt),
+                "prompt_tokens": prompt_tokens,
+                "modelled_latency_ms": round(latency_ms, 1),
+            },
+        }
+
+    def _answer(self, message, prompt_policies, catalog, stats):
+        lower = message.lower()
+        extraction = extract_add_fields(message)
+        if extraction.is_add:
+            if extraction.fields.get("name") and extraction.fields.get("type"):
+                fields = extraction.fields
+                return (
+                    f"I'll create the {fields['type']} policy '{fields['name']}'.",
+                    {"action": "add", "extracted_data": fields},
+                )
+            return (
+                "Please tell me the policy name (in quotes) and its type (HR, IT, Leave or Customer).",
+                {"action": "add", "extracted_data": extraction.fields},
+            )
+
+        if re.search(r"\b(how many|statistics|stats|count)\b", lower):
+            if stats is not None:
+                counts = stats()
+                total, expired = counts["total_policies"], counts["expired_policies"]
+            else:
+                policies = catalog()
+                today = date.today().isoformat()
+                total = len(policies)
+                expired = sum(1 for p in policies if p.get("expiry_date") and p["expiry_date"] < today)
+            return (
+                f"There are {total} policies, {expired} of them expired.",
+                {"action": "stats"},
+            )
+
+        if re.search(r"\b(update|change|edit|modify)\b", lower):
+            target = PolicyIndex(prompt_policies).search(message, k=1)
+            if target:
+                return (
+                    f"To update **{target[0]['name']}**, say: 'Update {target[0]['name']} [field] to [new value]'.",
+                    {"action": "update", "policy_id": target[0]["id"]},
+                )
+            return "I couldn't find the policy you want to update.", {"action": "update"}
+
+        if re.search(r"\b(delete|remove)\b", lower):
+            return "Use the All Policies page to delete a policy.", {"action": "delete"}
+
+        results = PolicyIndex(prompt_policies).search(message, k=10)
+        if "expired" in lower:
+            today = date.today().isoformat()
+            results = [p for p in prompt_policies if p.get("expiry_date") and p["expiry_date"] < today]
+        if not results:
+            return "I couldn't find any matching policies.", {"action": "search", "results": []}
+        lines = [f"Found {len(results)} matching policies:"]
+        lines += [f"- **{p['name']}** ({p['type']}, {p['scope']})" for p in results]
+        return "\n".join(lines), {"action": "search", "results": results}
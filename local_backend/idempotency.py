@@ -0,0 +1,79 @@
+"""
+Idempotency-key bookkeeping for write endpoints.
+
+A client sends `Idempotency-Key: <key>` with a POST; the first request with
+that key runs and its response is remembered, later requests with the same
+key get the stored response back instead of writing again. A key reused for
+a different request (another fingerprint) is rejected, and a key whose first
+request is still running makes the retry wait its turn (409) rather than run
+concurrently. Failed requests are forgotten so they can be retried.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+IN_PROGRESS = object()
+
+
+class IdempotencyConflict(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def fingerprint(*parts) -> str:
+    """Stable digest of the request content (JSON-serializable parts)."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Bounded key -> (fingerprint, status, response) map with a TTL."""
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, max_keys: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> [fingerprint, expires_at, status_code, response]
+        self.replays = 0
+
+    def begin(self, key: str, request_fingerprint: str):
+        """
+        Claim `key` for a request. Returns None when the caller should run the
+        request, or the stored (status_code, response) to replay.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [request_fingerprint, now + self.ttl_seconds, None, IN_PROGRESS]
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+                return None
+            if entry[0] != request_fingerprint:
+                raise IdempotencyConflict(422, "Idempotency-Key was already used for a different request")
+            if entry[3] is IN_PROGRESS:
+                raise IdempotencyConflict(409, "A request with this Idempotency-Key is still in progress")
+            self.replays += 1
+            return entry[2], entry[3]
+
+    def finish(self, key: str, status_code: int, response):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2], entry[3] = status_code, response
+
+    def abort(self, key: str):
+        """Forget a key whose request failed, so a retry runs it again."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _expire(self, now):
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[1] > now:
+                return
+            del self._entries[key]
@@ -0,0 +1,45 @@
+"""
+Request counters and process memory for load tests (`GET /metrics`).
+"""
+import os
+import resource
+import threading
+import time
+
+
+def rss_bytes(pid="self") -> int:
+    """Current resident set size of a process (Linux /proc), else this process's peak RSS."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if pid != "self":
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class RequestMetrics:
+    """Request count and cumulative latency per route, since start."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.total = 0
+        self._routes = {}  # "GET /policies" -> [count, total_ms]
+
+    def record(self, route: str, elapsed_ms: float):
+        with self._lock:
+            self.total += 1
+            entry = self._routes.setdefault(route, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 3),
+                "requests": self.total,
+                "routes": {r: {"count": c, "avg_ms": round(ms / c, 2)} for r, (c, ms) in sorted(self._routes.items())},
+                "rss_bytes": rss_bytes(),
+            }
@@ -0,0 +1,82 @@
+"""
+Deterministic synthetic catalogs for the local backend and the benchmarks.
+
+`make_catalog(n)` returns `n` policy dicts shaped like the `/policies`
+response; `seed_store(store, n)` loads such a catalog into a PolicyStore
+with real attachment blobs, so payload sizes (descriptions of a few hundred
+bytes, 0-3 documents of 20 KB - 2 MB each, shared handbooks) look like
+production data.
+"""
+import random
+import uuid
+from datetime import date, timedelta
+
+from policy_schema import ALLOWED_TYPES
+
+TOPICS = [
+    "remote work", "password security", "travel expenses", "parental leave", "refunds",
+    "data retention", "code of conduct", "overtime", "onboarding", "device usage",
+    "customer complaints", "sick leave", "vpn access", "harassment", "training budget",
+    "holiday schedule", "incident response", "loyalty rewards", "relocation", "dress code",
+]
+SCOPES = [
+    "All Employees", "IT Department", "Sales Team", "Customer Service Team", "Managers",
+    "Contractors", "Head Office", "Warehouse Staff", "Interns", "Remote Workers",
+]
+FILLER = (
+    "This policy sets out responsibilities, approval steps and exceptions. Employees "
+    "must follow the procedure described here and raise questions with their manager. "
+)
+DOCUMENT_POOL_SIZE = 24  # distinct attachment blobs shared by a seeded catalog
+
+
+def make_policy(i: int, rng: random.Random) -> dict:
+    topic = rng.choice(TOPICS)
+    ptype = rng.choice(ALLOWED_TYPES)
+    effective = date(2023, 1, 1) + timedelta(days=rng.randrange(0, 1200))
+    expiry = effective + timedelta(days=rng.randrange(90, 1500)) if rng.random() < 0.6 else None
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "name": f"{topic.title()} Policy {i}",
+        "type": ptype,
+        "scope": rng.choice(SCOPES),
+        "description": f"Rules for {topic}. " + FILLER * rng.randint(1, 4),
+        "effective_date": effective.isoformat(),
+        "expiry_date": expiry.isoformat() if expiry else None,
+        "documents": [
+            {"filename": f"{topic.replace(' ', '_')}_{j}.pdf", "content_type": "application/pdf",
+             "size": rng.randint(20_000, 2_000_000)}
+            for j in range(rng.randint(0, 3))
+        ],
+    }
+
+
+def make_catalog(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [make_policy(i, rng) for i in range(n)]
+
+
+def seed_store(store, n: int, seed: int = 42, documents: bool = True) -> int:
+    """
+    Load `n` synthetic policies (deterministic ids) into `store`. Attachments
+    come from a pool of DOCUMENT_POOL_SIZE blobs, so the same files recur
+    across policies the way shared handbooks do. Returns the number loaded.
+    """
+    rng = random.Random(seed)
+    pool = []
+    if documents:
+        blob_rng = random.Random(seed + 1)
+        pool = [store.blobs.put(blob_rng.randbytes(blob_rng.randint(20_000, 2_000_000)))
+                for _ in range(DOCUMENT_POOL_SIZE)]
+    policies = []
+    for i in range(n):
+        policy = make_policy(i, rng)
+        policy["created_at"] = policy["updated_at"] = f"{policy['effective_date']}T09:00:00"
+        refs = []
+        for doc in policy.pop("documents"):
+            if pool:
+                digest = pool[rng.randrange(len(pool))]
+                refs.append({"filename": doc["filename"], "content_type": doc["content_type"], "sha256": digest})
+        policies.append((policy, refs))
+    store.load(policies)
+    return n
@@ -0,0 +1,277 @@
+"""
+In-memory policy store for the local backend stand-in.
+
+Policies are partitioned by `type`, the partition key of the production
+container: batch operations are grouped per partition and listing one
+type only walks that partition. `/stats` counts are maintained as
+policies change (see aggregates.py) instead of being recounted per call.
+"""
+import threading
+import uuid
+from datetime import date, datetime
+from itertools import islice
+
+from policy_index import normalize_name
+
+from .aggregates import StatusAggregates
+from .blobs import BlobStore
+
+POLICY_FIELDS = {"id", "name", "type", "scope", "description", "effective_date", "expiry_date",
+                 "documents", "created_at", "updated_at"}
+DERIVED_FIELDS = {"document_count"}
+
+
+def project(policy: dict, fields=None) -> dict:
+    """Copy of `policy` with only `fields` (plus id); `document_count` is derived from the documents."""
+    if fields is None:
+        return dict(policy)
+    projected = {"id": policy["id"]}
+    for f in fields:
+        if f == "document_count":
+            projected[f] = len(policy["documents"])
+        elif f in policy:
+            projected[f] = policy[f]
+    return projected
+
+
+class PolicyStore:
+    """Thread-safe in-memory catalog keyed by policy id."""
+
+    def __init__(self, blobs: BlobStore = None):
+        self._lock = threading.RLock()
+        self._policies = {}
+        self._partitions = {}  # type -> {policy id: None}, in creation order
+        self._by_name = {}  # normalize_name(name) -> set of policy ids
+        self._aggregates = StatusAggregates()
+        self.blobs = blobs or BlobStore()
+
+    def __len__(self):
+        return len(self._policies)
+
+    def list(self, offset: int = 0, limit: int = None, type: str = None, fields=None) -> list:
+        """
+        Policies in creation order; `offset`/`limit` select one page, `type`
+        restricts the listing to that partition and `fields` projects each
+        policy onto those fields (see `project`).
+        """
+        with self._lock:
+            stop = None if limit is None else offset + limit
+            if type is None:
+                return [project(p, fields) for p in islice(self._policies.values(), offset, stop)]
+            ids = islice(self._partitions.get(type, {}), offset, stop)
+            return [project(self._policies[pid], fields) for pid in ids]
+
+    def partitions(self) -> dict:
+        """Policy count per partition (type)."""
+        with self._lock:
+            return {ptype: len(ids) for ptype, ids in self._partitions.items() if ids}
+
+    def stats(self, today: str = None) -> dict:
+        """
+        Catalog counts for `/stats`: expired = expiry before today, upcoming =
+        effective after today; `by_type` splits them per policy type. Served
+        from the maintained counters, so the cost doesn't grow with the catalog.
+        """
+        today = today or date.today().isoformat()
+        with self._lock:
+            self._aggregates.advance(today, self._policies)
+            totals = self._aggregates.totals()
+            return {
+                "total_policies": len(self._policies),
+                "active_policies": totals["active"],
+                "expired_policies": totals["expired"],
+                "upcoming_policies": totals["upcoming"],
+                "policy_types": self.partitions(),
+                "by_type": self._aggregates.by_type(),
+                "documents": self._aggregates.documents,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def get(self, policy_id: str):
+        with self._lock:
+            policy = self._policies.get(policy_id)
+            return dict(policy) if policy else None
+
+    def create(self, fields: dict, files=None, refs=None) -> dict:
+        """
+        Create a policy. `files` is a list of (filename, content_type, bytes);
+        `refs` links blobs already in the blob store ({filename, content_type, sha256}).
+        """
+        refs = list(refs or []) + self._put_files(files)
+        now = datetime.now().isoformat(timespec="seconds")
+        policy = {
+            "id": str(uuid.uuid4()),
+            "name": fields["name"],
+            "type": fields["type"],
+            "scope": fields.get("scope") or "All Employees",
+            "description": fields.get("description") or "",
+            "effective_date": fields.get("effective_date") or date.today().isoformat(),
+            "expiry_date": fields.get("expiry_date") or None,
+            "documents": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._check_refs(refs)
+            self._insert(policy)
+            self._attach(policy, refs)
+            return dict(policy)
+
+    def load(self, items) -> None:
+        """
+        Bulk-load complete policies, keeping their ids and timestamps (for
+        seeding). `items` is an iterable of (policy, refs) pairs.
+        """
+        with self._lock:
+            for fields, refs in items:
+                self._check_refs(refs)
+                policy = {**fields, "documents": []}
+                self._insert(policy)
+                updated_at = policy["updated_at"]
+                self._attach(policy, refs)
+                policy["updated_at"] = updated_at
+
+    def create_many(self, items: list) -> list:
+        """Create several policies under one lock acquisition; returns the created policies."""
+        with self._lock:
+            return [self.create(fields) for fields in items]
+
+    def delete(self, policy_id: str) -> bool:
+        return self.delete_many([{"id": policy_id}])[0]["success"]
+
+    def update(self, policy_id: str, changes: dict):
+        result = self.update_many([{"id": policy_id}], changes)[0]
+        return self.get(policy_id) if result["success"] else None
+
+    def lookup_name(self, name: str) -> dict:
+        """
+        Duplicate-name lookup from the name index: `exact` matches the name
+        case-insensitively, `similar` only after normalizing spaces/punctuation.
+        """
+        wanted = (name or "").strip().lower()
+        with self._lock:
+            matches = [self._policies[pid] for pid in self._by_name.get(normalize_name(name), ())]
+            exact = [p for p in matches if p["name"].strip().lower() == wanted]
+            similar = [p for p in matches if p["name"].strip().lower() != wanted]
+            return {
+                "exists": bool(exact),
+                "exact": [_name_summary(p) for p in exact],
+                "similar": [_name_summary(p) for p in similar],
+            }
+
+    def _insert(self, policy):
+        self._policies[policy["id"]] = policy
+        self._partitions.setdefault(policy["type"], {})[policy["id"]] = None
+        self._index_name(policy)
+        self._aggregates.add(policy)
+
+    def _index_name(self, policy):
+        self._by_name.setdefault(normalize_name(policy["name"]), set()).add(policy["id"])
+
+    def _unindex_name(self, policy):
+        ids = self._by_name.get(normalize_name(policy["name"]))
+        if ids:
+            ids.discard(policy["id"])
+            if not ids:
+                del self._by_name[normalize_name(policy["name"])]
+
+    def _group_by_partition(self, items):
+        """
+        Group {"id", "type"} items by partition (policy type), the way a
+        partitioned store executes a batch. Items whose id is unknown or whose
+        type doesn't match the stored one are returned as failures. An id
+        listed more than once is grouped once; every copy gets its result.
+        """
+        groups, failures, grouped = {}, {}, set()
+        for item in items:
+            if item.get("id") in grouped:
+                continue
+            policy = self._policies.get(item.get("id"))
+            if policy is None:
+                failures[item.get("id")] = "Policy not found"
+            elif item.get("type") and item["type"] != policy["type"]:
+                failures[item["id"]] = f"Partition mismatch: policy is {policy['type']}, not {item['type']}"
+            else:
+                groups.setdefault(policy["type"], []).append(item["id"])
+                grouped.add(item["id"])
+        return groups, failures
+
+    def delete_many(self, items: list) -> list:
+        """Delete policies partition by partition; one result per item, in order."""
+        with self._lock:
+            groups, failures = self._group_by_partition(items)
+            for ids in groups.values():
+                for pid in ids:
+                    self._unindex_name(self._policies[pid])
+                    self._aggregates.remove(self._policies[pid])
+                    self._partitions[self._policies[pid]["type"]].pop(pid, None)
+                    for doc in self._policies.pop(pid)["documents"]:
+                        self.blobs.decref(doc["sha256"])
+        return [_result(item, failures) for item in items]
+
+    def update_many(self, items: list, changes: dict) -> list:
+        """Apply the same field `changes` to every item, grouped by partition."""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            groups, failures = self._group_by_partition(items)
+            for ids in groups.values():
+                for pid in ids:
+                    self._unindex_name(self._policies[pid])
+                    self._aggregates.remove(self._policies[pid])
+                    self._policies[pid].update(changes, updated_at=now)
+                    self._aggregates.add(self._policies[pid])
+                    self._index_name(self._policies[pid])
+        return [_result(item, failures) for item in items]
+
+    def add_files(self, policy_id: str, files=None, refs=None) -> dict:
+        refs = list(refs or []) + self._put_files(files)
+        with self._lock:
+            policy = self._policies.get(policy_id)
+            if policy is None:
+                return None
+            self._check_refs(refs)
+            self._attach(policy, refs)
+            return dict(policy)
+
+    def missing_refs(self, refs) -> list:
+        """Digests referenced by `refs` that the blob store doesn't hold."""
+        return self.blobs.missing(r["sha256"] for r in refs or [])
+
+    def _check_refs(self, refs):
+        missing = self.missing_refs(refs)
+        if missing:
+            raise ValueError(f"Unknown document blobs: {', '.join(missing)}")
+
+    def _put_files(self, files) -> list:
+        return [
+            {"filename": filename, "content_type": content_type, "sha256": self.blobs.put(content)}
+            for filename, content_type, content in files or []
+        ]
+
+    def _attach(self, policy, refs):
+        """Link blobs to the policy; a document with the same filename is replaced."""
+        if not refs:
+            return
+        attached = len(policy["documents"])
+        for ref in refs:
+            self.blobs.incref(ref["sha256"])
+            replaced = [d for d in policy["documents"] if d["filename"] == ref["filename"]]
+            for d in replaced:
+                self.blobs.decref(d["sha256"])
+            policy["documents"] = [d for d in policy["documents"] if d["filename"] != ref["filename"]] + [{
+                "filename": ref["filename"],
+                "content_type": ref.get("content_type") or "application/octet-stream",
+                "size": self.blobs.size(ref["sha256"]),
+                "sha256": ref["sha256"],
+            }]
+        self._aggregates.documents += len(policy["documents"]) - attached
+        policy["updated_at"] = datetime.now().isoformat(timespec="seconds")
+
+
+def _name_summary(policy):
+    return {"id": policy["id"], "name": policy["name"], "type": policy["type"]}
+
+
+def _result(item, failures):
+    error = failures.get(item.get("id"))
+    return {"id": item.get("id"), "success": error is None, **({"error": error} if error else {})}
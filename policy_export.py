@@ -0,0 +1,185 @@
+"""
+Streaming export of the policy catalog and each policy's document manifest.
+
+Pages through `GET /policies?offset=&limit=` and writes every page straight
+to the output, so memory stays bounded by the page size rather than the
+catalog size. Formats: CSV (manifest as a JSON column), JSONL (nested) and
+Parquet (needs the optional `pyarrow` package; one row group per page).
+
+CLI:
+    python policy_export.py --format csv --out catalog.csv [--api URL] [--page-size 1000]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+EXPORT_FORMATS = ["csv", "jsonl", "parquet"]
+EXPORT_COLUMNS = [
+    "id", "name", "type", "scope", "description", "effective_date", "expiry_date",
+    "created_at", "updated_at", "document_count", "documents",
+]
+MANIFEST_FIELDS = ["filename", "content_type", "size", "sha256"]
+EXPORT_MIME = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+
+def http_page_fetcher(base_url: str, timeout: int = 60, session=None):
+    """`fetch_page(offset, limit)` backed by GET /policies on one pooled session (by default a new one)."""
+    if session is None:
+        import requests
+
+        session = requests.Session()
+
+    def fetch_page(offset, limit):
+        res = session.get(f"{base_url.rstrip('/')}/policies",
+                          params={"offset": offset, "limit": limit}, timeout=timeout)
+        res.raise_for_status()
+        return res.json()
+
+    return fetch_page
+
+
+def iter_pages(fetch_page, page_size: int = 1000):
+    """
+    Yield pages until a short page. A backend that ignores `limit` returns
+    the whole catalog at once; that is yielded as a single page. A page that
+    repeats ids of the previous one means the backend ignores `offset` (a
+    catalog of exactly `page_size` policies would otherwise loop forever),
+    so paging stops there.
+    """
+    offset, previous_ids = 0, set()
+    while True:
+        page = fetch_page(offset, page_size)
+        ids = {p.get("id") for p in page} - {None}
+        if ids & previous_ids:
+            return
+        if page:
+            yield page
+        if len(page) != page_size:
+            return
+        previous_ids = ids
+        offset += page_size
+
+
+def manifest(policy: dict) -> list:
+    return [{k: d.get(k) for k in MANIFEST_FIELDS} for d in policy.get("documents") or []]
+
+
+def flat_row(policy: dict) -> dict:
+    docs = manifest(policy)
+    row = {k: policy.get(k) for k in EXPORT_COLUMNS[:-2]}
+    row["document_count"] = len(docs)
+    row["documents"] = json.dumps(docs, ensure_ascii=False)
+    return row
+
+
+class ExportStats:
+    def __init__(self):
+        self.policies = 0
+        self.documents = 0
+        self.pages = 0
+        self.started = time.perf_counter()
+
+    def add_page(self, page):
+        self.pages += 1
+        self.policies += len(page)
+        self.documents += sum(len(p.get("documents") or []) for p in page)
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "policies": self.policies,
+            "documents": self.documents,
+            "pages": self.pages,
+            "elapsed_s": round(elapsed, 2),
+            "policies_per_s": round(self.policies / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def export_catalog(pages, out, fmt: str, on_page=None) -> dict:
+    """
+    Write `pages` (iterable of policy lists) to the binary stream `out`.
+    `on_page(stats)` is called after each page is written.
+    """
+    stats = ExportStats()
+    if fmt == "parquet":
+        _write_parquet(pages, out, stats, on_page)
+        return stats.summary()
+
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(text, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+    for page in pages:
+        if fmt == "csv":
+            writer.writerows(flat_row(p) for p in page)
+        else:
+            for p in page:
+                record = {k: p.get(k) for k in EXPORT_COLUMNS[:-2]}
+                record["documents"] = manifest(p)
+                text.write(json.dumps(record, ensure_ascii=False) + "\n")
+        text.flush()
+        stats.add_page(page)
+        if on_page:
+            on_page(stats)
+    text.flush()
+    text.detach()
+    return stats.summary()
+
+
+def _write_parquet(pages, out, stats, on_page):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs the 'pyarrow' package (pip install pyarrow)") from e
+
+    document = pa.struct([
+        ("filename", pa.string()), ("content_type", pa.string()), ("size", pa.int64()), ("sha256", pa.string()),
+    ])
+    schema = pa.schema(
+        [(c, pa.string()) for c in EXPORT_COLUMNS[:-2]]
+        + [("document_count", pa.int32()), ("documents", pa.list_(document))]
+    )
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for page in pages:
+            columns = {c: [p.get(c) for p in page] for c in EXPORT_COLUMNS[:-2]}
+            docs = [manifest(p) for p in page]
+            columns["document_count"] = [len(d) for d in docs]
+            columns["documents"] = docs
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            stats.add_page(page)
+            if on_page:
+                on_page(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the policy catalog to CSV, JSONL or Parquet")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--out", help="output file (default: stdout for csv/jsonl)")
+    parser.add_argument("--api", default=os.getenv("API_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.out:
+        parser.error("--out is required for parquet")
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+
+    def progress(stats):
+        print(f"\r{stats.policies} policies exported", end="", file=sys.stderr)
+
+    try:
+        summary = export_catalog(iter_pages(http_page_fetcher(args.api), args.page_size), out, args.format, progress)
+    finally:
+        if args.out:
+            out.close()
+    print(file=sys.stderr)
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
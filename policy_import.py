@@ -0,0 +1,305 @@
+"""
+Bulk policy import from CSV, JSONL or Excel.
+
+Rows are streamed (never loaded as a whole), normalised, validated with the
+same rules as `add_policy_page`, checked against a name index of the existing
+catalog, and created through `POST /policies/batch`, falling back to
+individual `POST /policies` calls with bounded concurrency when the backend
+has no batch endpoint.
+
+CLI:
+    python policy_import.py policies.csv [--api URL] [--batch-size 200]
+           [--concurrency 8] [--allow-duplicates] [--dry-run] [--failures failed.csv]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import requests
+
+from policy_index import normalize_name
+from policy_schema import ALLOWED_TYPES, DEFAULT_SCOPE, validate_policy
+
+IMPORT_FORMATS = ["csv", "jsonl", "xlsx"]
+POLICY_FIELDS = ["name", "type", "scope", "description", "effective_date", "expiry_date"]
+# Header spellings seen in exports from other systems
+FIELD_ALIASES = {
+    "policy name": "name", "policy_name": "name", "title": "name",
+    "policy type": "type", "policy_type": "type", "category": "type",
+    "audience": "scope", "applies to": "scope",
+    "effective": "effective_date", "effective date": "effective_date", "start_date": "effective_date",
+    "expiry": "expiry_date", "expiry date": "expiry_date", "expires": "expiry_date", "end_date": "expiry_date",
+}
+_TYPE_LOOKUP = {t.lower(): t for t in ALLOWED_TYPES}
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    created: int = 0
+    duplicates: int = 0
+    failed: list = field(default_factory=list)  # [{"row": n, "name": ..., "errors": [...]}]
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self.started
+
+    def fail(self, row_number, fields, errors):
+        self.failed.append({"row": row_number, "name": (fields or {}).get("name", ""), "errors": errors})
+
+    def summary(self) -> dict:
+        return {
+            "total": self.total,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "failed": len(self.failed),
+            "elapsed_s": round(self.elapsed_s, 2),
+            "rows_per_s": round(self.total / self.elapsed_s, 1) if self.elapsed_s else 0.0,
+        }
+
+
+def detect_format(filename: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson"):
+        return "jsonl"
+    if ext in ("xlsx", "xlsm"):
+        return "xlsx"
+    return "csv"
+
+
+def iter_rows(source, fmt: str):
+    """
+    Yield (row_number, raw dict) from a path or binary file object.
+    Excel needs the optional `openpyxl` package and is read in streaming mode.
+    """
+    if fmt == "xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError as e:
+            raise RuntimeError("Excel import needs the 'openpyxl' package (pip install openpyxl)") from e
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(h or "").strip() for h in next(rows, [])]
+            for number, values in enumerate(rows, start=2):
+                if values and any(v not in (None, "") for v in values):
+                    yield number, dict(zip(header, values))
+        finally:
+            workbook.close()
+        return
+
+    stream = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        if fmt == "jsonl":
+            for number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, {"__error__": f"Invalid JSON: {e.msg}"}
+        else:
+            for number, row in enumerate(csv.DictReader(text), start=2):
+                yield number, row
+        text.detach()
+    finally:
+        if isinstance(source, (str, os.PathLike)):
+            stream.close()
+
+
+def normalize_row(raw: dict) -> dict:
+    """Map header aliases, strip values, canonicalise type case and date cells."""
+    fields = {}
+    for key, value in raw.items():
+        key = str(key or "").strip().lower()
+        key = FIELD_ALIASES.get(key, key.replace(" ", "_"))
+        if key not in POLICY_FIELDS:
+            continue
+        if isinstance(value, datetime):
+            value = value.date().isoformat()
+        elif isinstance(value, date):
+            value = value.isoformat()
+        elif value is not None:
+            value = str(value).strip()
+        fields[key] = value or None
+    if fields.get("type"):
+        fields["type"] = _TYPE_LOOKUP.get(fields["type"].lower(), fields["type"])
+    fields["scope"] = fields.get("scope") or DEFAULT_SCOPE
+    fields["effective_date"] = fields.get("effective_date") or date.today().isoformat()
+    return {k: v for k, v in fields.items() if v is not None}
+
+
+class PolicyWriter:
+    """Creates validated policies on the backend, batched when supported."""
+
+    def __init__(self, base_url: str, concurrency: int = 8, timeout: int = 60, retries: int = 2, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = retries  # extra attempts for a batch after a timeout, dropped connection or 409
+        self.session = session or requests.Session()  # the app passes one that records/replays its traffic
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.batch_supported = None  # unknown until the first batch call
+
+    def existing_names(self) -> set:
+        res = self.session.get(f"{self.base_url}/policies", timeout=self.timeout)
+        res.raise_for_status()
+        return {normalize_name(p.get("name", "")) for p in res.json()}
+
+    def create_batch(self, policies: list) -> list:
+        """
+        Return one error string (or None on success) per policy. A batch goes
+        out with its own Idempotency-Key and is retried under it, so a batch
+        that timed out after the backend wrote it is not created twice.
+        """
+        if self.batch_supported is not False:
+            res = self._post_batch(policies)
+            if isinstance(res, str):
+                return [res] * len(policies)
+            if res.status_code in (404, 405):
+                self.batch_supported = False
+            elif res.status_code in (200, 201, 207):
+                self.batch_supported = True
+                return [None if r.get("success") else str(r.get("error", "Unknown error"))
+                        for r in res.json()["results"]]
+            else:
+                return [f"HTTP {res.status_code}: {res.text[:200]}"] * len(policies)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(self._create_one, policies))
+
+    def _post_batch(self, policies: list):
+        """The /policies/batch response, or an error string if it never arrived."""
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        for attempt in range(1 + self.retries):
+            if attempt:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+            try:
+                res = self.session.post(f"{self.base_url}/policies/batch", json={"policies": policies},
+                                        headers=headers, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                error = f"Batch request failed: {e}"
+                continue
+            if res.status_code != 409:  # 409: the same key is still being processed
+                return res
+            error = f"HTTP 409: {res.text[:200]}"
+        return error
+
+    def _create_one(self, policy: dict):
+        try:
+            res = self.session.post(f"{self.base_url}/policies", data=policy, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            return str(e)
+        return None if res.status_code in (200, 201) else f"HTTP {res.status_code}: {res.text[:200]}"
+
+
+def import_policies(rows, writer, existing_names=None, skip_duplicates=True,
+                    batch_size=200, dry_run=False, on_progress=None) -> ImportReport:
+    """
+    Validate and create policies from `iter_rows` output. Only one batch is
+    held in memory at a time; `on_progress(report)` is called after each batch.
+    """
+    report = ImportReport()
+    seen = set(existing_names or ())
+    batch, batch_rows = [], []
+
+    def flush():
+        if not batch:
+            return
+        errors = [None] * len(batch) if dry_run else writer.create_batch(batch)
+        for (number, fields), error in zip(batch_rows, errors):
+            if error:
+                report.fail(number, fields, [error])
+            else:
+                report.created += 1
+        batch.clear()
+        batch_rows.clear()
+        if on_progress:
+            on_progress(report)
+
+    for number, raw in rows:
+        report.total += 1
+        if "__error__" in raw:
+            report.fail(number, {}, [raw["__error__"]])
+            continue
+        fields = normalize_row(raw)
+        errors = validate_policy(fields)
+        if errors:
+            report.fail(number, fields, errors)
+            continue
+        key = normalize_name(fields["name"])
+        if skip_duplicates and key in seen:
+            report.duplicates += 1
+            continue
+        seen.add(key)
+        batch.append(fields)
+        batch_rows.append((number, fields))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    if on_progress:
+        on_progress(report)
+    return report
+
+
+def write_failures(failed: list, out) -> None:
+    writer = csv.writer(out)
+    writer.writerow(["row", "name", "errors"])
+    for f in failed:
+        writer.writerow([f["row"], f["name"], "; ".join(f["errors"])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import policies from CSV, JSONL or Excel")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="default: from the file extension")
+    parser.add_argument("--api", default=os.getenv("API_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel POSTs when there is no batch endpoint")
+    parser.add_argument("--allow-duplicates", action="store_true", help="create rows whose name already exists")
+    parser.add_argument("--dry-run", action="store_true", help="validate and dedupe only")
+    parser.add_argument("--failures", help="write failed rows to this CSV")
+    args = parser.parse_args()
+
+    writer = PolicyWriter(args.api, concurrency=args.concurrency)
+    existing = set() if args.allow_duplicates else writer.existing_names()
+
+    def progress(report):
+        print(f"\r{report.total} rows • {report.created} created • {report.duplicates} duplicates • "
+              f"{len(report.failed)} failed • {report.total / max(report.elapsed_s, 1e-9):.0f} rows/s",
+              end="", file=sys.stderr)
+
+    report = import_policies(
+        iter_rows(args.path, args.format or detect_format(args.path)),
+        writer,
+        existing_names=existing,
+        skip_duplicates=not args.allow_duplicates,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        on_progress=progress,
+    )
+    print(file=sys.stderr)
+    print(json.dumps(report.summary(), indent=2))
+    if report.failed:
+        if args.failures:
+            with open(args.failures, "w", newline="", encoding="utf-8") as f:
+                write_failures(report.failed, f)
+        else:
+            for f in report.failed[:20]:
+                print(f"row {f['row']} ({f['name'] or 'no name'}): {'; '.join(f['errors'])}", file=sys.stderr)
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
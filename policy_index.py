@@ -0,0 +1,149 @@
+"""
+In-memory name, keyword and expiry indexes over a policy catalog.
+
+Built once from the list returned by `/policies` and reused across reruns, so
+lookups by name, keyword retrieval and expiry-date ranges don't rescan every
+policy.
+"""
+import bisect
+import math
+import re
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "for", "in", "on", "at", "by", "with",
+    "about", "is", "are", "be", "me", "show", "find", "list", "all", "any", "what",
+    "which", "policy", "policies", "please", "can", "you", "i", "we", "our", "my",
+}
+# Matches in the name count more than matches in the description
+FIELD_WEIGHTS = {"name": 3.0, "type": 2.0, "scope": 1.5, "description": 1.0}
+SUMMARY_DESCRIPTION_CHARS = 200
+
+
+def tokenize(text: str) -> list:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def normalize_name(name: str) -> str:
+    """Case/whitespace/punctuation-insensitive form used for name lookups."""
+    return " ".join(_TOKEN_RE.findall((name or "").lower()))
+
+
+def policy_summary(policy: dict) -> dict:
+    """Compact view of a policy, small enough to send as LLM context."""
+    description = policy.get("description") or ""
+    if len(description) > SUMMARY_DESCRIPTION_CHARS:
+        description = description[:SUMMARY_DESCRIPTION_CHARS].rstrip() + "…"
+    summary = {
+        "id": policy.get("id"),
+        "name": policy.get("name"),
+        "type": policy.get("type"),
+        "scope": policy.get("scope"),
+        "effective_date": policy.get("effective_date"),
+        "description": description,
+    }
+    if policy.get("expiry_date"):
+        summary["expiry_date"] = policy["expiry_date"]
+    return summary
+
+
+class PolicyIndex:
+    """Name and weighted keyword indexes for one snapshot of the catalog."""
+
+    def __init__(self, policies):
+        self.policies = list(policies or [])
+        self.built_at = time.time()
+        self.by_id = {}
+        self.by_name = defaultdict(list)       # exact lowercase name -> policies
+        self.by_normalized = defaultdict(list)  # normalize_name(name) -> policies
+        self._postings = defaultdict(dict)      # token -> {policy id: weight}
+        for policy in self.policies:
+            self._add(policy)
+        self.expiry = ExpiryIndex(self.policies)
+
+    def __len__(self):
+        return len(self.policies)
+
+    def _add(self, policy):
+        pid = policy.get("id")
+        self.by_id[pid] = policy
+        name = policy.get("name", "")
+        self.by_name[name.strip().lower()].append(policy)
+        self.by_normalized[normalize_name(name)].append(policy)
+        for field_name, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(policy.get(field_name)):
+                postings = self._postings[token]
+                postings[pid] = postings.get(pid, 0.0) + weight
+
+    def find_by_name(self, name: str) -> list:
+        """Exact (case-insensitive) name matches, like the scans in the chat and add pages."""
+        return list(self.by_name.get((name or "").strip().lower(), []))
+
+    def find_by_normalized_name(self, name: str) -> list:
+        return list(self.by_normalized.get(normalize_name(name), []))
+
+    def search(self, query: str, k: int = 5) -> list:
+        """Top-k policies for a free-text query, best first."""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        n = len(self.policies) or 1
+        scores = defaultdict(float)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + n / len(postings))
+            for pid, weight in postings.items():
+                scores[pid] += idf * weight
+        # A policy whose full name appears in the query is almost certainly the target
+        normalized_query = f" {normalize_name(query)} "
+        for pid in scores:
+            if f" {normalize_name(self.by_id[pid].get('name'))} " in normalized_query:
+                scores[pid] += 100.0
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [self.by_id[pid] for pid, _ in ranked]
+
+
+def _iso_date(value) -> bool:
+    try:
+        date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class ExpiryIndex:
+    """
+    Policies that have an `expiry_date`, ordered by it. Date ranges are found
+    by bisection, so a query costs O(log n) plus the size of its result.
+    Dates are ISO strings, which sort like the dates they spell; policies
+    whose expiry isn't an ISO date are left out.
+    """
+
+    def __init__(self, policies):
+        ordered = sorted((p for p in policies if _iso_date(p.get("expiry_date"))), key=lambda p: p["expiry_date"])
+        self._dates = [p["expiry_date"] for p in ordered]
+        self._policies = ordered
+
+    def __len__(self):
+        return len(self._dates)
+
+    def between(self, start: str = None, end: str = None) -> list:
+        """Policies expiring from `start` through `end` (both inclusive, either open), soonest first."""
+        lo = bisect.bisect_left(self._dates, start) if start else 0
+        hi = bisect.bisect_right(self._dates, end) if end else len(self._dates)
+        return self._policies[lo:hi]
+
+    def expired(self, today: str = None) -> list:
+        """Policies whose expiry date is before `today`, oldest expiry first."""
+        today = today or date.today().isoformat()
+        return self._policies[:bisect.bisect_left(self._dates, today)]
+
+    def expiring_within(self, days: int, today: str = None) -> list:
+        """Policies still in force today that expire within the next `days` days."""
+        start = date.fromisoformat(today) if today else date.today()
+        return self.between(start.isoformat(), (start + timedelta(days=days)).isoformat())
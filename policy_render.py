@@ -0,0 +1,106 @@
+"""
+Pure rendering and filtering helpers for policy lists.
+
+Kept free of Streamlit so the benchmarks can time exactly the code the
+pages run: the Search page's substring filter, the chat's "show all
+policies" markdown and the policy card HTML.
+"""
+import threading
+
+from catalog_view import PENDING_FLAG, REVISION_KEY
+
+SEARCH_FIELDS = ("name", "description", "type", "scope")
+# What list views fetch (`/policies?fields=...`); full content is loaded per policy on demand
+LIST_FIELDS = ("name", "type", "scope", "effective_date", "expiry_date", "updated_at", "document_count")
+
+
+def filter_policies(policies, query: str) -> list:
+    """Case-insensitive substring match on name, description, type and scope."""
+    query_lower = query.lower()
+    return [
+        p for p in policies
+        if any(query_lower in (p.get(f) or "").lower() for f in SEARCH_FIELDS)
+    ]
+
+
+def policy_list_markdown(items, title: str = "All Policies") -> str:
+    """The chat's numbered "show all policies" listing (also used for other policy lists)."""
+    lines = [f"✅ Found {len(items)} policies.", f"\n### 📋 {title}\n"]
+    for i, p in enumerate(items, 1):
+        lines.append(f"**{i}. 📄 {p.get('name','Unnamed')}**")
+        lines.append(f" - **Type:** {p.get('type','N/A')}  •  **Scope:** {p.get('scope','N/A')}")
+        lines.append(f" - **Effective:** {p.get('effective_date','N/A')}")
+        if p.get('expiry_date'):
+            lines.append(f" - **Expires:** {p.get('expiry_date')}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def document_count(policy) -> int:
+    """Attachment count of a full policy or of a `document_count` summary."""
+    if "document_count" in policy:
+        return policy["document_count"]
+    return len(policy.get("documents", []))
+
+
+def policy_card_html(policy) -> str:
+    """Card for a full policy or a LIST_FIELDS summary (which has no description line)."""
+    saving = " ⏳ <em>saving…</em>" if policy.get(PENDING_FLAG) else ""
+    description = (f"\n            <p><strong>Description:</strong> {policy['description']}</p>"
+                   if "description" in policy else "")
+    return f"""
+        <div class="policy-card">
+            <h4>📄 {policy['name']}{saving}</h4>
+            <p><strong>Type:</strong> {policy['type']} | <strong>Scope:</strong> {policy['scope']}</p>{description}
+            <p><strong>Effective:</strong> {policy['effective_date']} | <strong>Expires:</strong> {policy.get('expiry_date', 'No expiry')}</p>
+            <p><strong>Documents:</strong> {document_count(policy)} files</p>
+        </div>
+        """
+
+
+def card_version(policy) -> tuple:
+    """
+    Cache key for a policy's card: id plus `updated_at` and the catalog
+    view's local revision (a batch update confirmed without the server's
+    copies keeps the old `updated_at`), the saving flag and whether it is a
+    summary. Policies without `updated_at` are keyed by the fields the card shows.
+    """
+    version = policy.get("updated_at") or (
+        policy.get("name"), policy.get("type"), policy.get("scope"), policy.get("description"),
+        policy.get("effective_date"), policy.get("expiry_date"), document_count(policy),
+    )
+    return (policy.get("id"), version, policy.get(REVISION_KEY), bool(policy.get(PENDING_FLAG)),
+            "description" in policy)
+
+
+class CardRenderer:
+    """
+    Renders a list of policies as one HTML string from memoized per-policy
+    cards, so a page of results is a single element and an unchanged policy
+    is never formatted twice. Once `max_cards` are cached the oldest half is
+    dropped.
+    """
+
+    def __init__(self, max_cards: int = 50_000):
+        self.max_cards = max_cards
+        self._cards = {}
+        self._lock = threading.Lock()
+
+    def render(self, policies) -> str:
+        cards, parts, fresh = self._cards, [], {}
+        for policy in policies:
+            key = card_version(policy)
+            html = cards.get(key)
+            if html is None:
+                html = fresh[key] = policy_card_html(policy)
+            parts.append(html)
+        if fresh:
+            with self._lock:
+                if len(self._cards) + len(fresh) > self.max_cards:
+                    keep = list(self._cards.items())[len(self._cards) // 2:]
+                    self._cards = dict(keep)
+                self._cards.update(fresh)
+        return "".join(parts)
+
+    def __len__(self):
+        return len(self._cards)
@@ -0,0 +1,49 @@
+"""
+Shared policy field rules used by the Streamlit frontend.
+
+Kept free of Streamlit/requests imports so helpers (chat extractor, importers,
+benchmarks) can use the same rules as `add_policy_page` without loading the UI.
+"""
+from datetime import date
+
+# Must match the backend & Cosmos partition key
+ALLOWED_TYPES = ["HR", "IT", "Leave", "Customer"]
+ALLOWED_FILE_TYPES = ['pdf', 'doc', 'docx', 'txt']
+DEFAULT_SCOPE = "All Employees"
+REQUIRED_FIELDS = ["name", "type", "scope", "description"]
+FIELD_LABELS = {
+    "name": "Policy Name",
+    "type": "Policy Type",
+    "scope": "Scope",
+    "description": "Description",
+    "effective_date": "Effective Date",
+    "expiry_date": "Expiry Date",
+}
+
+
+def _is_iso_date(value) -> bool:
+    try:
+        date.fromisoformat(value)
+        return len(value) == 10
+    except (TypeError, ValueError):
+        return False
+
+
+def validate_policy(fields: dict) -> list:
+    """
+    Client-side checks shared by `add_policy_page` and bulk import.
+    Returns a list of human-readable errors (empty when the policy is valid).
+    """
+    errors = []
+    for key in REQUIRED_FIELDS:
+        value = fields.get(key)
+        if key == "type":
+            if value not in ALLOWED_TYPES:
+                errors.append(f"Policy Type must be one of: {', '.join(ALLOWED_TYPES)}.")
+        elif not value or not str(value).strip():
+            errors.append(f"{FIELD_LABELS[key]} is required.")
+    for key in ("effective_date", "expiry_date"):
+        value = fields.get(key)
+        if value and not _is_iso_date(value):
+            errors.append(f"{FIELD_LABELS[key]} must be a date in YYYY-MM-DD format.")
+    return errors
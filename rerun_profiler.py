@@ -0,0 +1,155 @@
+"""
+Opt-in sampling profiler for whole Streamlit reruns.
+
+While a rerun executes, a background thread samples the script thread's
+stack every few milliseconds (no tracing hooks, so the script runs at full
+speed). Each rerun produces:
+  - `<stamp>-<page>.folded`: collapsed stacks ("frame;frame;frame count"),
+    loadable in speedscope, flamegraph.pl or inferno as a flame graph
+  - `<stamp>-<page>.json`: a summary attributing time to page functions and
+    to the backend endpoints being called (`call_api` and raw `requests`
+    calls are labelled with their method and path)
+Only the newest `keep` reruns are kept on disk.
+
+Stacks are trimmed to start at the app script, so Streamlit's own runner
+frames don't drown the picture.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlsplit
+
+_ID_SEGMENT_RE = re.compile(r"/(?:[0-9a-f]{8}-[0-9a-f-]{27}|[0-9a-f]{32,64}|pending-[0-9a-f]+|\d+)(?=/|$)", re.I)
+
+
+def endpoint_label(method, url) -> str:
+    """"GET /policies/{id}" for a call; ids and digests are folded so calls group by route."""
+    path = urlsplit(str(url)).path if "://" in str(url) else str(url)
+    return f"{(method or 'GET').upper()} {_ID_SEGMENT_RE.sub('/{id}', path) or '/'}"
+
+
+class RerunProfiler:
+    """
+    Context manager profiling the calling thread. `app_file` trims stacks to
+    the script; `page_functions` are the names time is attributed to.
+    """
+
+    def __init__(self, app_file, page_functions=(), out_dir="profiles", interval=0.005, keep=50):
+        self.app_file = os.path.abspath(app_file)
+        self.page_functions = set(page_functions)
+        self.out_dir = out_dir
+        self.interval = interval
+        self.keep = keep
+        self.stacks = Counter()
+        self.endpoints = Counter()
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._target = None
+        self._thread = None
+
+    def __enter__(self):
+        self._target = threading.get_ident()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="rerun-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            stack, endpoint = self._collapse(frame)
+            if stack:
+                self.stacks[stack] += 1
+                if endpoint:
+                    self.endpoints[endpoint] += 1
+
+    def _collapse(self, frame):
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        start = next((i for i, f in enumerate(frames) if f.f_code.co_filename == self.app_file), None)
+        if start is None:
+            return None, None
+        labels, endpoint = [], None
+        for f in frames[start:]:
+            code = f.f_code
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            call = self._endpoint(f)
+            if call:
+                endpoint = call
+                label = f"{label} [{call}]"
+            labels.append(label.replace(";", ","))
+        return ";".join(labels), endpoint
+
+    def _endpoint(self, frame):
+        code = frame.f_code
+        try:
+            if code.co_name == "call_api" and code.co_filename == self.app_file:
+                return endpoint_label(frame.f_locals.get("method"), frame.f_locals.get("endpoint"))
+            if code.co_name == "request" and code.co_filename.endswith(os.path.join("requests", "api.py")):
+                return endpoint_label(frame.f_locals.get("method"), frame.f_locals.get("url"))
+        except Exception:
+            pass  # locals of a frame that is mid-update
+        return None
+
+    def summary(self) -> dict:
+        """
+        Milliseconds per page function and per endpoint. Samples are scaled to
+        the measured rerun time, since the sampler can be late when the script
+        holds the GIL.
+        """
+        samples = sum(self.stacks.values())
+        ms = self.elapsed * 1000 / samples if samples else self.interval * 1000
+        by_page = Counter()
+        for stack, count in self.stacks.items():
+            names = [label.split(" (", 1)[0] for label in stack.split(";")]
+            page = next((n for n in names if n in self.page_functions), None)
+            by_page[page or "main (sidebar/other)"] += count
+        return {
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "samples": samples,
+            "interval_ms": self.interval * 1000,
+            "pages": {k: round(v * ms, 1) for k, v in by_page.most_common()},
+            "endpoints": {k: round(v * ms, 1) for k, v in self.endpoints.most_common()},
+        }
+
+    def write(self, label="rerun") -> dict:
+        """Write the folded stacks and summary for this rerun; prune to the newest `keep`."""
+        summary = self.summary()
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = os.path.join(self.out_dir, f"{stamp}-{re.sub(r'[^A-Za-z0-9_-]+', '_', label)}")
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({"label": label, **summary}, f, indent=2)
+        summary["folded_path"] = base + ".folded"
+        self._prune()
+        return summary
+
+    def _prune(self):
+        runs = sorted(
+            (e.path[:-len(".json")] for e in os.scandir(self.out_dir) if e.name.endswith(".json")),
+        )
+        for base in runs[:-self.keep] if self.keep else []:
+            for ext in (".json", ".folded"):
+                try:
+                    os.remove(base + ext)
+                except OSError:
+                    pass
@@ -0,0 +1,154 @@
+"""
+Local time series of `/stats` snapshots for the Statistics page trends.
+
+Each snapshot is flattened into series ("total", "active", "expired",
+"HR/active", ...). Storage stays compact and reads stay cheap as history
+grows:
+  - `points` keeps a raw value only when it differs from the series' previous
+    value, so an unchanged catalog adds no rows
+  - `rollups` holds per-hour and per-day buckets (samples, sum,
+    min, max, last) that are updated as each snapshot arrives, so charts read
+    ready-made aggregates instead of recomputing them from the raw history
+"""
+import sqlite3
+import threading
+import time
+
+METRICS = ("total", "active", "expired")
+RESOLUTIONS = {"hour": 3600, "day": 86400}
+_TOTAL_KEYS = {"total": "total_policies", "active": "active_policies", "expired": "expired_policies"}
+
+
+def snapshot_series(stats: dict) -> dict:
+    """Series name -> value for one `/stats` result; per-type series need the backend's `by_type`."""
+    series = {metric: stats.get(key, 0) for metric, key in _TOTAL_KEYS.items()}
+    by_type = stats.get("by_type")
+    if by_type:
+        for ptype, counts in by_type.items():
+            for metric in METRICS:
+                series[f"{ptype}/{metric}"] = counts.get(metric, 0)
+    else:
+        for ptype, count in (stats.get("policy_types") or {}).items():
+            series[f"{ptype}/total"] = count
+    return series
+
+
+class StatsHistory:
+    """SQLite store of stats snapshots with incrementally maintained rollups."""
+
+    def __init__(self, path: str = ":memory:", min_interval: float = 30.0):
+        self.min_interval = min_interval  # snapshots closer together than this are dropped
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS series (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS points (
+                series INTEGER NOT NULL, ts INTEGER NOT NULL, value INTEGER NOT NULL,
+                PRIMARY KEY (series, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS rollups (
+                series INTEGER NOT NULL, resolution INTEGER NOT NULL, bucket INTEGER NOT NULL,
+                samples INTEGER NOT NULL, sum INTEGER NOT NULL, min INTEGER NOT NULL,
+                max INTEGER NOT NULL, last INTEGER NOT NULL,
+                PRIMARY KEY (series, resolution, bucket)
+            ) WITHOUT ROWID;
+        """)
+        self._ids = dict(self._db.execute("SELECT name, id FROM series").fetchall())
+        self._last = dict(self._db.execute("""
+            SELECT p.series, p.value FROM points p
+            JOIN (SELECT series, MAX(ts) AS ts FROM points GROUP BY series) m ON m.series = p.series AND m.ts = p.ts
+        """).fetchall())
+        row = self._db.execute("SELECT MAX(bucket) FROM rollups WHERE resolution = ?", (RESOLUTIONS["hour"],))
+        self._last_ts = row.fetchone()[0] or 0
+
+    def _series_id(self, name):
+        if name not in self._ids:
+            self._ids[name] = self._db.execute("INSERT INTO series (name) VALUES (?)", (name,)).lastrowid
+        return self._ids[name]
+
+    def record(self, stats: dict, ts: float = None) -> bool:
+        """Add one snapshot; False when it came too soon after the previous one."""
+        ts = int(ts if ts is not None else time.time())
+        with self._lock, self._db:
+            if ts - self._last_ts < self.min_interval:
+                return False
+            self._last_ts = ts
+            points, rollups = [], []
+            for name, value in snapshot_series(stats).items():
+                sid = self._series_id(name)
+                if self._last.get(sid) != value:
+                    points.append((sid, ts, value))
+                    self._last[sid] = value
+                for seconds in RESOLUTIONS.values():
+                    rollups.append((sid, seconds, ts - ts % seconds, value, value, value, value))
+            self._db.executemany("INSERT OR REPLACE INTO points VALUES (?, ?, ?)", points)
+            self._db.executemany("""
+                INSERT INTO rollups VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT (series, resolution, bucket) DO UPDATE SET
+                    samples = samples + 1, sum = sum + excluded.sum, min = MIN(min, excluded.min),
+                    max = MAX(max, excluded.max), last = excluded.last
+            """, rollups)
+            return True
+
+    def series_names(self) -> list:
+        with self._lock:
+            return sorted(self._ids)
+
+    def trend(self, names, resolution: str = "hour", since: float = None, value: str = "last") -> dict:
+        """
+        {series name: [(bucket start, value), ...]} from the rollups at
+        `resolution`; `value` is "last", "avg", "min" or "max" per bucket.
+        """
+        column = {"last": "r.last", "avg": "1.0 * r.sum / r.samples", "min": "r.min", "max": "r.max"}[value]
+        with self._lock:
+            ids = {self._ids[n]: n for n in names if n in self._ids}
+            if not ids:
+                return {}
+            rows = self._db.execute(f"""
+                SELECT r.series, r.bucket, {column} FROM rollups r
+                WHERE r.resolution = ? AND r.bucket >= ? AND r.series IN ({','.join('?' * len(ids))})
+                ORDER BY r.bucket
+            """, (RESOLUTIONS[resolution], int(since or 0), *ids)).fetchall()
+        trend = {name: [] for name in ids.values()}
+        for sid, bucket, val in rows:
+            trend[ids[sid]].append((bucket, val))
+        return trend
+
+    def counts(self) -> dict:
+        """Stored rows, to show how compact the history is."""
+        with self._lock:
+            return {
+                "series": len(self._ids),
+                "points": self._db.execute("SELECT COUNT(*) FROM points").fetchone()[0],
+                "rollups": self._db.execute("SELECT COUNT(*) FROM rollups").fetchone()[0],
+            }
+
+
+class StatsSampler:
+    """Daemon thread recording `fetch()` (a `/stats` dict, or None on failure) every `interval` seconds."""
+
+    def __init__(self, history: StatsHistory, fetch, interval: float = 300.0):
+        self.history = history
+        self.fetch = fetch
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stats-sampler", daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                stats = self.fetch()
+                if stats:
+                    self.history.record(stats)
+            except Exception:
+                pass  # the backend being down just leaves a gap in the history
+            if self._stop.wait(self.interval):
+                return
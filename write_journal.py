@@ -0,0 +1,203 @@
+"""
+Offline write-behind journal for policy creates, uploads and deletes.
+
+When the backend can't be reached, writes are appended to a local SQLite
+journal (attachments included) instead of being lost, and replayed in order
+once the API answers again. Consecutive plain creates are replayed as one
+batch call. Every entry carries the idempotency key it was first sent with,
+so a replay after a timeout or a half-finished batch never writes twice.
+
+Replay outcome per entry:
+  - success: the entry is removed from the journal
+  - still offline (connection error, timeout, 5xx) or the same key still in
+    flight (409): replay stops, the entry stays pending and is retried on the
+    next replay
+  - anything else (validation error, policy gone, key conflict): the entry
+    is kept as a conflict with the backend's error, for the session that made
+    the write (its `owner`) to review
+"""
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+OPERATIONS = ("create", "attach", "delete")
+OFFLINE_STATUS_CODES = {502, 503, 504}
+
+
+@dataclass
+class JournalEntry:
+    id: int
+    op: str
+    target: str  # policy id for attach/delete
+    payload: dict
+    key: str
+    created_at: str
+    status: str = "pending"
+    error: str = None
+    owner: str = None  # session that made the write; only it sees and discards the entry's conflict
+    file_count: int = 0
+    files: list = field(default_factory=list)  # [(filename, content, content_type)], loaded only for replay
+
+    @property
+    def label(self) -> str:
+        name = self.payload.get("name") or self.target
+        return {"create": f"Create '{name}'", "attach": f"Upload {self.file_count} file(s) to '{name}'",
+                "delete": f"Delete '{name}'"}[self.op]
+
+
+@dataclass
+class ReplayReport:
+    replayed: int = 0
+    conflicts: int = 0
+    remaining: int = 0
+    offline: bool = False
+    created: list = field(default_factory=list)  # (entry, response data) for successful creates/attaches
+
+    def summary(self) -> str:
+        parts = [f"{self.replayed} synced"]
+        if self.conflicts:
+            parts.append(f"{self.conflicts} conflict(s)")
+        if self.remaining:
+            parts.append(f"{self.remaining} still pending")
+        return ", ".join(parts)
+
+
+def is_offline(result: dict) -> bool:
+    """True when a `call_api` result means the backend was unreachable rather than rejecting the write."""
+    return result.get("error") in ("connection", "timeout") or result.get("status_code") in OFFLINE_STATUS_CODES
+
+
+class WriteJournal:
+    """SQLite-backed queue of writes made while the backend was unreachable."""
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._replaying = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, target TEXT, payload TEXT NOT NULL,
+                key TEXT NOT NULL, created_at TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', error TEXT,
+                owner TEXT
+            );
+            CREATE TABLE IF NOT EXISTS entry_files (
+                entry_id INTEGER NOT NULL, filename TEXT, content_type TEXT, content BLOB
+            );
+            CREATE INDEX IF NOT EXISTS entry_files_entry ON entry_files (entry_id);
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        if "owner" not in columns:  # journals written before entries had an owner
+            self._db.execute("ALTER TABLE entries ADD COLUMN owner TEXT")
+
+    def append(self, op: str, payload: dict, key: str, target: str = None, files=None, owner: str = None) -> int:
+        """Queue a write; `files` is the multipart list [("files", (name, content, type)), ...]."""
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown journal operation: {op}")
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO entries (op, target, payload, key, created_at, owner) VALUES (?, ?, ?, ?, ?, ?)",
+                (op, target, json.dumps(payload), key, datetime.now().isoformat(timespec="seconds"), owner),
+            )
+            self._db.executemany(
+                "INSERT INTO entry_files VALUES (?, ?, ?, ?)",
+                [(cur.lastrowid, name, ctype, content) for _, (name, content, ctype) in files or []],
+            )
+            return cur.lastrowid
+
+    def entries(self, status: str = "pending", limit: int = None, owner: str = None) -> list:
+        """
+        The first `limit` entries with `status` (of one `owner`, if given),
+        oldest first, without file contents (see `files`).
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, op, target, payload, key, created_at, status, error, owner, "
+                "(SELECT COUNT(*) FROM entry_files f WHERE f.entry_id = e.id) FROM entries e "
+                "WHERE status = ? AND (? IS NULL OR owner = ?) ORDER BY id LIMIT ?",
+                (status, owner, owner, -1 if limit is None else limit)
+            ).fetchall()
+        return [JournalEntry(*r[:3], json.loads(r[3]), *r[4:]) for r in rows]
+
+    def files(self, entry_id: int) -> list:
+        """An entry's attachments as (filename, content, content_type)."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT filename, content, content_type FROM entry_files WHERE entry_id = ?", (entry_id,)
+            ).fetchall()
+
+    def counts(self, owner: str = None) -> dict:
+        with self._lock:
+            return dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM entries WHERE ? IS NULL OR owner = ? GROUP BY status", (owner, owner)
+            ).fetchall())
+
+    def discard(self, entry_id: int, owner: str = None):
+        """Remove an entry; with `owner`, only if that session made it."""
+        with self._lock, self._db:
+            if owner is not None and self._db.execute(
+                    "SELECT 1 FROM entries WHERE id = ? AND owner = ?", (entry_id, owner)).fetchone() is None:
+                return
+            self._db.execute("DELETE FROM entry_files WHERE entry_id = ?", (entry_id,))
+            self._db.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def _conflict(self, entry_id: int, error):
+        with self._lock, self._db:
+            self._db.execute("UPDATE entries SET status = 'conflict', error = ? WHERE id = ?",
+                             (str(error)[:500], entry_id))
+
+    def replay(self, send_one, send_batch=None, batch_size: int = 50, limit: int = None) -> ReplayReport:
+        """
+        Replay pending entries in order. `send_one(entry)` returns a call_api
+        style result; `send_batch(entries)` returns one result per entry, or
+        None when the backend has no batch endpoint. Only one replay runs at a
+        time; a concurrent call returns an empty report.
+        """
+        report = ReplayReport()
+        if not self._replaying.acquire(blocking=False):
+            return report
+        try:
+            pending = self.entries(limit=limit)
+            i = 0
+            while i < len(pending):
+                group = [pending[i]]
+                if send_batch and _batchable(pending[i]):
+                    while len(group) < batch_size and i + len(group) < len(pending) \
+                            and _batchable(pending[i + len(group)]):
+                        group.append(pending[i + len(group)])
+                results = send_batch(group) if len(group) > 1 else None
+                if results is None:
+                    results = []
+                    for entry in group:
+                        if entry.file_count:
+                            entry.files = self.files(entry.id)  # loaded as each entry is sent
+                        results.append(send_one(entry))
+                        if _retry_later(results[-1]):
+                            break
+                for entry, result in zip(group, results):
+                    if _retry_later(result):
+                        report.offline = True
+                        break
+                    if result.get("success"):
+                        self.discard(entry.id)
+                        report.replayed += 1
+                        report.created.append((entry, result.get("data")))
+                    else:
+                        self._conflict(entry.id, result.get("error") or result.get("message") or "rejected")
+                        report.conflicts += 1
+                if report.offline:
+                    break
+                i += len(group)
+            report.remaining = self.counts().get("pending", 0)
+            return report
+        finally:
+            self._replaying.release()
+
+
+def _retry_later(result) -> bool:
+    return is_offline(result) or result.get("status_code") == 409
+
+
+def _batchable(entry) -> bool:
+    return entry.op == "create" and not entry.file_count